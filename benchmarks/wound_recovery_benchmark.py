@@ -0,0 +1,59 @@
+"""Time recovering every wound of a covenant one tracker at a time and in a batch
+
+Run with src on the path, e.g. PYTHONPATH=src python benchmarks/wound_recovery_benchmark.py
+"""
+
+import random
+import time
+
+import numpy
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_tracker
+from covenant import wound_recovery
+
+
+def _wounded_trackers(
+    tracker_type: type[wound_tracker.WoundTracker], count: int, wounds: int
+) -> list[wound_tracker.WoundTracker]:
+    rng = random.Random(1)
+    trackers = [tracker_type(size=0) for _ in range(count)]
+    for tracker in trackers:
+        for _ in range(wounds):
+            tracker.take_damage(rng.randint(1, 15))
+    return trackers
+
+
+def _one_at_a_time(trackers: list[wound_tracker.WoundTracker]) -> None:
+    rng = random.Random(2)
+    for tracker in trackers:
+        tracker.recover_all_light_wounds(3, rng=rng)
+        tracker.recover_all_medium_wounds(3, rng=rng)
+        tracker.recover_all_heavy_wounds(3, rng=rng)
+        tracker.recover_all_incapacitating_wounds(3, rng=rng)
+
+
+def main() -> None:
+    """Print both timings for a few covenant sizes"""
+    for tracker_type in (
+        wound_tracker.WoundTracker,
+        compact_wound_tracker.CompactWoundTracker,
+    ):
+        for count, wounds in ((500, 5), (500, 20), (100, 200)):
+            trackers = _wounded_trackers(tracker_type, count, wounds)
+            start = time.perf_counter()
+            _one_at_a_time(trackers)
+            one_at_a_time = time.perf_counter() - start
+            trackers = _wounded_trackers(tracker_type, count, wounds)
+            start = time.perf_counter()
+            wound_recovery.recover_all(trackers, 3, numpy.random.default_rng(2))
+            batched = time.perf_counter() - start
+            print(
+                f"{tracker_type.__name__:19} {count:4} trackers x {wounds:3} wounds:"
+                f" one at a time {one_at_a_time * 1e3:7.1f}ms"
+                f" batched {batched * 1e3:6.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Time saving and loading a covenant's worth of wound trackers
+
+Run with src on the path, e.g. PYTHONPATH=src python benchmarks/wound_snapshot_benchmark.py
+"""
+
+import random
+import time
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_snapshot
+from characters.parts import wound_tracker
+
+
+def _wounded_trackers(
+    tracker_type: type[wound_tracker.WoundTracker], count: int, wounds: int
+) -> list[wound_tracker.WoundTracker]:
+    rng = random.Random(1)
+    trackers = [tracker_type(size=0) for _ in range(count)]
+    for tracker in trackers:
+        for _ in range(rng.randint(0, 2 * wounds)):
+            tracker.take_damage(rng.randint(1, 15))
+    return trackers
+
+
+def _validated_copy(
+    trackers: list[wound_tracker.WoundTracker],
+) -> list[wound_tracker.WoundTracker]:
+    # rebuilding trackers through their models, as loading them did before
+    copies = []
+    for tracker in trackers:
+        copy = type(tracker)(size=tracker._modified_size - 5)  # pylint: disable=W0212
+        for wound_type in (
+            wound_tracker.LightWound,
+            wound_tracker.MediumWound,
+            wound_tracker.HeavyWound,
+        ):
+            for wound in tracker.get_wounds(wound_type):
+                copy.add_wound(
+                    wound_type(recovery_bonus=wound.recovery_bonus, status=wound.status)
+                )
+        copies.append(copy)
+    return copies
+
+
+def main() -> None:
+    """Print the timings for 10000 trackers with a few wounds each"""
+    for tracker_type in (
+        wound_tracker.WoundTracker,
+        compact_wound_tracker.CompactWoundTracker,
+    ):
+        trackers = _wounded_trackers(tracker_type, 10000, 3)
+        start = time.perf_counter()
+        _validated_copy(trackers)
+        validated = time.perf_counter() - start
+        start = time.perf_counter()
+        snapshot = wound_snapshot.pack_trackers(trackers)
+        packed = time.perf_counter() - start
+        start = time.perf_counter()
+        wound_snapshot.unpack_trackers(snapshot)
+        unpacked = time.perf_counter() - start
+        print(
+            f"{tracker_type.__name__:19} validated rebuild {validated * 1e3:7.1f}ms"
+            f" pack {packed * 1e3:6.1f}ms unpack {unpacked * 1e3:6.1f}ms"
+            f" ({len(snapshot)} bytes)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Time reading wound bonuses from trackers carrying many wounds
+
+Run with src on the path, e.g. PYTHONPATH=src python benchmarks/wound_tracker_benchmark.py
+"""
+
+import timeit
+
+from characters.parts import wound_tracker
+
+
+def _list_sum(tracker: wound_tracker.WoundTracker) -> int:
+    # how wound_bonus used to be worked out
+    return sum(
+        [
+            wound.bonus
+            for wound in tracker._light_wounds  # pylint: disable=W0212
+            + tracker._medium_wounds  # pylint: disable=W0212
+            + tracker._heavy_wounds  # pylint: disable=W0212
+        ]
+    )
+
+
+def main() -> None:
+    """Print the time per read for a few tracker sizes"""
+    reads = 2000
+    for wounds in (10, 100, 1000):
+        tracker = wound_tracker.WoundTracker(size=0)
+        for damage in range(wounds):
+            tracker.take_damage(1 + damage % 15)
+        summed = timeit.timeit(lambda: _list_sum(tracker), number=reads) / reads
+        running = timeit.timeit(lambda: tracker.wound_bonus, number=reads) / reads
+        print(
+            f"{wounds:5} wounds: summed {summed * 1e6:8.2f}us"
+            f" running total {running * 1e6:6.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,24 @@
 """Abilities are skills that characters have, both magical and non magical see ArM5(62-67)"""
 
 # from __future__ import annotations
-from typing import Self
+from typing import Any, Callable, Optional, Self
 import pydantic
 
+from lib import am5_advancement
+from lib import batch_update
 
-class Ability(pydantic.BaseModel):
+# called with the ability, its old level and its new level
+LevelListener = Callable[["Ability", int, int], None]
+
+
+class Ability(batch_update.BatchUpdateModel):
     """Ability implementation"""
 
     model_config = pydantic.ConfigDict(validate_assignment=True)
     name: str
     level: int = pydantic.Field(default=0)
     experience: int = pydantic.Field(default=0, ge=0)
+    _level_listeners: list[LevelListener] = pydantic.PrivateAttr(default_factory=list)
 
     @pydantic.model_validator(mode="after")
     def max_experience(self) -> Self:
@@ -19,10 +26,43 @@ class Ability(pydantic.BaseModel):
         assert self.experience < 5 * (self.level + 1)
         return self
 
+    def __copy__(self) -> Self:
+        # listeners are registered against this ability, a copy starts unheard
+        copy = super().__copy__()
+        copy.__pydantic_private__["_level_listeners"] = []
+        return copy
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> Self:
+        # stand an empty list in for the listeners so deepcopy doesn't copy
+        # them and whatever index they're bound to
+        memo = {} if memo is None else memo
+        memo[id(self.__pydantic_private__["_level_listeners"])] = []
+        return super().__deepcopy__(memo)
+
     def add_experience(self, exp_to_gain: int) -> None:
         """Safely add experience potentially increasing level if needed"""
-        new_experience = self.experience + exp_to_gain
-        while new_experience >= 5 * (self.level + 1):
-            self.level += 1
-            new_experience = new_experience - 5 * self.level
-        self.experience = new_experience
+        new_level, new_experience = am5_advancement.advance(
+            self.level, self.experience, exp_to_gain
+        )
+        self.set_progress(new_level, new_experience)
+
+    def set_progress(self, level: int, experience: int) -> None:
+        """Set level and experience together, telling listeners if the level changed"""
+        old_level = self.level
+        if level == old_level:
+            self.experience = experience
+            return
+        # both change together so validate them once as a pair
+        with self.batch_update():
+            self.level = level
+            self.experience = experience
+        for listener in self._level_listeners:
+            listener(self, old_level, level)
+
+    def add_level_listener(self, listener: LevelListener) -> None:
+        """Call listener every time add_experience or set_progress changes the level"""
+        self._level_listeners.append(listener)
+
+    def remove_level_listener(self, listener: LevelListener) -> None:
+        """Stop calling a listener added with add_level_listener"""
+        self._level_listeners.remove(listener)
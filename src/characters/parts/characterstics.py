@@ -1,10 +1,43 @@
 """Characterstics are numerical stats describing ars magica characters see ArM5(18)"""
 
-from typing import Self, Generator
+from typing import Self, Generator, Optional, Sequence
+import os
 import random
+import tempfile
+
+import numpy
 import pydantic
 
 _STAT_COSTS = {-3: -6, -2: -3, -1: -1, 0: 0, 1: 1, 2: 3, 3: 6}
+_MIN_STAT = min(_STAT_COSTS)
+_STAT_RANGE = len(_STAT_COSTS)
+_CHARACTERSTIC_COUNT = 8
+# point costs indexed by characterstic value - _MIN_STAT
+_STAT_COST_ARRAY = numpy.array(
+    [_STAT_COSTS[value] for value in sorted(_STAT_COSTS)], dtype=numpy.int8
+)
+_MAX_TOTAL_COST = _CHARACTERSTIC_COUNT * max(_STAT_COSTS.values())
+
+
+def _count_ways_to_spend() -> numpy.ndarray:
+    # ways[k, cost + _MAX_TOTAL_COST] is how many ways k characterstics can
+    # add up to exactly cost points
+    ways = numpy.zeros(
+        (_CHARACTERSTIC_COUNT + 1, 2 * _MAX_TOTAL_COST + 1), dtype=numpy.int64
+    )
+    ways[0, _MAX_TOTAL_COST] = 1
+    for count in range(1, _CHARACTERSTIC_COUNT + 1):
+        for stat_cost in _STAT_COSTS.values():
+            ways[count] += numpy.roll(ways[count - 1], stat_cost)
+    return ways
+
+
+_WAYS_TO_SPEND = _count_ways_to_spend()
+DEFAULT_COST_TABLE_PATH = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+    "ars_magica_covenant_manager",
+    "characterstics_costs.npy",
+)
 
 
 class ExtremeCharactersticsError(Exception):
@@ -24,18 +57,23 @@ class Characteristics(pydantic.BaseModel):
     communication: int = 0
 
     def __add__(self, add_val: int) -> Self:
-        results_dict = {}
-        for char_name, value in self:
-            results_dict[char_name] = value + add_val
-
-        return self.__class__(**results_dict)
+        # ints plus an int are still ints so copy and skip revalidating
+        result = self.__copy__()
+        result.__dict__.update(
+            (char_name, value + add_val) for char_name, value in self.__dict__.items()
+        )
+        return result
 
     def __sub__(self, sub_val: int) -> Self:
-        results_dict = {}
-        for char_name, value in self:
-            results_dict[char_name] = value - sub_val
+        result = self.__copy__()
+        result.__dict__.update(
+            (char_name, value - sub_val) for char_name, value in self.__dict__.items()
+        )
+        return result
 
-        return self.__class__(**results_dict)
+    def to_compact(self) -> "CompactCharacteristics":
+        """Plain slotted copy of these characterstics for fast arithmetic"""
+        return CompactCharacteristics.from_model(self)
 
     @classmethod
     def iter_char_names(cls) -> Generator[str, None, None]:
@@ -69,6 +107,86 @@ class Characteristics(pydantic.BaseModel):
             }
         )
 
+    @classmethod
+    def generate_random_valid(
+        cls,
+        max_cost: int = 7,
+        fully_spent: bool = True,
+        rng: Optional[random.Random] = None,
+    ) -> Self:
+        """Generate stats uniformly from every legal set costing max_cost or less
+
+        With fully_spent only sets costing exactly max_cost are picked. There's
+        no rejection, each characterstic is picked weighted by how many ways
+        the rest can make up the remaining points.
+        """
+        randrange = random.randrange if rng is None else rng.randrange
+        total_cost = _pick_weighted(
+            _total_cost_weights(max_cost, fully_spent), randrange
+        )
+        values = {}
+        for remaining, char_name in zip(
+            range(_CHARACTERSTIC_COUNT - 1, -1, -1), cls.iter_char_names()
+        ):
+            value_weights = {
+                value: _ways_to_spend(remaining, total_cost - stat_cost)
+                for value, stat_cost in _STAT_COSTS.items()
+            }
+            values[char_name] = _pick_weighted(value_weights, randrange)
+            total_cost -= _STAT_COSTS[values[char_name]]
+        return cls(**values)
+
+    @classmethod
+    def generate_random_valid_batch(
+        cls,
+        count: int,
+        max_cost: int = 7,
+        fully_spent: bool = True,
+        rng: Optional[numpy.random.Generator] = None,
+    ) -> numpy.ndarray:
+        """Generate count sets of legal stats at once as a (count, 8) int8 array
+
+        Columns are in iter_char_names order, each row is picked the same way
+        as generate_random_valid.
+        """
+        if rng is None:
+            rng = numpy.random.default_rng()
+        total_cost_weights = _total_cost_weights(max_cost, fully_spent)
+        costs = numpy.array(list(total_cost_weights), dtype=numpy.int64)
+        cumulative_weights = numpy.cumsum(list(total_cost_weights.values()))
+        remaining_costs = costs[
+            numpy.searchsorted(
+                cumulative_weights,
+                rng.integers(0, cumulative_weights[-1], size=count),
+                side="right",
+            )
+        ]
+
+        values = numpy.empty((count, _CHARACTERSTIC_COUNT), dtype=numpy.int8)
+        for position in range(_CHARACTERSTIC_COUNT):
+            remaining = _CHARACTERSTIC_COUNT - 1 - position
+            # weight of each value for every row, 0 where the rest can't
+            # make up the difference
+            rest_costs = remaining_costs[:, numpy.newaxis] - _STAT_COST_ARRAY
+            in_range = numpy.abs(rest_costs) <= _MAX_TOTAL_COST
+            cumulative_weights = numpy.cumsum(
+                numpy.where(
+                    in_range,
+                    _WAYS_TO_SPEND[
+                        remaining,
+                        numpy.clip(rest_costs, -_MAX_TOTAL_COST, _MAX_TOTAL_COST)
+                        + _MAX_TOTAL_COST,
+                    ],
+                    0,
+                ),
+                axis=1,
+            )
+            picks = rng.integers(0, cumulative_weights[:, -1])
+            choices = (cumulative_weights <= picks[:, numpy.newaxis]).sum(axis=1)
+            values[:, position] = choices + _MIN_STAT
+            remaining_costs -= _STAT_COST_ARRAY[choices]
+        return values
+
     def get_characterstics_point_cost(self) -> int:
         """Determine the cost of these characterstics as if they were made in character creation"""
 
@@ -80,6 +198,90 @@ class Characteristics(pydantic.BaseModel):
         except KeyError as exc:
             raise ExtremeCharactersticsError from exc
 
+    def is_valid_starting_characterstics(self, max_cost: int = 7) -> bool:
+        """Check if the total cost of these characterstics is below the max"""
+        if _loaded_cost_table is not None:
+            index = _loaded_cost_table.index_of(self)
+            return index is not None and _loaded_cost_table.costs[index] <= max_cost
+        try:
+            return self.get_characterstics_point_cost() <= max_cost
+        except ExtremeCharactersticsError:
+            return False
+
+    def is_valid_starting_characterstics_and_fully_spent(
+        self, max_cost: int = 7
+    ) -> bool:
+        """Check if the total cost of these characterstics is exactly at the max"""
+        if _loaded_cost_table is not None:
+            index = _loaded_cost_table.index_of(self)
+            return index is not None and _loaded_cost_table.costs[index] == max_cost
+        try:
+            return self.get_characterstics_point_cost() == max_cost
+        except ExtremeCharactersticsError:
+            return False
+
+
+class CompactCharacteristics:
+    """The 8 characterstics as a plain tuple without any pydantic overhead
+
+    Arithmetic, comparisons and point costs work straight on the tuple so
+    nothing gets built or validated until to_model is called.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: Sequence[int] = (0,) * _CHARACTERSTIC_COUNT) -> None:
+        if len(values) != _CHARACTERSTIC_COUNT:
+            raise ValueError(f"Need exactly {_CHARACTERSTIC_COUNT} characterstics")
+        self.values = tuple(values)
+
+    @classmethod
+    def from_model(cls, characteristics: Characteristics) -> Self:
+        """Compact copy of a Characteristics model"""
+        compact = cls.__new__(cls)
+        compact.values = tuple(value for _, value in characteristics)
+        return compact
+
+    def to_model(self) -> Characteristics:
+        """Characteristics model with these values"""
+        return Characteristics(
+            **dict(zip(Characteristics.iter_char_names(), self.values))
+        )
+
+    def _with_values(self, values: tuple[int, ...]) -> Self:
+        compact = self.__class__.__new__(self.__class__)
+        compact.values = values
+        return compact
+
+    def __add__(self, add_val: int) -> Self:
+        return self._with_values(tuple(value + add_val for value in self.values))
+
+    def __sub__(self, sub_val: int) -> Self:
+        return self._with_values(tuple(value - sub_val for value in self.values))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactCharacteristics):
+            return self.values == other.values
+        if isinstance(other, Characteristics):
+            return self.values == tuple(value for _, value in other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.values)
+
+    def __iter__(self) -> Generator[tuple[str, int], None, None]:
+        yield from zip(Characteristics.iter_char_names(), self.values)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.values!r})"
+
+    def get_characterstics_point_cost(self) -> int:
+        """Determine the cost of these characterstics as if they were made in character creation"""
+        try:
+            return sum(_STAT_COSTS[value] for value in self.values)
+        except KeyError as exc:
+            raise ExtremeCharactersticsError from exc
+
     def is_valid_starting_characterstics(self, max_cost: int = 7) -> bool:
         """Check if the total cost of these characterstics is below the max"""
         try:
@@ -95,3 +297,234 @@ class Characteristics(pydantic.BaseModel):
             return self.get_characterstics_point_cost() == max_cost
         except ExtremeCharactersticsError:
             return False
+
+
+class CharacteristicsTable:
+    """Characterstics of many characters as columns of one (n, 8) array
+
+    Columns are in iter_char_names order. Arithmetic and point costs apply to
+    every row in a single numpy operation.
+    """
+
+    def __init__(self, values: numpy.ndarray) -> None:
+        values = numpy.asarray(values)
+        if values.ndim != 2 or values.shape[1] != _CHARACTERSTIC_COUNT:
+            raise ValueError(f"Need an (n, {_CHARACTERSTIC_COUNT}) array")
+        self.values = values
+
+    @classmethod
+    def from_models(cls, models: Sequence[Characteristics]) -> Self:
+        """Table with a row for each Characteristics model"""
+        values = numpy.empty((len(models), _CHARACTERSTIC_COUNT), dtype=numpy.int8)
+        for row, model in enumerate(models):
+            values[row] = [value for _, value in model]
+        return cls(values)
+
+    def to_models(self) -> list[Characteristics]:
+        """Characteristics model for every row"""
+        char_names = list(Characteristics.iter_char_names())
+        return [
+            Characteristics(**dict(zip(char_names, row)))
+            for row in self.values.tolist()
+        ]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, row: int) -> CompactCharacteristics:
+        return CompactCharacteristics(self.values[row].tolist())
+
+    def __add__(self, add_val: int | numpy.ndarray) -> Self:
+        return self.__class__(self.values + add_val)
+
+    def __sub__(self, sub_val: int | numpy.ndarray) -> Self:
+        return self.__class__(self.values - sub_val)
+
+    def column(self, char_name: str) -> numpy.ndarray:
+        """View of one characterstic for every row"""
+        return self.values[:, list(Characteristics.iter_char_names()).index(char_name)]
+
+    def _in_range(self) -> numpy.ndarray:
+        return (
+            (self.values >= _MIN_STAT) & (self.values < _MIN_STAT + _STAT_RANGE)
+        ).all(axis=1)
+
+    def get_characterstics_point_costs(self) -> numpy.ndarray:
+        """Point cost of every row as if it were made in character creation"""
+        if not self._in_range().all():
+            raise ExtremeCharactersticsError
+        return _STAT_COST_ARRAY[self.values - _MIN_STAT].sum(axis=1, dtype=numpy.int64)
+
+    def valid_starting_characterstics_mask(
+        self, max_cost: int = 7, fully_spent: bool = False
+    ) -> numpy.ndarray:
+        """Which rows are legal starting characterstics costing at most max_cost"""
+        in_range = self._in_range()
+        costs = _STAT_COST_ARRAY[
+            numpy.where(in_range[:, numpy.newaxis], self.values - _MIN_STAT, 0)
+        ].sum(axis=1, dtype=numpy.int64)
+        if fully_spent:
+            return in_range & (costs == max_cost)
+        return in_range & (costs <= max_cost)
+
+
+def _ways_to_spend(characterstic_count: int, cost: int) -> int:
+    if not -_MAX_TOTAL_COST <= cost <= _MAX_TOTAL_COST:
+        return 0
+    return int(_WAYS_TO_SPEND[characterstic_count, cost + _MAX_TOTAL_COST])
+
+
+def _total_cost_weights(max_cost: int, fully_spent: bool) -> dict[int, int]:
+    if fully_spent:
+        costs = [max_cost]
+    else:
+        costs = list(range(-_MAX_TOTAL_COST, min(max_cost, _MAX_TOTAL_COST) + 1))
+    weights = {cost: _ways_to_spend(_CHARACTERSTIC_COUNT, cost) for cost in costs}
+    if not any(weights.values()):
+        raise ValueError(f"No characterstics can be bought for {max_cost} points")
+    return weights
+
+
+def _pick_weighted(weights: dict[int, int], randrange) -> int:
+    pick = randrange(sum(weights.values()))
+    for choice, weight in weights.items():
+        if pick < weight:
+            return choice
+        pick -= weight
+    raise RuntimeError
+
+
+class CharacteristicsCostTable:
+    """Point cost of every set of characterstics in the -3 to 3 range
+
+    Each set is stored at its base 7 encoding, the characterstics in
+    iter_char_names order with strength as the most significant digit, so the
+    whole table is 7^8 (about 5.7M) int8 costs.
+    """
+
+    def __init__(self, costs: numpy.ndarray) -> None:
+        if costs.shape != (_STAT_RANGE**_CHARACTERSTIC_COUNT,):
+            raise ValueError("Cost table is the wrong size")
+        self.costs = costs
+        # how many sets there are at each cost from -_MAX_TOTAL_COST upwards
+        self._cost_counts = numpy.bincount(
+            costs.astype(numpy.int64) + _MAX_TOTAL_COST,
+            minlength=2 * _MAX_TOTAL_COST + 1,
+        )
+        self._cumulative_cost_counts = numpy.cumsum(self._cost_counts)
+
+    @classmethod
+    def build(cls) -> Self:
+        """Work out the cost of every set of characterstics"""
+        costs = _STAT_COST_ARRAY
+        for _ in range(_CHARACTERSTIC_COUNT - 1):
+            costs = (costs[:, numpy.newaxis] + _STAT_COST_ARRAY).reshape(-1)
+        return cls(costs)
+
+    @classmethod
+    def load(cls, path: Optional[str | os.PathLike] = None) -> Self:
+        """Load the table from disk, building and saving it first if needed"""
+        if path is None:
+            path = DEFAULT_COST_TABLE_PATH
+        try:
+            return cls(numpy.load(path, mmap_mode="r"))
+        except (OSError, ValueError):
+            table = cls.build()
+            table.save(path)
+            return table
+
+    def save(self, path: str | os.PathLike) -> None:
+        """Save the table to disk, replacing any old copy all at once"""
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=directory, delete=False) as temp_file:
+            numpy.save(temp_file, numpy.asarray(self.costs))
+        os.replace(temp_file.name, path)
+
+    @staticmethod
+    def encode(values: Sequence[int]) -> int:
+        """Index in the table of a set of characterstic values"""
+        index = 0
+        for value in values:
+            if not _MIN_STAT <= value < _MIN_STAT + _STAT_RANGE:
+                raise ExtremeCharactersticsError
+            index = index * _STAT_RANGE + value - _MIN_STAT
+        return index
+
+    @staticmethod
+    def decode(indices: int | numpy.ndarray) -> numpy.ndarray:
+        """Characterstic values stored at some indices of the table"""
+        indices = numpy.asarray(indices, dtype=numpy.int64)
+        values = numpy.empty(indices.shape + (_CHARACTERSTIC_COUNT,), dtype=numpy.int8)
+        for position in range(_CHARACTERSTIC_COUNT - 1, -1, -1):
+            values[..., position] = indices % _STAT_RANGE + _MIN_STAT
+            indices = indices // _STAT_RANGE
+        return values
+
+    def index_of(self, characterstics: Characteristics) -> Optional[int]:
+        """Index of some characterstics, None if any are out of range"""
+        try:
+            return self.encode(
+                [
+                    characterstics.strength,
+                    characterstics.stamina,
+                    characterstics.quickness,
+                    characterstics.dexterity,
+                    characterstics.intelligence,
+                    characterstics.perception,
+                    characterstics.presence,
+                    characterstics.communication,
+                ]
+            )
+        except ExtremeCharactersticsError:
+            return None
+
+    def arrays_costing_exactly(self, cost: int) -> numpy.ndarray:
+        """Every set of characterstic values that costs exactly cost points"""
+        return self.decode(numpy.flatnonzero(numpy.asarray(self.costs) == cost))
+
+    def count_arrays_costing_exactly(self, cost: int) -> int:
+        """Number of sets of characterstic values that cost exactly cost points"""
+        if not -_MAX_TOTAL_COST <= cost <= _MAX_TOTAL_COST:
+            return 0
+        return int(self._cost_counts[cost + _MAX_TOTAL_COST])
+
+    def count_arrays_costing_at_most(self, max_cost: int) -> int:
+        """Number of sets of characterstic values that cost max_cost points or less"""
+        if max_cost < -_MAX_TOTAL_COST:
+            return 0
+        return int(
+            self._cumulative_cost_counts[
+                min(max_cost, _MAX_TOTAL_COST) + _MAX_TOTAL_COST
+            ]
+        )
+
+
+_loaded_cost_table: Optional[CharacteristicsCostTable] = None
+# absolute path the loaded table came from
+_loaded_cost_table_path: Optional[str] = None
+
+
+def load_cost_table(
+    path: Optional[str | os.PathLike] = None,
+) -> CharacteristicsCostTable:
+    """Load the cost table so that validity checks become a single lookup
+
+    Loading the same path again gives back the table already loaded, a
+    different path replaces it.
+    """
+    global _loaded_cost_table, _loaded_cost_table_path  # pylint: disable=W0603
+    if path is None:
+        path = DEFAULT_COST_TABLE_PATH
+    absolute_path = os.path.abspath(path)
+    if _loaded_cost_table is None or _loaded_cost_table_path != absolute_path:
+        _loaded_cost_table = CharacteristicsCostTable.load(path)
+        _loaded_cost_table_path = absolute_path
+    return _loaded_cost_table
+
+
+def unload_cost_table() -> None:
+    """Go back to working out costs every time they're checked"""
+    global _loaded_cost_table, _loaded_cost_table_path  # pylint: disable=W0603
+    _loaded_cost_table = None
+    _loaded_cost_table_path = None
@@ -0,0 +1,317 @@
+"""Wound tracker that stores standard wounds as columns instead of objects"""
+
+from typing import Callable, Collection, Optional, Sequence
+import array
+import functools
+import math
+import random
+
+import pydantic
+
+from characters.parts import wound_tracker
+from lib import am5_rolls
+
+# the severities kept as columns, anything worse is rare enough to stay a model
+_COLUMN_TYPES: tuple[type[wound_tracker._StandardWound], ...] = (
+    wound_tracker.LightWound,
+    wound_tracker.MediumWound,
+    wound_tracker.HeavyWound,
+)
+
+
+class _WoundColumns:
+    """Recovery bonus and status of every wound of one severity"""
+
+    __slots__ = ("recovery_bonuses", "statuses")
+
+    def __init__(
+        self,
+        recovery_bonuses: Optional[array.array] = None,
+        statuses: Optional[array.array] = None,
+    ) -> None:
+        self.recovery_bonuses = (
+            array.array("q") if recovery_bonuses is None else recovery_bonuses
+        )
+        self.statuses = array.array("b") if statuses is None else statuses
+
+    def __len__(self) -> int:
+        return len(self.recovery_bonuses)
+
+    def append(self, recovery_bonus: int, status: wound_tracker.WoundStatus) -> None:
+        """Add one wound"""
+        self.recovery_bonuses.append(recovery_bonus)
+        self.statuses.append(status.value)
+
+    def keep_only_same(self) -> None:
+        """Drop every wound that got better or worse"""
+        same = wound_tracker.WoundStatus.SAME.value
+        kept = [index for index, status in enumerate(self.statuses) if status == same]
+        if len(kept) != len(self.statuses):
+            self.recovery_bonuses = array.array(
+                "q", [self.recovery_bonuses[index] for index in kept]
+            )
+            self.statuses = array.array("b", [same] * len(kept))
+
+
+class CompactWoundTracker(wound_tracker.WoundTracker):
+    """WoundTracker that keeps light, medium and heavy wounds as plain arrays
+
+    Each severity is just an array of recovery bonuses and an array of
+    statuses, so thousands of wounds don't mean thousands of models. Wound
+    models are only built by get_wounds, and take_damage builds one to
+    return, but they are copies and changing them doesn't change the
+    tracker. Everything else behaves exactly like WoundTracker, including
+    which rolls are made in which order.
+    """
+
+    # read straight from __pydantic_private__ wherever speed matters, going
+    # through pydantic's attribute lookup costs microseconds each time
+    _columns: dict[type[wound_tracker.Wound], _WoundColumns]
+
+    def __init__(self, size: int, *args, **kwargs):
+        super().__init__(size, *args, **kwargs)
+        self._columns = {wound_type: _WoundColumns() for wound_type in _COLUMN_TYPES}
+
+    @pydantic.computed_field
+    @property
+    def wound_bonus(self) -> int | None:
+        """Determine what the penalty to activities is based on wound state"""
+        if self.dead or self.incapacitated:
+            return None
+        return sum(
+            wound_type.bonus * len(columns)
+            for wound_type, columns in self.__pydantic_private__["_columns"].items()
+        )
+
+    @pydantic.computed_field
+    @property
+    def light_wounds(self) -> int:
+        """Number of light wounds that this character has"""
+        return len(self.__pydantic_private__["_columns"][wound_tracker.LightWound])
+
+    @pydantic.computed_field
+    @property
+    def medium_wounds(self) -> int:
+        """Number of medium wounds that this character has"""
+        return len(self.__pydantic_private__["_columns"][wound_tracker.MediumWound])
+
+    @pydantic.computed_field
+    @property
+    def heavy_wounds(self) -> int:
+        """Number of heavy wounds that this character has"""
+        return len(self.__pydantic_private__["_columns"][wound_tracker.HeavyWound])
+
+    def _add_to_column(self, wound_type: type[wound_tracker.Wound]) -> None:
+        self.__pydantic_private__["_columns"][wound_type].append(
+            0, wound_tracker.WoundStatus.SAME
+        )
+
+    # the helpers hand back copies like take_damage, the tracker only keeps
+    # the columns
+    def _add_light_wound(self) -> wound_tracker.LightWound:
+        self._add_to_column(wound_tracker.LightWound)
+        return wound_tracker.LightWound()
+
+    def _add_medium_wound(self) -> wound_tracker.MediumWound:
+        self._add_to_column(wound_tracker.MediumWound)
+        return wound_tracker.MediumWound()
+
+    def _add_heavy_wound(self) -> wound_tracker.HeavyWound:
+        self._add_to_column(wound_tracker.HeavyWound)
+        return wound_tracker.HeavyWound()
+
+    def _recovery_transitions(
+        self, wound_type: type[wound_tracker.Wound]
+    ) -> tuple[Callable, Callable]:
+        # the same transitions appending straight to the columns, so recovery
+        # doesn't build a wound to hand back every time one changes severity
+        light, medium, heavy = (
+            functools.partial(self._add_to_column, column_type)
+            for column_type in _COLUMN_TYPES
+        )
+        if wound_type is wound_tracker.LightWound:
+            return lambda: (), medium
+        elif wound_type is wound_tracker.MediumWound:
+            return light, heavy
+        elif wound_type is wound_tracker.HeavyWound:
+            return medium, self._add_incapacitating_wound
+        elif wound_type is wound_tracker.IncapacitatingWound:
+            return heavy, self._add_fatal_wound
+        return super()._recovery_transitions(wound_type)
+
+    def add_wound(self, wound: wound_tracker.Wound) -> None:
+        """Add a wound of a particular type"""
+        for wound_type, columns in self._columns.items():
+            if isinstance(wound, wound_type):
+                columns.append(wound.recovery_bonus, wound.status)
+                return
+        super().add_wound(wound)
+
+    def add_wounds(
+        self,
+        light: int = 0,
+        medium: int = 0,
+        heavy: int = 0,
+        incapacitating: int = 0,
+        fatal: int = 0,
+    ) -> None:
+        """Add new wounds of each type in one go, as taking that much damage would"""
+        for wound_type, count in zip(_COLUMN_TYPES, (light, medium, heavy)):
+            if count:
+                columns = self.__pydantic_private__["_columns"][wound_type]
+                columns.recovery_bonuses.extend([0] * count)
+                columns.statuses.extend([wound_tracker.WoundStatus.SAME.value] * count)
+        super().add_wounds(incapacitating=incapacitating, fatal=fatal)
+
+    def take_damage(self, damage: int) -> wound_tracker.Wound:
+        """Take some amount of damage and add a wound of that type
+
+        Light, medium and heavy wounds returned are copies, the tracker only
+        keeps their columns.
+        """
+        wound_level = math.ceil(damage / self._modified_size)
+        if 1 <= wound_level <= len(_COLUMN_TYPES):
+            wound_type = _COLUMN_TYPES[wound_level - 1]
+            self._add_to_column(wound_type)
+            return wound_type()
+        return super().take_damage(damage)
+
+    def get_wounds(
+        self, wound_type: type[wound_tracker.Wound]
+    ) -> list[wound_tracker.Wound]:
+        """Build copies of every wound of one type"""
+        columns = self._columns.get(wound_type)
+        if columns is None:
+            return super().get_wounds(wound_type)
+        return [
+            wound_type(
+                recovery_bonus=recovery_bonus,
+                status=wound_tracker.WoundStatus(status),
+            )
+            for recovery_bonus, status in zip(
+                columns.recovery_bonuses, columns.statuses
+            )
+        ]
+
+    def _recover_columns(
+        self,
+        wound_type: type[wound_tracker._StandardWound],
+        wound_got_better_function: Callable,
+        wound_got_worse_function: Callable,
+        recovery_bonus: int,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ],
+        rng: Optional[random.Random],
+    ) -> None:
+        # the same as _recover_all_wounds_of_one_type and the wound's heal
+        # but working on the columns
+        columns = self._columns[wound_type]
+        if recovery_roll_results is None:
+            recovery_roll_results = [None] * len(columns)
+        elif isinstance(recovery_roll_results, int):
+            recovery_roll_results = [recovery_roll_results] * len(columns)
+        worse = wound_tracker.WoundStatus.WORSE.value
+        same = wound_tracker.WoundStatus.SAME.value
+        better = wound_tracker.WoundStatus.BETTER.value
+        for index, roll_result in zip(range(len(columns)), recovery_roll_results):
+            if roll_result is None:
+                roll_result = am5_rolls.roll_stress_outcome(rng=rng)
+            if isinstance(roll_result, am5_rolls.StressRollOutcome):
+                if roll_result.botch_level:
+                    columns.statuses[index] = worse
+                    wound_got_worse_function()
+                    continue
+                roll_result = roll_result.value
+            recovery_result = roll_result + recovery_bonus
+            if recovery_result < wound_type._STABLE_EASE_FACTOR:
+                columns.statuses[index] = worse
+                wound_got_worse_function()
+            elif recovery_result < wound_type._RECOVERY_EASE_FACTOR:
+                columns.statuses[index] = same
+                columns.recovery_bonuses[index] += wound_type._STABLE_RECOVERY_BONUS
+            else:
+                columns.statuses[index] = better
+                wound_got_better_function()
+        columns.keep_only_same()
+
+    def recover_all_light_wounds(
+        self,
+        recovery_bonus: int,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """Make recovery rolls (and follow through on results) for all light wounds"""
+        self._recover_columns(
+            wound_tracker.LightWound,
+            *self._recovery_transitions(wound_tracker.LightWound),
+            recovery_bonus,
+            recovery_roll_results,
+            rng,
+        )
+
+    def recover_all_medium_wounds(
+        self,
+        recovery_bonus: int,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """Make recovery rolls (and follow through on results) for all medium wounds"""
+        self._recover_columns(
+            wound_tracker.MediumWound,
+            *self._recovery_transitions(wound_tracker.MediumWound),
+            recovery_bonus,
+            recovery_roll_results,
+            rng,
+        )
+
+    def recover_all_heavy_wounds(
+        self,
+        recovery_bonus: int,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        """Make recovery rolls (and follow through on results) for all heavy wounds"""
+        self._recover_columns(
+            wound_tracker.HeavyWound,
+            *self._recovery_transitions(wound_tracker.HeavyWound),
+            recovery_bonus,
+            recovery_roll_results,
+            rng,
+        )
+
+    def apply_recovery_statuses(
+        self, wound_type: type[wound_tracker.Wound], statuses: Collection[int]
+    ) -> None:
+        """Follow through on recovery results worked out somewhere else"""
+        columns = self.__pydantic_private__["_columns"].get(wound_type)
+        if columns is None:
+            super().apply_recovery_statuses(wound_type, statuses)
+            return
+        if len(statuses) != len(columns):
+            raise ValueError(f"{len(columns)} wounds but {len(statuses)} statuses")
+        same = wound_tracker.WoundStatus.SAME.value
+        better = wound_tracker.WoundStatus.BETTER.value
+        better_count = sum(1 for status in statuses if status == better)
+        stable_recovery_bonus = wound_type._STABLE_RECOVERY_BONUS
+        columns.recovery_bonuses = array.array(
+            "q",
+            [
+                recovery_bonus + stable_recovery_bonus
+                for recovery_bonus, status in zip(columns.recovery_bonuses, statuses)
+                if status == same
+            ],
+        )
+        columns.statuses = array.array("b", bytes(len(columns.recovery_bonuses)))
+        got_better, got_worse = self._recovery_transitions(wound_type)
+        for _ in range(better_count):
+            got_better()
+        # whatever didn't stay the same or get better got worse
+        for _ in range(len(statuses) - len(columns.recovery_bonuses) - better_count):
+            got_worse()
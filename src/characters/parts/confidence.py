@@ -3,8 +3,10 @@
 from typing import Self
 import pydantic
 
+from lib import batch_update
 
-class Confidence(pydantic.BaseModel):
+
+class Confidence(batch_update.BatchUpdateModel):
     """Confidence points implementation as a class"""
 
     model_config = pydantic.ConfigDict(validate_assignment=True)
@@ -1,39 +1,130 @@
 """Fatigue is tracekd via fatigue levels ArM5(178)"""
 
-from typing import Literal
+from typing import Any, Iterable, Literal, NamedTuple, Optional
 import datetime
+import functools
 
 import pydantic
 
+from lib import batch_update
+
 
 class NoFatigueToRecoverError(Exception):
     """Exception to be raised when we try to recover but there's no fatigue levels to recover"""
 
 
-class FatigueTracker(pydantic.BaseModel):
+# indexed by total fatigue levels, anything past the end is the same as the last
+_FATIGUE_BONUSES: tuple[int | bool, ...] = (0, 0, -1, -3, -5, False)
+_FATIGUE_LEVEL_NAMES: tuple[
+    Literal["Fresh", "Winded", "Weary", "Tired", "Dazed", "Unconscious"], ...
+] = ("Fresh", "Winded", "Weary", "Tired", "Dazed", "Unconscious")
+# time to recover one short term level indexed by total fatigue levels, past the
+# end of the table it's an hour for every level over 3
+_SHORT_TERM_RECOVERY_TIMES: tuple[Optional[datetime.timedelta], ...] = (
+    None,
+    datetime.timedelta(minutes=2),
+    datetime.timedelta(minutes=10),
+    datetime.timedelta(minutes=30),
+) + tuple(datetime.timedelta(hours=levels - 3) for levels in range(4, 16))
+
+
+class _DerivedFatigue(NamedTuple):
+    bonus: int | bool
+    fatigue_level: Literal["Fresh", "Winded", "Weary", "Tired", "Dazed", "Unconscious"]
+    short_term_recovery_time: Optional[datetime.timedelta]
+
+
+class FatigueRecoveryStep(NamedTuple):
+    """When one more short term fatigue level is recovered and what is left"""
+
+    time: datetime.datetime
+    short_term_levels: int
+    long_term_levels: int
+    fatigue_level: Literal["Fresh", "Winded", "Weary", "Tired", "Dazed", "Unconscious"]
+
+
+def _short_term_recovery_time(
+    total_fatigue_levels: int,
+) -> Optional[datetime.timedelta]:
+    if total_fatigue_levels < len(_SHORT_TERM_RECOVERY_TIMES):
+        return _SHORT_TERM_RECOVERY_TIMES[total_fatigue_levels]
+    return datetime.timedelta(hours=total_fatigue_levels - 3)
+
+
+@functools.lru_cache(maxsize=None)
+def _recovery_offsets(
+    short_term_levels: int, long_term_levels: int
+) -> tuple[tuple[datetime.timedelta, int, str], ...]:
+    # (time since the start, short term levels left, fatigue level) for each
+    # short term level recovered
+    offsets = []
+    elapsed = datetime.timedelta()
+    for remaining in range(short_term_levels - 1, -1, -1):
+        elapsed += _short_term_recovery_time(remaining + 1 + long_term_levels)
+        total_fatigue_levels = remaining + long_term_levels
+        offsets.append(
+            (
+                elapsed,
+                remaining,
+                _FATIGUE_LEVEL_NAMES[
+                    min(total_fatigue_levels, len(_FATIGUE_LEVEL_NAMES) - 1)
+                ],
+            )
+        )
+    return tuple(offsets)
+
+
+class FatigueTracker(batch_update.BatchUpdateModel):
     """Class to track fatigue levels"""
 
     model_config = pydantic.ConfigDict(validate_assignment=True)
     short_term_levels: int = pydantic.Field(default=0, ge=0)
     long_term_levels: int = pydantic.Field(default=0, ge=0)
+    # worked out from the levels the first time it's needed after they change,
+    # it's read straight out of the private attributes since going through
+    # pydantic for it costs more than working it out
+    _derived: Optional[_DerivedFatigue] = pydantic.PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        super().__setattr__(name, value)
+        if name in ("short_term_levels", "long_term_levels"):
+            self.__pydantic_private__["_derived"] = None
+
+    def _fields_replaced(self) -> None:
+        self.__pydantic_private__["_derived"] = None
+
+    def model_copy(
+        self, *, update: Optional[dict[str, Any]] = None, deep: bool = False
+    ) -> "FatigueTracker":
+        """Copy the tracker, working the derived values out again for the copy
+
+        Updates go straight into the copy without __setattr__, so the
+        cached values could be for the wrong levels otherwise.
+        """
+        copy = super().model_copy(update=update, deep=deep)
+        copy.__pydantic_private__["_derived"] = None
+        return copy
+
+    def _derive(self) -> _DerivedFatigue:
+        total_fatigue_levels = self.short_term_levels + self.long_term_levels
+        if total_fatigue_levels < 0:
+            raise ValueError("Total fatigue levels are negative")
+        derived = _DerivedFatigue(
+            _FATIGUE_BONUSES[min(total_fatigue_levels, len(_FATIGUE_BONUSES) - 1)],
+            _FATIGUE_LEVEL_NAMES[
+                min(total_fatigue_levels, len(_FATIGUE_LEVEL_NAMES) - 1)
+            ],
+            _short_term_recovery_time(total_fatigue_levels),
+        )
+        self.__pydantic_private__["_derived"] = derived
+        return derived
 
     @pydantic.computed_field
     @property
     def bonus(self) -> int | bool:
         """Cumulative penalty inflicted due to fatigue levels"""
-        total_fatigue_levels = self.short_term_levels + self.long_term_levels
-        if total_fatigue_levels <= 1:
-            return 0
-        elif total_fatigue_levels == 2:
-            return -1
-        elif total_fatigue_levels == 3:
-            return -3
-        elif total_fatigue_levels == 4:
-            return -5
-        elif total_fatigue_levels >= 5:
-            return False
-        else:
-            raise RuntimeError
+        derived = self.__pydantic_private__["_derived"] or self._derive()
+        return derived.bonus
 
     @pydantic.computed_field
     @property
@@ -41,37 +132,46 @@ class FatigueTracker(pydantic.BaseModel):
         self,
     ) -> Literal["Fresh", "Winded", "Weary", "Tired", "Dazed", "Unconscious"]:
         """Human understandable fatigue level based on overall level of fatigue"""
-        total_fatigue_levels = self.short_term_levels + self.long_term_levels
-        if total_fatigue_levels == 0:
-            return "Fresh"
-        elif total_fatigue_levels == 1:
-            return "Winded"
-        elif total_fatigue_levels == 2:
-            return "Weary"
-        elif total_fatigue_levels == 3:
-            return "Tired"
-        elif total_fatigue_levels == 4:
-            return "Dazed"
-        elif total_fatigue_levels >= 5:
-            return "Unconscious"
-        else:
-            raise ValueError("Total fatigue levels are negative")
+        derived = self.__pydantic_private__["_derived"] or self._derive()
+        return derived.fatigue_level
 
     def get_short_term_recovery_time(self) -> datetime.timedelta:
         """Calculate the time to recover a single fatigue level at the current level"""
         if self.short_term_levels == 0:
             # if we have no short term fatigue levels then we can't recover any
             raise NoFatigueToRecoverError
-        else:
-            total_fatigue_levels = self.short_term_levels + self.long_term_levels
-            if total_fatigue_levels == 1:
-                recovery_time = datetime.timedelta(minutes=2)
-            elif total_fatigue_levels == 2:
-                recovery_time = datetime.timedelta(minutes=10)
-            elif total_fatigue_levels == 3:
-                recovery_time = datetime.timedelta(minutes=30)
-            elif total_fatigue_levels > 3:
-                recovery_time = datetime.timedelta(hours=total_fatigue_levels - 3)
-            else:
-                raise NoFatigueToRecoverError
-        return recovery_time
+        derived = self.__pydantic_private__["_derived"] or self._derive()
+        return derived.short_term_recovery_time
+
+    def recovery_schedule(self, start: datetime.datetime) -> list[FatigueRecoveryStep]:
+        """When each short term level will be recovered resting from start
+
+        Works out the whole timeline at once without changing the tracker,
+        the last step is when only long term fatigue is left.
+        """
+        return [
+            FatigueRecoveryStep(
+                start + elapsed, remaining, self.long_term_levels, fatigue_level
+            )
+            for elapsed, remaining, fatigue_level in _recovery_offsets(
+                self.short_term_levels, self.long_term_levels
+            )
+        ]
+
+
+def recovery_schedules(
+    trackers: Iterable[FatigueTracker], start: datetime.datetime
+) -> list[list[FatigueRecoveryStep]]:
+    """Recovery schedules for many trackers all resting from the same time
+
+    Trackers with the same fatigue levels share one worked out timeline.
+    """
+    schedules = []
+    by_levels: dict[tuple[int, int], list[FatigueRecoveryStep]] = {}
+    for tracker in trackers:
+        levels = (tracker.short_term_levels, tracker.long_term_levels)
+        schedule = by_levels.get(levels)
+        if schedule is None:
+            schedule = by_levels[levels] = tracker.recovery_schedule(start)
+        schedules.append(list(schedule))
+    return schedules
@@ -0,0 +1,260 @@
+"""Exact forecasts of how a character's wounds will heal"""
+
+from typing import NamedTuple, Optional
+import datetime
+import functools
+import heapq
+
+import numpy
+from dateutil import relativedelta
+
+from characters.parts import wound_tracker
+from lib import am5_distributions
+
+# wound states in transition matrix order, followed by healed and dead which
+# never change once reached
+SEVERITIES: tuple[type[wound_tracker._StandardWound], ...] = (
+    wound_tracker.LightWound,
+    wound_tracker.MediumWound,
+    wound_tracker.HeavyWound,
+    wound_tracker.IncapacitatingWound,
+)
+HEALED = len(SEVERITIES)
+DEAD = HEALED + 1
+
+_PERIODS: tuple[relativedelta.relativedelta, ...] = tuple(
+    wound_type.model_fields["recovery_period"].default for wound_type in SEVERITIES
+)
+
+# the same periods in 12 hour ticks with months taken as 30.5 days, so
+# paths through wounds that keep changing severity meet up again
+_TICK = datetime.timedelta(hours=12)
+_TICK_PERIODS: tuple[int, ...] = (14, 61, 183, 1)
+
+# pending probability below this is dropped when following wounds forever
+DEFAULT_TOLERANCE = 1e-9
+
+
+class WoundOutcomes(NamedTuple):
+    """Chance of (or expected number of wounds) ending up in each state"""
+
+    light: float
+    medium: float
+    heavy: float
+    incapacitating: float
+    healed: float
+    dead: float
+
+
+class HealingForecast(NamedTuple):
+    """Where a character's wounds are likely to be at some time"""
+
+    fully_healed: float
+    dead: float
+    # outcomes for one wound that started at each severity the character has
+    wounds: dict[type[wound_tracker.Wound], WoundOutcomes]
+    expected_wounds: WoundOutcomes
+
+
+@functools.lru_cache(maxsize=None)
+def transition_matrix(recovery_bonus: int = 0) -> numpy.ndarray:
+    """Chance of a wound moving between states on one recovery roll
+
+    Rows and columns are light, medium, heavy and incapacitating wounds and
+    then healed and dead. Recovery rolls are stress rolls with one botch die
+    plus recovery_bonus, scored against the ease factors of each wound type
+    exactly as healing scores them.
+    """
+    distribution = am5_distributions.stress_roll_distribution(1, recovery_bonus)
+    matrix = numpy.zeros((DEAD + 1, DEAD + 1))
+    for state, wound_type in enumerate(SEVERITIES):
+        better = distribution.probability_of_success(wound_type._RECOVERY_EASE_FACTOR)
+        not_worse = distribution.probability_of_success(wound_type._STABLE_EASE_FACTOR)
+        matrix[state, state - 1 if state else HEALED] += better
+        matrix[state, state] += not_worse - better
+        matrix[state, state + 1 if state + 1 < HEALED else DEAD] += 1 - not_worse
+    matrix[HEALED, HEALED] = 1.0
+    matrix[DEAD, DEAD] = 1.0
+    matrix.setflags(write=False)
+    return matrix
+
+
+def chance_of_healing(
+    wound_type: type[wound_tracker._StandardWound], recovery_bonus: int = 0
+) -> float:
+    """Chance that a wound eventually heals rather than killing the character"""
+    matrix = transition_matrix(recovery_bonus)
+    transient = numpy.eye(HEALED) - matrix[:HEALED, :HEALED]
+    absorbed = numpy.linalg.solve(transient, matrix[:HEALED, HEALED:])
+    return float(absorbed[SEVERITIES.index(wound_type), 0])
+
+
+@functools.lru_cache(maxsize=256)
+def _wound_timeline(
+    state: int,
+    start: datetime.datetime,
+    until: datetime.datetime,
+    recovery_bonus: int,
+) -> tuple[float, float, tuple[float, ...]]:
+    # follow one wound roll by roll up to until, merging every path that
+    # reaches the same severity at the same time, and return the chance it
+    # healed, the chance it killed and the chance of each severity at until
+    rows = transition_matrix(recovery_bonus).tolist()
+    pending: dict[datetime.datetime, list[float]] = {}
+    times: list[datetime.datetime] = []
+
+    def wait(time: datetime.datetime, severity: int, chance: float) -> None:
+        time += _PERIODS[severity]
+        chances = pending.get(time)
+        if chances is None:
+            chances = pending[time] = [0.0] * HEALED
+            heapq.heappush(times, time)
+        chances[severity] += chance
+
+    wait(start, state, 1.0)
+    healed = 0.0
+    dead = 0.0
+    while times and times[0] <= until:
+        time = heapq.heappop(times)
+        for severity, chance in enumerate(pending.pop(time)):
+            if not chance:
+                continue
+            for next_state, probability in enumerate(rows[severity]):
+                if not probability:
+                    continue
+                if next_state == HEALED:
+                    healed += chance * probability
+                elif next_state == DEAD:
+                    dead += chance * probability
+                else:
+                    wait(time, next_state, chance * probability)
+    severities = [0.0] * HEALED
+    for chances in pending.values():
+        for severity, chance in enumerate(chances):
+            severities[severity] += chance
+    return healed, dead, tuple(severities)
+
+
+@functools.lru_cache(maxsize=64)
+def _healing_ticks(state: int, recovery_bonus: int, tolerance: float) -> list[float]:
+    # chance of the wound healing at each tick, followed until less than
+    # tolerance is left unresolved
+    rows = transition_matrix(recovery_bonus).tolist()
+    moves = [
+        [
+            (next_state, probability)
+            for next_state, probability in enumerate(row)
+            if probability
+        ]
+        for row in rows[:HEALED]
+    ]
+    # chance of rolling at each severity on each tick, kept in a ring
+    # since nothing is ever further ahead than the longest period
+    size = max(_TICK_PERIODS) + 1
+    pending = [[0.0] * size for _ in range(HEALED)]
+    pending[state][_TICK_PERIODS[state]] = 1.0
+    healed: list[float] = []
+    unresolved = 1.0
+    tick = 0
+    while unresolved >= tolerance:
+        slot = tick % size
+        healed_now = 0.0
+        for severity in range(HEALED):
+            chance = pending[severity][slot]
+            if not chance:
+                continue
+            pending[severity][slot] = 0.0
+            for next_state, probability in moves[severity]:
+                if next_state == HEALED:
+                    healed_now += chance * probability
+                elif next_state == DEAD:
+                    unresolved -= chance * probability
+                else:
+                    pending[next_state][(tick + _TICK_PERIODS[next_state]) % size] += (
+                        chance * probability
+                    )
+        healed.append(healed_now)
+        unresolved -= healed_now
+        tick += 1
+    return healed
+
+
+def _wound_counts(tracker: wound_tracker.WoundTracker) -> list[int]:
+    return [
+        tracker.light_wounds,
+        tracker.medium_wounds,
+        tracker.heavy_wounds,
+        int(tracker.incapacitated),
+    ]
+
+
+def forecast(
+    tracker: wound_tracker.WoundTracker,
+    start: datetime.datetime,
+    until: datetime.datetime,
+    recovery_bonus: int = 0,
+) -> HealingForecast:
+    """Exact chances of where a character's wounds will be at until
+
+    Every wound is taken to have just been suffered (or just rolled for) at
+    start and then recovers on its own clock, rolling each time its
+    recovery period runs out as ArM5 describes. Wounds recover
+    independently, so the whole forecast is built from the Markov chain of
+    a single wound. RecoveryScheduler shares one deadline between wounds of
+    the same severity, so it only matches this exactly for one wound.
+    """
+    if tracker.dead:
+        return HealingForecast(0.0, 1.0, {}, WoundOutcomes(0, 0, 0, 0, 0, 0))
+    fully_healed = 1.0
+    alive = 1.0
+    wounds = {}
+    expected = [0.0] * (DEAD + 1)
+    for state, count in enumerate(_wound_counts(tracker)):
+        if not count:
+            continue
+        healed, dead, severities = _wound_timeline(state, start, until, recovery_bonus)
+        outcomes = WoundOutcomes(*severities, healed, dead)
+        wounds[SEVERITIES[state]] = outcomes
+        fully_healed *= healed**count
+        alive *= (1 - dead) ** count
+        for index, chance in enumerate(outcomes):
+            expected[index] += count * chance
+    return HealingForecast(fully_healed, 1 - alive, wounds, WoundOutcomes(*expected))
+
+
+def expected_time_to_full_health(
+    tracker: wound_tracker.WoundTracker,
+    start: datetime.datetime,
+    recovery_bonus: int = 0,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> Optional[datetime.timedelta]:
+    """Expected time until every wound has healed, given that they all do
+
+    Wounds can go back and forth between heavy and incapacitating for
+    years, and calendar months send every path to a different time, so
+    months are taken as 30.5 days here. Paths still unresolved once less
+    than tolerance of the probability is left are dropped. None if the
+    character is already dead.
+    """
+    if tracker.dead:
+        return None
+    # chance that every wound has healed by each tick, given that they all do
+    all_healed = numpy.ones(1)
+    for state, count in enumerate(_wound_counts(tracker)):
+        if not count:
+            continue
+        healed = numpy.cumsum(_healing_ticks(state, recovery_bonus, tolerance))
+        if not healed[-1]:
+            return None
+        healed /= healed[-1]
+        if len(healed) > len(all_healed):
+            all_healed = numpy.pad(
+                all_healed, (0, len(healed) - len(all_healed)), "edge"
+            )
+        else:
+            healed = numpy.pad(healed, (0, len(all_healed) - len(healed)), "edge")
+        all_healed *= healed**count
+    ticks = float(
+        numpy.sum(numpy.arange(len(all_healed)) * numpy.diff(all_healed, prepend=0.0))
+    )
+    return ticks * _TICK
@@ -1,10 +1,16 @@
 """Reputation is how well known you are ArM5(19)"""
 
-from typing import Self
+from typing import Any, Callable, Optional, Self
 import pydantic
 
+from lib import am5_advancement
+from lib import batch_update
 
-class Reputation(pydantic.BaseModel):
+# called with the reputation, its old score and its new score
+ScoreListener = Callable[["Reputation", int, int], None]
+
+
+class Reputation(batch_update.BatchUpdateModel):
     """Reputation implementation class"""
 
     model_config = pydantic.ConfigDict(validate_assignment=True)
@@ -12,6 +18,7 @@ class Reputation(pydantic.BaseModel):
     deeds: int = pydantic.Field(default=0, ge=0)
     content: str
     target: str
+    _score_listeners: list[ScoreListener] = pydantic.PrivateAttr(default_factory=list)
 
     @pydantic.model_validator(mode="after")
     def max_deeds(self) -> Self:
@@ -20,10 +27,43 @@ class Reputation(pydantic.BaseModel):
         assert self.deeds < 5 * (self.score + 1)
         return self
 
+    def __copy__(self) -> Self:
+        # listeners are registered against this reputation, a copy starts unheard
+        copy = super().__copy__()
+        copy.__pydantic_private__["_score_listeners"] = []
+        return copy
+
+    def __deepcopy__(self, memo: Optional[dict[int, Any]] = None) -> Self:
+        # stand an empty list in for the listeners so deepcopy doesn't copy
+        # them and whatever store they're bound to
+        memo = {} if memo is None else memo
+        memo[id(self.__pydantic_private__["_score_listeners"])] = []
+        return super().__deepcopy__(memo)
+
     def add_deeds(self, deeds_gained: int) -> None:
         """Function to safely add deeds and increase reputation score if needed"""
-        new_deeds = self.deeds + deeds_gained
-        while new_deeds >= 5 * (self.score + 1):
-            self.score += 1
-            new_deeds = new_deeds - 5 * self.score
-        self.deeds = new_deeds
+        new_score, new_deeds = am5_advancement.advance(
+            self.score, self.deeds, deeds_gained
+        )
+        self.set_progress(new_score, new_deeds)
+
+    def set_progress(self, score: int, deeds: int) -> None:
+        """Set score and deeds together, telling listeners if the score changed"""
+        old_score = self.score
+        if score == old_score:
+            self.deeds = deeds
+            return
+        # both change together so validate them once as a pair
+        with self.batch_update():
+            self.score = score
+            self.deeds = deeds
+        for listener in self._score_listeners:
+            listener(self, old_score, score)
+
+    def add_score_listener(self, listener: ScoreListener) -> None:
+        """Call listener every time add_deeds or set_progress changes the score"""
+        self._score_listeners.append(listener)
+
+    def remove_score_listener(self, listener: ScoreListener) -> None:
+        """Stop calling a listener added with add_score_listener"""
+        self._score_listeners.remove(listener)
@@ -0,0 +1,297 @@
+"""Lossless binary snapshots of wound trackers that load without validation"""
+
+from typing import Any, Iterable, Optional
+import array
+import os
+import struct
+import sys
+
+import pydantic
+import pydantic_core
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_tracker
+
+_MAGIC = b"AM5WND01"
+# magic followed by the number of trackers and the number of wounds in columns
+_HEADER = struct.Struct("<8sQQ")
+# modified size, light, medium and heavy wound counts, flags, incapacitating
+# wound status and recovery bonus, fatal wound status
+_TRACKER = struct.Struct("<qIIIBbqb")
+_COMPACT = 1
+_INCAPACITATED = 2
+_DEAD = 4
+
+_SEVERITIES: tuple[type[wound_tracker._StandardWound], ...] = (
+    wound_tracker.LightWound,
+    wound_tracker.MediumWound,
+    wound_tracker.HeavyWound,
+)
+_STATUSES = {status.value: status for status in wound_tracker.WoundStatus}
+# reading .value goes through enum's descriptor, which is slow per wound
+_STATUS_VALUES = {status: status.value for status in wound_tracker.WoundStatus}
+# columns are written little endian whatever machine wrote them
+_SWAP_BYTES = sys.byteorder != "little"
+# a snapshot only records whether a tracker was compact
+_TRACKER_TYPES = (wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker)
+
+
+class CorruptWoundSnapshotError(Exception):
+    """Exception raised when data isn't a wound tracker snapshot"""
+
+
+def pack_trackers(trackers: Iterable[wound_tracker.WoundTracker]) -> bytes:
+    """Everything about each tracker packed into one fixed width snapshot
+
+    Unlike model_dump this keeps every wound's recovery bonus and status and
+    the tracker's size, so unpack_trackers gives back trackers that behave
+    exactly like the originals. CompactWoundTrackers come back compact.
+    Other WoundTracker subclasses would come back as one of those two, so
+    they raise TypeError instead.
+    A fixed width record for each tracker is followed by the recovery
+    bonuses (int64) and then the statuses (int8) of every light, medium and
+    heavy wound, tracker by tracker in order of severity.
+    """
+    records = []
+    recovery_bonuses = array.array("q")
+    statuses = array.array("b")
+    # wound models are gathered up so their columns are built in one go
+    wounds: list[wound_tracker.Wound] = []
+    for tracker in trackers:
+        tracker_type = type(tracker)
+        if tracker_type not in _TRACKER_TYPES:
+            raise TypeError(f"Can't snapshot a {tracker_type.__name__}")
+        private = tracker.__pydantic_private__
+        incapacitating: Optional[wound_tracker.IncapacitatingWound] = private[
+            "_incapacitating_wound"
+        ]
+        fatal: Optional[wound_tracker.FatalWound] = private["_fatal_wound"]
+        flags = (_INCAPACITATED if incapacitating else 0) | (_DEAD if fatal else 0)
+        if tracker_type is compact_wound_tracker.CompactWoundTracker:
+            flags |= _COMPACT
+            if wounds:
+                recovery_bonuses.fromlist([wound.recovery_bonus for wound in wounds])
+                statuses.fromlist([_STATUS_VALUES[wound.status] for wound in wounds])
+                wounds = []
+            counts = []
+            for wound_type in _SEVERITIES:
+                columns = private["_columns"][wound_type]
+                recovery_bonuses.extend(columns.recovery_bonuses)
+                statuses.extend(columns.statuses)
+                counts.append(len(columns))
+        else:
+            light = private["_light_wounds"]
+            medium = private["_medium_wounds"]
+            heavy = private["_heavy_wounds"]
+            wounds += light
+            wounds += medium
+            wounds += heavy
+            counts = [len(light), len(medium), len(heavy)]
+        records.append(
+            _TRACKER.pack(
+                private["_modified_size"],
+                *counts,
+                flags,
+                _STATUS_VALUES[incapacitating.status] if incapacitating else 0,
+                incapacitating.recovery_bonus if incapacitating else 0,
+                _STATUS_VALUES[fatal.status] if fatal else 0,
+            )
+        )
+    recovery_bonuses.fromlist([wound.recovery_bonus for wound in wounds])
+    statuses.fromlist([_STATUS_VALUES[wound.status] for wound in wounds])
+    if _SWAP_BYTES:
+        recovery_bonuses.byteswap()
+    return b"".join(
+        [
+            _HEADER.pack(_MAGIC, len(records), len(statuses)),
+            *records,
+            recovery_bonuses.tobytes(),
+            statuses.tobytes(),
+        ]
+    )
+
+
+def _private_defaults(model_type: type[pydantic.BaseModel]) -> dict[str, Any]:
+    # the private attributes a new model of the type starts with
+    defaults = {}
+    for name, private_attribute in model_type.__private_attributes__.items():
+        default = private_attribute.get_default()
+        if default is not pydantic_core.PydanticUndefined:
+            defaults[name] = default
+    return defaults
+
+
+def _new_model(model_type: type, fields: dict, private: dict):
+    # what model_construct ends up with, minus copying every default and
+    # running the post init hooks, which cost more than the rest of loading
+    model = model_type.__new__(model_type)
+    object.__setattr__(model, "__dict__", fields)
+    object.__setattr__(model, "__pydantic_fields_set__", set())
+    object.__setattr__(model, "__pydantic_extra__", None)
+    object.__setattr__(model, "__pydantic_private__", private)
+    return model
+
+
+def _new_wound(
+    wound_type: type[wound_tracker.Wound],
+    recovery_bonus: Optional[int],
+    status: wound_tracker.WoundStatus,
+) -> wound_tracker.Wound:
+    return _new_model(
+        wound_type,
+        {
+            "status": status,
+            "recovery_bonus": recovery_bonus,
+            "recovery_period": wound_type.model_fields["recovery_period"].default,
+        },
+        _private_defaults(wound_type),
+    )
+
+
+def unpack_trackers(data: bytes) -> list[wound_tracker.WoundTracker]:
+    """Trackers from a snapshot made by pack_trackers
+
+    The snapshot is trusted, neither trackers nor wounds are validated.
+    Wounds share their (frozen) recovery period with the field default.
+    """
+    view = memoryview(data)
+    try:
+        magic, count, wound_count = _HEADER.unpack_from(view)
+    except struct.error as error:
+        raise CorruptWoundSnapshotError("Too short to be a wound snapshot") from error
+    if magic != _MAGIC:
+        raise CorruptWoundSnapshotError("Not a wound snapshot")
+    records_end = _HEADER.size + count * _TRACKER.size
+    recovery_bonuses_end = records_end + 8 * wound_count
+    if recovery_bonuses_end + wound_count != len(view):
+        raise CorruptWoundSnapshotError("Wound snapshot is the wrong size")
+    recovery_bonuses = array.array("q")
+    recovery_bonuses.frombytes(view[records_end:recovery_bonuses_end])
+    if _SWAP_BYTES:
+        recovery_bonuses.byteswap()
+    statuses = array.array("b")
+    statuses.frombytes(view[recovery_bonuses_end:])
+    # wound models need plain values, compact trackers slice the arrays
+    recovery_bonus_list = recovery_bonuses.tolist()
+    try:
+        status_list = [_STATUSES[status] for status in statuses]
+    except KeyError as error:
+        raise CorruptWoundSnapshotError("Wound snapshot is damaged") from error
+
+    light_type, medium_type, heavy_type = _SEVERITIES
+    light_bonus, medium_bonus, heavy_bonus = (
+        wound_type.bonus for wound_type in _SEVERITIES
+    )
+    periods = [
+        wound_type.model_fields["recovery_period"].default for wound_type in _SEVERITIES
+    ]
+    # private defaults are worked out once a type and copied for each model,
+    # every tracker gets its own wound lists below instead of sharing these
+    wound_private = [_private_defaults(wound_type) for wound_type in _SEVERITIES]
+    tracker_private = {
+        tracker_type: _private_defaults(tracker_type) for tracker_type in _TRACKER_TYPES
+    }
+    new_model = _new_model
+    new_columns = compact_wound_tracker._WoundColumns
+    trackers: list[wound_tracker.WoundTracker] = []
+    start = 0
+    try:
+        for (
+            modified_size,
+            light,
+            medium,
+            heavy,
+            flags,
+            incapacitating_status,
+            incapacitating_bonus,
+            fatal_status,
+        ) in _TRACKER.iter_unpack(view[_HEADER.size : records_end]):
+            tracker_type: type = (
+                compact_wound_tracker.CompactWoundTracker
+                if flags & _COMPACT
+                else wound_tracker.WoundTracker
+            )
+            private = {
+                **tracker_private[tracker_type],
+                "_modified_size": modified_size,
+                "_light_wounds": [],
+                "_medium_wounds": [],
+                "_heavy_wounds": [],
+                "_incapacitating_wound": (
+                    _new_wound(
+                        wound_tracker.IncapacitatingWound,
+                        incapacitating_bonus,
+                        _STATUSES[incapacitating_status],
+                    )
+                    if flags & _INCAPACITATED
+                    else None
+                ),
+                "_fatal_wound": (
+                    _new_wound(wound_tracker.FatalWound, None, _STATUSES[fatal_status])
+                    if flags & _DEAD
+                    else None
+                ),
+                "_wound_bonus_total": light * light_bonus
+                + medium * medium_bonus
+                + heavy * heavy_bonus,
+            }
+            if flags & _COMPACT:
+                tracker_columns = {}
+                for wound_type, wounds in (
+                    (light_type, light),
+                    (medium_type, medium),
+                    (heavy_type, heavy),
+                ):
+                    end = start + wounds
+                    tracker_columns[wound_type] = new_columns(
+                        recovery_bonuses[start:end], statuses[start:end]
+                    )
+                    start = end
+                private["_columns"] = tracker_columns
+                # compact trackers sum their columns instead of keeping a total
+                private["_wound_bonus_total"] = 0
+            else:
+                for name, wound_type, period, defaults, wounds in zip(
+                    ("_light_wounds", "_medium_wounds", "_heavy_wounds"),
+                    _SEVERITIES,
+                    periods,
+                    wound_private,
+                    (light, medium, heavy),
+                ):
+                    if wounds:
+                        end = start + wounds
+                        private[name] = [
+                            new_model(
+                                wound_type,
+                                {
+                                    "status": status,
+                                    "recovery_bonus": recovery_bonus,
+                                    "recovery_period": period,
+                                },
+                                defaults.copy(),
+                            )
+                            for recovery_bonus, status in zip(
+                                recovery_bonus_list[start:end], status_list[start:end]
+                            )
+                        ]
+                        start = end
+            trackers.append(new_model(tracker_type, {}, private))
+    except KeyError as error:
+        raise CorruptWoundSnapshotError("Wound snapshot is damaged") from error
+    if start != wound_count:
+        raise CorruptWoundSnapshotError("Wound snapshot is damaged")
+    return trackers
+
+
+def save_snapshot(
+    path: str | os.PathLike, trackers: Iterable[wound_tracker.WoundTracker]
+) -> None:
+    """Write a snapshot of trackers to a file"""
+    with open(path, "wb") as snapshot_file:
+        snapshot_file.write(pack_trackers(trackers))
+
+
+def load_snapshot(path: str | os.PathLike) -> list[wound_tracker.WoundTracker]:
+    """Read trackers back from a snapshot file"""
+    with open(path, "rb") as snapshot_file:
+        return unpack_trackers(snapshot_file.read())
@@ -1,15 +1,16 @@
 """Wounding is the consequence of damage Arm5(178-180)"""
 
-from typing import Optional, Callable, Sequence, ClassVar
+from typing import Optional, Callable, Collection, Sequence, ClassVar
 import math
 import enum
-import datetime
 import abc
+import random
 from dateutil import relativedelta
 
 import pydantic
 
 from lib import am5_rolls
+from lib import batch_update
 
 
 class WoundStatus(enum.Enum):
@@ -20,7 +21,7 @@ class WoundStatus(enum.Enum):
     BETTER = 1
 
 
-class Wound(pydantic.BaseModel, abc.ABC):
+class Wound(batch_update.BatchUpdateModel, abc.ABC):
     """Basic wound"""
 
     model_config = pydantic.ConfigDict(
@@ -71,7 +72,7 @@ class LightWound(_StandardWound):
     _STABLE_EASE_FACTOR: ClassVar[int] = 4
     _RECOVERY_EASE_FACTOR: ClassVar[int] = 10
     _STABLE_RECOVERY_BONUS: ClassVar[int] = 3
-    recovery_period: datetime.timedelta = pydantic.Field(
+    recovery_period: relativedelta.relativedelta = pydantic.Field(
         default=relativedelta.relativedelta(weeks=1), init_var=False, frozen=True
     )
 
@@ -83,7 +84,7 @@ class MediumWound(_StandardWound):
     _STABLE_EASE_FACTOR: ClassVar[int] = 6
     _RECOVERY_EASE_FACTOR: ClassVar[int] = 12
     _STABLE_RECOVERY_BONUS: ClassVar[int] = 3
-    recovery_period: datetime.timedelta = pydantic.Field(
+    recovery_period: relativedelta.relativedelta = pydantic.Field(
         default=relativedelta.relativedelta(months=1), init_var=False, frozen=True
     )
 
@@ -95,7 +96,7 @@ class HeavyWound(_StandardWound):
     _STABLE_EASE_FACTOR: ClassVar[int] = 9
     _RECOVERY_EASE_FACTOR: ClassVar[int] = 15
     _STABLE_RECOVERY_BONUS: ClassVar[int] = 3
-    recovery_period: datetime.timedelta = pydantic.Field(
+    recovery_period: relativedelta.relativedelta = pydantic.Field(
         default=relativedelta.relativedelta(months=3), init_var=False, frozen=True
     )
 
@@ -107,7 +108,7 @@ class IncapacitatingWound(_StandardWound):
     _STABLE_EASE_FACTOR: ClassVar[int] = 0
     _RECOVERY_EASE_FACTOR: ClassVar[int] = 9
     _STABLE_RECOVERY_BONUS: ClassVar[int] = -1
-    recovery_period: datetime.timedelta = pydantic.Field(
+    recovery_period: relativedelta.relativedelta = pydantic.Field(
         default=relativedelta.relativedelta(hours=12), init_var=False, frozen=True
     )
     recovery_bonus: int = pydantic.Field(default=0, le=0)
@@ -133,14 +134,22 @@ class HealingDeathException(Exception):
 
 
 class WoundTracker(pydantic.BaseModel):
-    """Class to track wounds on a character"""
+    """Class to track wounds on a character
 
+    The total bonus of light, medium and heavy wounds is kept up to date as
+    wounds are added and recovered rather than summed when it's read. Set
+    CHECK_CONSISTENCY to have every read of wound_bonus check the total
+    against the wounds themselves while debugging.
+    """
+
+    CHECK_CONSISTENCY: ClassVar[bool] = False
     _modified_size: int
     _light_wounds: list[LightWound] = []
     _medium_wounds: list[MediumWound] = []
     _heavy_wounds: list[HeavyWound] = []
     _incapacitating_wound: Optional[IncapacitatingWound] = None
     _fatal_wound: Optional[FatalWound] = None
+    _wound_bonus_total: int = 0
 
     def __init__(self, size: int, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -158,41 +167,48 @@ class WoundTracker(pydantic.BaseModel):
     @property
     def wound_bonus(self) -> int | None:
         """Determine what the penalty to activities is based on wound state"""
-        if self.dead or self.incapacitated:
+        # read the private attributes directly, going through pydantic's
+        # __getattr__ for each of them costs more than the rest put together
+        private = self.__pydantic_private__
+        if private["_fatal_wound"] or private["_incapacitating_wound"]:
             return None
-        else:
-            return sum(
-                [
-                    wound.bonus
-                    for wound in self._light_wounds
-                    + self._medium_wounds
-                    + self._heavy_wounds
-                ]
-            )
+        if self.CHECK_CONSISTENCY:
+            self.check_consistency()
+        return private["_wound_bonus_total"]
+
+    def check_consistency(self) -> None:
+        """Make sure the running wound bonus total matches the wounds"""
+        expected = sum(
+            wound.bonus
+            for wound in self._light_wounds + self._medium_wounds + self._heavy_wounds
+        )
+        assert (
+            self._wound_bonus_total == expected
+        ), f"wound bonus total {self._wound_bonus_total} should be {expected}"
 
     @pydantic.computed_field
     @property
     def light_wounds(self) -> int:
         """Number of light wounds that this character has"""
-        return len(self._light_wounds)
+        return len(self.__pydantic_private__["_light_wounds"])
 
     @pydantic.computed_field
     @property
     def medium_wounds(self) -> int:
         """Number of medium wounds that this character has"""
-        return len(self._medium_wounds)
+        return len(self.__pydantic_private__["_medium_wounds"])
 
     @pydantic.computed_field
     @property
     def heavy_wounds(self) -> int:
         """Number of heavy wounds that this character has"""
-        return len(self._heavy_wounds)
+        return len(self.__pydantic_private__["_heavy_wounds"])
 
     @pydantic.computed_field
     @property
     def incapacitated(self) -> bool:
         """Determine if this character is incapacitated due to wounds"""
-        if self._incapacitating_wound:
+        if self.__pydantic_private__["_incapacitating_wound"]:
             return True
         else:
             return False
@@ -201,7 +217,7 @@ class WoundTracker(pydantic.BaseModel):
     @property
     def dead(self) -> bool:
         """Determine if this character is dead due to wounds"""
-        if self._fatal_wound:
+        if self.__pydantic_private__["_fatal_wound"]:
             return True
         else:
             return False
@@ -210,16 +226,19 @@ class WoundTracker(pydantic.BaseModel):
     def _add_light_wound(self) -> LightWound:
         wound = LightWound()
         self._light_wounds.append(wound)
+        self._wound_bonus_total += wound.bonus
         return wound
 
     def _add_medium_wound(self) -> MediumWound:
         wound = MediumWound()
         self._medium_wounds.append(wound)
+        self._wound_bonus_total += wound.bonus
         return wound
 
     def _add_heavy_wound(self) -> HeavyWound:
         wound = HeavyWound()
         self._heavy_wounds.append(wound)
+        self._wound_bonus_total += wound.bonus
         return wound
 
     def _add_incapacitating_wound(self) -> IncapacitatingWound:
@@ -236,10 +255,13 @@ class WoundTracker(pydantic.BaseModel):
         """Add a wound of a particular type"""
         if isinstance(wound, LightWound):
             self._light_wounds.append(wound)
+            self._wound_bonus_total += wound.bonus
         elif isinstance(wound, MediumWound):
             self._medium_wounds.append(wound)
+            self._wound_bonus_total += wound.bonus
         elif isinstance(wound, HeavyWound):
             self._heavy_wounds.append(wound)
+            self._wound_bonus_total += wound.bonus
         elif isinstance(wound, IncapacitatingWound):
             self._incapacitating_wound = wound
         elif isinstance(wound, FatalWound):
@@ -247,6 +269,32 @@ class WoundTracker(pydantic.BaseModel):
         else:
             raise TypeError
 
+    def add_wounds(
+        self,
+        light: int = 0,
+        medium: int = 0,
+        heavy: int = 0,
+        incapacitating: int = 0,
+        fatal: int = 0,
+    ) -> None:
+        """Add new wounds of each type in one go, as taking that much damage would"""
+        private = self.__pydantic_private__
+        if light:
+            private["_light_wounds"].extend(LightWound() for _ in range(light))
+        if medium:
+            private["_medium_wounds"].extend(MediumWound() for _ in range(medium))
+        if heavy:
+            private["_heavy_wounds"].extend(HeavyWound() for _ in range(heavy))
+        private["_wound_bonus_total"] += (
+            light * LightWound.bonus
+            + medium * MediumWound.bonus
+            + heavy * HeavyWound.bonus
+        )
+        if incapacitating:
+            self._add_incapacitating_wound()
+        if fatal:
+            self._add_fatal_wound()
+
     def take_damage(self, damage: int) -> Wound:
         """Take some amount of damage and add a wound of that type"""
         wound_level = math.ceil(damage / self._modified_size)
@@ -263,36 +311,73 @@ class WoundTracker(pydantic.BaseModel):
         else:
             raise ValueError
 
+    def get_wounds(self, wound_type: type[Wound]) -> list[Wound]:
+        """Every wound of one type that this character has"""
+        if wound_type is LightWound:
+            return list(self._light_wounds)
+        elif wound_type is MediumWound:
+            return list(self._medium_wounds)
+        elif wound_type is HeavyWound:
+            return list(self._heavy_wounds)
+        elif wound_type is IncapacitatingWound:
+            return [self._incapacitating_wound] if self._incapacitating_wound else []
+        elif wound_type is FatalWound:
+            return [self._fatal_wound] if self._fatal_wound else []
+        else:
+            raise TypeError
+
     def _recover_all_wounds_of_one_type(
         self,
         wound_list: Sequence[Wound],
         wound_got_better_function: Callable,
         wound_got_worse_function: Callable,
         recovery_bonus: int,
-        recovery_roll_results: Optional[int | Sequence[Optional[int]]] = None,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
     ) -> Sequence[Wound]:
         if recovery_roll_results is None:
             recovery_roll_results = [None] * len(wound_list)
         elif isinstance(recovery_roll_results, int):
             recovery_roll_results = [recovery_roll_results] * len(wound_list)
         for wound, roll_result in zip(wound_list, recovery_roll_results):
-            try:
-                if roll_result is None:
-                    roll_result = am5_rolls.roll_stress()
-                wound.heal(roll_result + recovery_bonus)
-                if wound.status == WoundStatus.BETTER:
-                    wound_got_better_function()
-                elif wound.status == WoundStatus.WORSE:
+            if roll_result is None:
+                roll_result = am5_rolls.roll_stress_outcome(rng=rng)
+            if isinstance(roll_result, am5_rolls.StressRollOutcome):
+                # botches are common enough here that raising them is too slow
+                if roll_result.botch_level:
+                    wound.status = WoundStatus.WORSE
                     wound_got_worse_function()
-            except am5_rolls.BotchedRollExcption:
-                wound.status = WoundStatus.WORSE
+                    continue
+                roll_result = roll_result.value
+            wound.heal(roll_result + recovery_bonus)
+            if wound.status == WoundStatus.BETTER:
+                wound_got_better_function()
+            elif wound.status == WoundStatus.WORSE:
                 wound_got_worse_function()
         return [wound for wound in wound_list if wound.status == WoundStatus.SAME]
 
+    def _set_wounds(
+        self, name: str, remaining_wounds: Sequence[Wound], wound_type: type[Wound]
+    ) -> None:
+        # this filtration is not necessary if everythign works right, but
+        # if we don't do it the type checker will complain
+        remaining_wounds = [
+            wound for wound in remaining_wounds if isinstance(wound, wound_type)
+        ]
+        private = self.__pydantic_private__
+        private["_wound_bonus_total"] -= sum(wound.bonus for wound in private[name])
+        private["_wound_bonus_total"] += sum(wound.bonus for wound in remaining_wounds)
+        private[name] = remaining_wounds
+
     def recover_all_light_wounds(
         self,
         recovery_bonus: int,
-        recovery_roll_results: Optional[int | Sequence[Optional[int]]] = None,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
     ):
         """Make recovery rolls (and follow through on results) for all light wounds"""
         remaining_light_wounds = self._recover_all_wounds_of_one_type(
@@ -301,17 +386,17 @@ class WoundTracker(pydantic.BaseModel):
             self._add_medium_wound,
             recovery_bonus,
             recovery_roll_results,
+            rng,
         )
-        # this filtration is not necessary if everythign works right, but
-        # if we don't do it the type checker will complain
-        self._light_wounds = [
-            wound for wound in remaining_light_wounds if isinstance(wound, LightWound)
-        ]
+        self._set_wounds("_light_wounds", remaining_light_wounds, LightWound)
 
     def recover_all_medium_wounds(
         self,
         recovery_bonus: int,
-        recovery_roll_results: Optional[int | Sequence[Optional[int]]] = None,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
     ):
         """Make recovery rolls (and follow through on results) for all medium wounds"""
         remaining_medium_wounds = self._recover_all_wounds_of_one_type(
@@ -320,15 +405,17 @@ class WoundTracker(pydantic.BaseModel):
             self._add_heavy_wound,
             recovery_bonus,
             recovery_roll_results,
+            rng,
         )
-        self._medium_wounds = [
-            wound for wound in remaining_medium_wounds if isinstance(wound, MediumWound)
-        ]
+        self._set_wounds("_medium_wounds", remaining_medium_wounds, MediumWound)
 
     def recover_all_heavy_wounds(
         self,
         recovery_bonus: int,
-        recovery_roll_results: Optional[int | Sequence[Optional[int]]] = None,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
     ):
         """Make recovery rolls (and follow through on results) for all heavy wounds"""
         remaining_heavy_wounds = self._recover_all_wounds_of_one_type(
@@ -337,15 +424,17 @@ class WoundTracker(pydantic.BaseModel):
             self._add_incapacitating_wound,
             recovery_bonus,
             recovery_roll_results,
+            rng,
         )
-        self._heavy_wounds = [
-            wound for wound in remaining_heavy_wounds if isinstance(wound, HeavyWound)
-        ]
+        self._set_wounds("_heavy_wounds", remaining_heavy_wounds, HeavyWound)
 
     def recover_all_incapacitating_wounds(
         self,
         recovery_bonus: int,
-        recovery_roll_results: Optional[int | Sequence[Optional[int]]] = None,
+        recovery_roll_results: Optional[
+            int | Sequence[Optional[int | am5_rolls.StressRollOutcome]]
+        ] = None,
+        rng: Optional[random.Random] = None,
     ):
         """Make recovery rolls (and follow through on results) for incapacitating wounds"""
         if self._incapacitating_wound is None:
@@ -357,6 +446,7 @@ class WoundTracker(pydantic.BaseModel):
             self._add_fatal_wound,
             recovery_bonus,
             recovery_roll_results,
+            rng,
         )
         remaining_incapacitating_wounds = [
             wound for wound in returned_wounds if isinstance(wound, IncapacitatingWound)
@@ -365,3 +455,76 @@ class WoundTracker(pydantic.BaseModel):
             self._incapacitating_wound = remaining_incapacitating_wounds[0]
         else:  # wound got worse or better and thus we have no more incapacitating wound
             self._incapacitating_wound = None
+
+    def _recovery_transitions(
+        self, wound_type: type[Wound]
+    ) -> tuple[Callable, Callable]:
+        # what happens when a wound of this type gets better and when it gets worse
+        if wound_type is LightWound:
+            return lambda: (), self._add_medium_wound
+        elif wound_type is MediumWound:
+            return self._add_light_wound, self._add_heavy_wound
+        elif wound_type is HeavyWound:
+            return self._add_medium_wound, self._add_incapacitating_wound
+        elif wound_type is IncapacitatingWound:
+            return self._add_heavy_wound, self._add_fatal_wound
+        else:
+            raise TypeError
+
+    def apply_recovery_statuses(
+        self, wound_type: type[Wound], statuses: Collection[int]
+    ) -> None:
+        """Follow through on recovery results worked out somewhere else
+
+        statuses has the WoundStatus value each wound of the type ended up
+        with, in order, as a list or numpy array, so the rolls for many
+        trackers can be made at once and handed out afterwards. Wounds that
+        stay the same get their stable recovery bonus and the rest are
+        replaced just as recover_all_* would.
+        """
+        got_better, got_worse = self._recovery_transitions(wound_type)
+        # this runs for every tracker in a batch, so skip pydantic's slow
+        # private attribute lookups
+        private = self.__pydantic_private__
+        if wound_type is IncapacitatingWound:
+            wounds = [private["_incapacitating_wound"]] if self.incapacitated else []
+        else:
+            wounds = private[_WOUND_LIST_NAMES[wound_type]]
+        if len(statuses) != len(wounds):
+            raise ValueError(f"{len(wounds)} wounds but {len(statuses)} statuses")
+        stable_recovery_bonus = wound_type._STABLE_RECOVERY_BONUS
+        remaining_wounds = []
+        better = worse = 0
+        for wound, status in zip(wounds, statuses):
+            # stable bonuses keep recovery_bonus in range, so skip validating
+            # each wound again
+            if status == WoundStatus.SAME.value:
+                wound.__dict__["recovery_bonus"] += stable_recovery_bonus
+                remaining_wounds.append(wound)
+            else:
+                new_status = WoundStatus(status)
+                wound.__dict__["status"] = new_status
+                if new_status is WoundStatus.BETTER:
+                    better += 1
+                else:
+                    worse += 1
+        if wound_type is IncapacitatingWound:
+            private["_incapacitating_wound"] = (
+                remaining_wounds[0] if remaining_wounds else None
+            )
+        else:
+            self._set_wounds(
+                _WOUND_LIST_NAMES[wound_type], remaining_wounds, wound_type
+            )
+        for _ in range(better):
+            got_better()
+        for _ in range(worse):
+            got_worse()
+
+
+# private list each standard wound type is kept in by WoundTracker
+_WOUND_LIST_NAMES: dict[type[Wound], str] = {
+    LightWound: "_light_wounds",
+    MediumWound: "_medium_wounds",
+    HeavyWound: "_heavy_wounds",
+}
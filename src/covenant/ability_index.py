@@ -0,0 +1,136 @@
+"""Covenant wide lookups of which characters have which abilities"""
+
+from typing import Hashable, Iterable, Optional
+import bisect
+import functools
+
+from characters.parts import ability
+from covenant import name_registry
+
+
+class AbilityRegistry(name_registry.NameRegistry):
+    """Interns ability names to small integer ids"""
+
+
+class AbilityIndex:
+    """Characters ranked by level for every ability in the covenant
+
+    Each ability keeps its holders in a list sorted by level, so counting or
+    listing everyone at or above a level and finding the top few are binary
+    searches instead of a scan of the whole roster. The index listens to
+    every ability added to it and moves the holder whenever add_experience
+    changes their level.
+    """
+
+    def __init__(self, registry: Optional[AbilityRegistry] = None) -> None:
+        self.registry = AbilityRegistry() if registry is None else registry
+        # (level, -order added, character) sorted for each ability id, so
+        # reading from the end gives the highest level and then the earliest
+        # added among ties
+        self._rankings: list[list[tuple[int, int, Hashable]]] = []
+        self._entries: dict[tuple[Hashable, int], tuple[int, int]] = {}
+        self._listeners: dict[tuple[Hashable, int], ability.LevelListener] = {}
+        self._abilities: dict[tuple[Hashable, int], ability.Ability] = {}
+        self._added = 0
+
+    def _ranking_for(self, ability_id: int) -> list[tuple[int, int, Hashable]]:
+        while len(self._rankings) <= ability_id:
+            self._rankings.append([])
+        return self._rankings[ability_id]
+
+    def add(self, character: Hashable, character_ability: ability.Ability) -> None:
+        """Track one ability of a character"""
+        ability_id = self.registry.intern(character_ability.name)
+        key = (character, ability_id)
+        if key in self._entries:
+            raise ValueError(f"{character} already has {character_ability.name}")
+        entry = (character_ability.level, -self._added)
+        self._added += 1
+        bisect.insort(self._ranking_for(ability_id), (*entry, character))
+        self._entries[key] = entry
+        self._abilities[key] = character_ability
+        listener = functools.partial(self._level_changed, character, ability_id)
+        self._listeners[key] = listener
+        character_ability.add_level_listener(listener)
+
+    def add_character(
+        self, character: Hashable, abilities: Iterable[ability.Ability]
+    ) -> None:
+        """Track every ability of a character"""
+        for character_ability in abilities:
+            self.add(character, character_ability)
+
+    def remove(self, character: Hashable, name: str) -> None:
+        """Stop tracking one ability of a character"""
+        key = (character, self.registry.id_of(name))
+        level, order = self._entries.pop(key)
+        ranking = self._rankings[key[1]]
+        del ranking[bisect.bisect_left(ranking, (level, order))]
+        self._abilities.pop(key).remove_level_listener(self._listeners.pop(key))
+
+    def remove_character(self, character: Hashable) -> None:
+        """Stop tracking every ability of a character"""
+        for tracked_character, ability_id in list(self._entries):
+            if tracked_character == character:
+                self.remove(character, self.registry.name_of(ability_id))
+
+    def _level_changed(
+        self,
+        character: Hashable,
+        ability_id: int,
+        _: ability.Ability,
+        old_level: int,
+        new_level: int,
+    ) -> None:
+        key = (character, ability_id)
+        order = self._entries[key][1]
+        ranking = self._rankings[ability_id]
+        del ranking[bisect.bisect_left(ranking, (old_level, order))]
+        bisect.insort(ranking, (new_level, order, character))
+        self._entries[key] = (new_level, order)
+
+    def refresh(self, character: Hashable, name: str) -> None:
+        """Re-rank an ability whose level was set directly instead of through add_experience"""
+        key = (character, self.registry.id_of(name))
+        old_level = self._entries[key][0]
+        new_level = self._abilities[key].level
+        if old_level != new_level:
+            self._level_changed(
+                character, key[1], self._abilities[key], old_level, new_level
+            )
+
+    def level_of(self, character: Hashable, name: str) -> Optional[int]:
+        """Level a character has in an ability, None if they don't have it"""
+        if name not in self.registry:
+            return None
+        entry = self._entries.get((character, self.registry.id_of(name)))
+        return None if entry is None else entry[0]
+
+    def _ranking_named(self, name: str) -> list[tuple[int, int, Hashable]]:
+        if name not in self.registry:
+            return []
+        return self._ranking_for(self.registry.id_of(name))
+
+    def count_at_least(self, name: str, level: int) -> int:
+        """How many characters have at least level in an ability"""
+        ranking = self._ranking_named(name)
+        return len(ranking) - bisect.bisect_left(ranking, (level,))
+
+    def at_least(self, name: str, level: int) -> list[tuple[Hashable, int]]:
+        """Every (character, level) with at least level in an ability, highest first"""
+        ranking = self._ranking_named(name)
+        start = bisect.bisect_left(ranking, (level,))
+        return [
+            (character, character_level)
+            for character_level, _, character in reversed(ranking[start:])
+        ]
+
+    def top(self, name: str, count: int) -> list[tuple[Hashable, int]]:
+        """The count highest (character, level) pairs in an ability, highest first"""
+        ranking = self._ranking_named(name)
+        return [
+            (character, character_level)
+            for character_level, _, character in reversed(
+                ranking[max(len(ranking) - count, 0) :]
+            )
+        ]
@@ -0,0 +1,190 @@
+"""Sparse characters by abilities matrix of experience for bulk advancement"""
+
+from typing import Hashable, Iterable, Optional, Sequence
+
+import numpy
+
+from characters.parts import ability
+from covenant import ability_index
+from lib import am5_advancement
+
+
+class AbilityMatrix:
+    """Level and experience of every ability every character has
+
+    Only the abilities characters actually have are stored, one cell each in
+    parallel arrays of rows, columns, levels and experience, so a whole
+    season of training is a handful of array operations. Ability models
+    added to the matrix are only brought up to date when they're fetched
+    with ability or when sync is called, so while they're in the matrix
+    their experience should be changed through it rather than directly.
+    """
+
+    def __init__(
+        self,
+        registry: Optional[ability_index.AbilityRegistry] = None,
+        capacity: int = 1024,
+    ) -> None:
+        self.registry = (
+            ability_index.AbilityRegistry() if registry is None else registry
+        )
+        self._character_rows: dict[Hashable, int] = {}
+        self._characters: list[Hashable] = []
+        self._cell_indexes: dict[tuple[int, int], int] = {}
+        self._size = 0
+        capacity = max(capacity, 1)
+        self._rows = numpy.empty(capacity, dtype=numpy.int32)
+        self._columns = numpy.empty(capacity, dtype=numpy.int32)
+        self._levels = numpy.empty(capacity, dtype=numpy.int64)
+        self._experience = numpy.empty(capacity, dtype=numpy.int64)
+        self._stale = numpy.zeros(capacity, dtype=bool)
+        self._models: dict[int, ability.Ability] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def rows(self) -> numpy.ndarray:
+        """Character row of every cell"""
+        return self._rows[: self._size]
+
+    @property
+    def columns(self) -> numpy.ndarray:
+        """Ability id of every cell"""
+        return self._columns[: self._size]
+
+    @property
+    def levels(self) -> numpy.ndarray:
+        """Level of every cell"""
+        return self._levels[: self._size]
+
+    @property
+    def experience(self) -> numpy.ndarray:
+        """Experience towards the next level of every cell"""
+        return self._experience[: self._size]
+
+    @property
+    def characters(self) -> list[Hashable]:
+        """Characters in row order"""
+        return list(self._characters)
+
+    def _row_for(self, character: Hashable) -> int:
+        row = self._character_rows.get(character)
+        if row is None:
+            row = len(self._characters)
+            self._character_rows[character] = row
+            self._characters.append(character)
+        return row
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._rows)
+        for name in ("_rows", "_columns", "_levels", "_experience", "_stale"):
+            old = getattr(self, name)
+            new = numpy.zeros(capacity, dtype=old.dtype)
+            new[: self._size] = old[: self._size]
+            setattr(self, name, new)
+
+    def cell(self, character: Hashable, name: str) -> int:
+        """Cell of a character's ability, starting it at level 0 if they don't have it"""
+        key = (self._row_for(character), self.registry.intern(name))
+        index = self._cell_indexes.get(key)
+        if index is None:
+            if self._size == len(self._rows):
+                self._grow()
+            index = self._size
+            self._rows[index], self._columns[index] = key
+            self._levels[index] = 0
+            self._experience[index] = 0
+            self._stale[index] = False
+            self._cell_indexes[key] = index
+            self._size += 1
+        return index
+
+    def cells(self, pairs: Iterable[tuple[Hashable, str]]) -> numpy.ndarray:
+        """Cells for a sequence of (character, ability name) pairs"""
+        return numpy.fromiter(
+            (self.cell(character, name) for character, name in pairs),
+            dtype=numpy.int64,
+        )
+
+    def add(self, character: Hashable, character_ability: ability.Ability) -> int:
+        """Put an ability model in the matrix, returning its cell"""
+        index = self.cell(character, character_ability.name)
+        if index in self._models and self._models[index] is not character_ability:
+            raise ValueError(f"{character} already has {character_ability.name}")
+        self._levels[index] = character_ability.level
+        self._experience[index] = character_ability.experience
+        self._stale[index] = False
+        self._models[index] = character_ability
+        return index
+
+    def add_character(
+        self, character: Hashable, abilities: Iterable[ability.Ability]
+    ) -> None:
+        """Put every ability model of a character in the matrix"""
+        for character_ability in abilities:
+            self.add(character, character_ability)
+
+    def add_experience(
+        self, cells: Sequence[int] | numpy.ndarray, experience: int | numpy.ndarray
+    ) -> None:
+        """Add experience to cells, raising levels wherever it rolls over
+
+        experience is either one amount for every cell or an amount per cell,
+        cells that appear more than once get the total of their amounts.
+        Nothing changes if any cell would be left with negative experience.
+        """
+        cells = numpy.asarray(cells, dtype=numpy.int64)
+        experience = numpy.broadcast_to(
+            numpy.asarray(experience, dtype=numpy.int64), cells.shape
+        )
+        if cells.size and (cells.min() < 0 or cells.max() >= self._size):
+            raise IndexError("cell out of range")
+        cells, positions = numpy.unique(cells, return_inverse=True)
+        gained = numpy.bincount(positions, weights=experience, minlength=cells.size)
+        gained = gained.astype(numpy.int64)
+        new_levels, new_experience = am5_advancement.advance_batch(
+            self._levels[cells], self._experience[cells], gained
+        )
+        if (new_experience < 0).any():
+            raise ValueError("Can't take away more experience than a cell has")
+        self._levels[cells] = new_levels
+        self._experience[cells] = new_experience
+        self._stale[cells] = True
+
+    def level(self, character: Hashable, name: str) -> int:
+        """Level of a character's ability, 0 if they don't have it"""
+        index = self._find(character, name)
+        return 0 if index is None else int(self._levels[index])
+
+    def _find(self, character: Hashable, name: str) -> Optional[int]:
+        row = self._character_rows.get(character)
+        if row is None or name not in self.registry:
+            return None
+        return self._cell_indexes.get((row, self.registry.id_of(name)))
+
+    def ability(self, character: Hashable, name: str) -> ability.Ability:
+        """Up to date Ability model for a character, made if it wasn't added as one"""
+        index = self.cell(character, name)
+        model = self._models.get(index)
+        if model is None:
+            model = ability.Ability(
+                name=name,
+                level=int(self._levels[index]),
+                experience=int(self._experience[index]),
+            )
+            self._models[index] = model
+        elif self._stale[index]:
+            model.set_progress(int(self._levels[index]), int(self._experience[index]))
+        self._stale[index] = False
+        return model
+
+    def sync(self) -> None:
+        """Bring every Ability model in the matrix up to date"""
+        for index in numpy.flatnonzero(self._stale[: self._size]).tolist():
+            model = self._models.get(index)
+            if model is not None:
+                model.set_progress(
+                    int(self._levels[index]), int(self._experience[index])
+                )
+            self._stale[index] = False
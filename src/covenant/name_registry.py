@@ -0,0 +1,45 @@
+"""Interning of names that many objects share"""
+
+from typing import Iterable, Iterator
+import sys
+
+
+class NameRegistry:
+    """Interns names to small integer ids
+
+    Ids are handed out in the order names are first seen and never change,
+    so they can be used as indexes into lists and arrays.
+    """
+
+    def __init__(self, names: Iterable[str] = ()) -> None:
+        self._ids: dict[str, int] = {}
+        self._names: list[str] = []
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name: str) -> int:
+        """Id for name, registering it if it hasn't been seen before"""
+        name_id = self._ids.get(name)
+        if name_id is None:
+            name_id = len(self._names)
+            name = sys.intern(name)
+            self._ids[name] = name_id
+            self._names.append(name)
+        return name_id
+
+    def id_of(self, name: str) -> int:
+        """Id of a registered name, raising KeyError if it isn't registered"""
+        return self._ids[name]
+
+    def name_of(self, name_id: int) -> str:
+        """Name registered with an id"""
+        return self._names[name_id]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
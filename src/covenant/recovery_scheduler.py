@@ -0,0 +1,194 @@
+"""Scheduling of wound and fatigue recovery across a whole covenant"""
+
+from typing import Hashable, NamedTuple, Optional
+import datetime
+import enum
+import heapq
+import random
+
+from characters.parts import fatigue
+from characters.parts import wound_tracker
+
+
+class RecoveryKind(enum.Enum):
+    """Things that recover on their own schedule"""
+
+    LIGHT_WOUNDS = "light_wounds"
+    MEDIUM_WOUNDS = "medium_wounds"
+    HEAVY_WOUNDS = "heavy_wounds"
+    INCAPACITATING_WOUND = "incapacitating_wound"
+    FATIGUE = "fatigue"
+
+
+# wound class whose recovery period each kind uses and the method that
+# recovers every wound of that kind
+_WOUND_RECOVERY: dict[RecoveryKind, tuple[type[wound_tracker.Wound], str]] = {
+    RecoveryKind.LIGHT_WOUNDS: (
+        wound_tracker.LightWound,
+        "recover_all_light_wounds",
+    ),
+    RecoveryKind.MEDIUM_WOUNDS: (
+        wound_tracker.MediumWound,
+        "recover_all_medium_wounds",
+    ),
+    RecoveryKind.HEAVY_WOUNDS: (
+        wound_tracker.HeavyWound,
+        "recover_all_heavy_wounds",
+    ),
+    RecoveryKind.INCAPACITATING_WOUND: (
+        wound_tracker.IncapacitatingWound,
+        "recover_all_incapacitating_wounds",
+    ),
+}
+
+
+class RecoveryEvent(NamedTuple):
+    """A recovery that came due and was carried out"""
+
+    time: datetime.datetime
+    character: Hashable
+    kind: RecoveryKind
+
+
+def _needs_recovery(tracker: wound_tracker.WoundTracker, kind: RecoveryKind) -> bool:
+    if tracker.dead:
+        return False
+    if kind == RecoveryKind.LIGHT_WOUNDS:
+        return tracker.light_wounds > 0
+    if kind == RecoveryKind.MEDIUM_WOUNDS:
+        return tracker.medium_wounds > 0
+    if kind == RecoveryKind.HEAVY_WOUNDS:
+        return tracker.heavy_wounds > 0
+    return tracker.incapacitated
+
+
+class RecoveryScheduler:
+    """Min heap of the next recovery deadline for every tracker in the covenant
+
+    Only recoveries that are actually due get popped, so moving game time on
+    costs log n for each recovery that happens rather than a check of every
+    character. Each character has at most one live deadline per kind of
+    recovery, replaced deadlines are left in the heap and skipped when they
+    come up. Recoveries are carried out by advance_to, which arms the next
+    deadline for anything still left to recover afterwards. Call rearm after
+    changing a tracker any other way, like taking new wounds.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[datetime.datetime, int, Hashable, RecoveryKind]] = []
+        self._armed: dict[tuple[Hashable, RecoveryKind], int] = {}
+        self._wound_trackers: dict[Hashable, wound_tracker.WoundTracker] = {}
+        self._recovery_bonuses: dict[Hashable, int] = {}
+        self._fatigue_trackers: dict[Hashable, fatigue.FatigueTracker] = {}
+        self._pushed = 0
+
+    def __len__(self) -> int:
+        """Number of live deadlines"""
+        return len(self._armed)
+
+    def _arm(
+        self, character: Hashable, kind: RecoveryKind, time: datetime.datetime
+    ) -> None:
+        self._armed[(character, kind)] = self._pushed
+        heapq.heappush(self._heap, (time, self._pushed, character, kind))
+        self._pushed += 1
+
+    def register_wounds(
+        self,
+        character: Hashable,
+        tracker: wound_tracker.WoundTracker,
+        start: datetime.datetime,
+        recovery_bonus: int = 0,
+    ) -> None:
+        """Schedule recovery of a character's wounds from start"""
+        self._wound_trackers[character] = tracker
+        self._recovery_bonuses[character] = recovery_bonus
+        self.rearm(character, start)
+
+    def register_fatigue(
+        self,
+        character: Hashable,
+        tracker: fatigue.FatigueTracker,
+        start: datetime.datetime,
+    ) -> None:
+        """Schedule recovery of a character's short term fatigue from start"""
+        self._fatigue_trackers[character] = tracker
+        self.rearm(character, start)
+
+    def set_recovery_bonus(self, character: Hashable, recovery_bonus: int) -> None:
+        """Change the bonus added to a character's future wound recovery rolls"""
+        self._recovery_bonuses[character] = recovery_bonus
+
+    def unregister(self, character: Hashable) -> None:
+        """Stop scheduling anything for a character"""
+        self._wound_trackers.pop(character, None)
+        self._recovery_bonuses.pop(character, None)
+        self._fatigue_trackers.pop(character, None)
+        for kind in RecoveryKind:
+            self._armed.pop((character, kind), None)
+
+    def rearm(self, character: Hashable, now: datetime.datetime) -> None:
+        """Arm a deadline for anything of a character's that needs recovering
+
+        Deadlines that are already armed are left alone, anything that no
+        longer needs recovering is disarmed.
+        """
+        tracker = self._wound_trackers.get(character)
+        if tracker is not None:
+            for kind, (wound_type, _) in _WOUND_RECOVERY.items():
+                if not _needs_recovery(tracker, kind):
+                    self._armed.pop((character, kind), None)
+                elif (character, kind) not in self._armed:
+                    self._arm(
+                        character,
+                        kind,
+                        now + wound_type.model_fields["recovery_period"].default,
+                    )
+        fatigue_tracker = self._fatigue_trackers.get(character)
+        if fatigue_tracker is not None:
+            key = (character, RecoveryKind.FATIGUE)
+            if not fatigue_tracker.short_term_levels:
+                self._armed.pop(key, None)
+            elif key not in self._armed:
+                self._arm(
+                    character,
+                    RecoveryKind.FATIGUE,
+                    now + fatigue_tracker.get_short_term_recovery_time(),
+                )
+
+    def next_deadline(self) -> Optional[datetime.datetime]:
+        """When the next recovery is due, None if nothing is scheduled"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def _drop_stale(self) -> None:
+        while self._heap:
+            _, pushed, character, kind = self._heap[0]
+            if self._armed.get((character, kind)) == pushed:
+                return
+            heapq.heappop(self._heap)
+
+    def advance_to(
+        self, now: datetime.datetime, rng: Optional[random.Random] = None
+    ) -> list[RecoveryEvent]:
+        """Carry out every recovery due by now in order and return them
+
+        Recoveries that arm new deadlines at or before now are carried out
+        too, so advancing a whole season in one call is the same as
+        advancing a day at a time.
+        """
+        events = []
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return events
+            time, _, character, kind = heapq.heappop(self._heap)
+            del self._armed[(character, kind)]
+            if kind == RecoveryKind.FATIGUE:
+                self._fatigue_trackers[character].short_term_levels -= 1
+            else:
+                getattr(self._wound_trackers[character], _WOUND_RECOVERY[kind][1])(
+                    self._recovery_bonuses[character], rng=rng
+                )
+            events.append(RecoveryEvent(time, character, kind))
+            self.rearm(character, time)
@@ -0,0 +1,173 @@
+"""Covenant wide store of reputations indexed by who they're known to"""
+
+from typing import Hashable, Iterable, NamedTuple, Optional
+import bisect
+import functools
+
+from characters.parts import reputation
+from covenant import name_registry
+from lib import am5_advancement
+
+
+class DeedAward(NamedTuple):
+    """Deeds awarded towards one reputation of a holder"""
+
+    holder: Hashable
+    target: str
+    content: str
+    deeds: int
+
+
+class ReputationStore:
+    """Every reputation in the covenant ranked by score for each target
+
+    Targets are interned so each one keeps a score sorted list of the
+    reputations known to it, making the highest reputations with a target a
+    binary search away. The store listens to every reputation in it so
+    add_deeds called directly still moves it in the rankings.
+    """
+
+    def __init__(self, targets: Optional[name_registry.NameRegistry] = None) -> None:
+        self.targets = name_registry.NameRegistry() if targets is None else targets
+        # (score, -order added, key) sorted for each target id, so reading from
+        # the end gives the highest score and then the earliest added
+        self._rankings: list[list[tuple[int, int, tuple[Hashable, int, str]]]] = []
+        self._entries: dict[tuple[Hashable, int, str], tuple[int, int]] = {}
+        self._reputations: dict[tuple[Hashable, int, str], reputation.Reputation] = {}
+        self._listeners: dict[tuple[Hashable, int, str], reputation.ScoreListener] = {}
+        # keys of every reputation each holder has with each target
+        self._holder_keys: dict[
+            tuple[Hashable, int], list[tuple[Hashable, int, str]]
+        ] = {}
+        self._added = 0
+
+    def __len__(self) -> int:
+        return len(self._reputations)
+
+    def _ranking_for(
+        self, target_id: int
+    ) -> list[tuple[int, int, tuple[Hashable, int, str]]]:
+        while len(self._rankings) <= target_id:
+            self._rankings.append([])
+        return self._rankings[target_id]
+
+    def _key(self, holder: Hashable, target: str, content: str):
+        return (holder, self.targets.intern(target), content)
+
+    def add(self, holder: Hashable, holder_reputation: reputation.Reputation) -> None:
+        """Track a reputation someone holds"""
+        key = self._key(holder, holder_reputation.target, holder_reputation.content)
+        if key in self._entries:
+            raise ValueError(
+                f"{holder} already has a reputation for {holder_reputation.content}"
+                f" with {holder_reputation.target}"
+            )
+        entry = (holder_reputation.score, -self._added)
+        self._added += 1
+        bisect.insort(self._ranking_for(key[1]), (*entry, key))
+        self._entries[key] = entry
+        self._reputations[key] = holder_reputation
+        self._holder_keys.setdefault((holder, key[1]), []).append(key)
+        listener = functools.partial(self._score_changed, key)
+        self._listeners[key] = listener
+        holder_reputation.add_score_listener(listener)
+
+    def get(
+        self, holder: Hashable, target: str, content: str
+    ) -> Optional[reputation.Reputation]:
+        """A holder's reputation for content with a target, None if they have none"""
+        if target not in self.targets:
+            return None
+        return self._reputations.get((holder, self.targets.id_of(target), content))
+
+    def remove(self, holder: Hashable, target: str, content: str) -> None:
+        """Stop tracking a reputation"""
+        key = (holder, self.targets.id_of(target), content)
+        score, order = self._entries.pop(key)
+        ranking = self._rankings[key[1]]
+        del ranking[bisect.bisect_left(ranking, (score, order))]
+        self._holder_keys[(holder, key[1])].remove(key)
+        self._reputations.pop(key).remove_score_listener(self._listeners.pop(key))
+
+    def _score_changed(
+        self,
+        key: tuple[Hashable, int, str],
+        _: reputation.Reputation,
+        old_score: int,
+        new_score: int,
+    ) -> None:
+        order = self._entries[key][1]
+        ranking = self._rankings[key[1]]
+        del ranking[bisect.bisect_left(ranking, (old_score, order))]
+        bisect.insort(ranking, (new_score, order, key))
+        self._entries[key] = (new_score, order)
+
+    def apply_deeds(self, awards: Iterable[DeedAward | tuple]) -> None:
+        """Apply a whole story's deed awards in one pass
+
+        Awards for the same reputation are added up first so each reputation
+        is advanced once. Awards for a reputation the holder doesn't have yet
+        start a new one. Every result is validated before anything changes,
+        so if any award is invalid the store is left as it was.
+        """
+        # keyed by target name rather than id so nothing is interned until
+        # every award is known to be good
+        totals: dict[tuple[Hashable, str, str], int] = {}
+        for holder, target, content, deeds in awards:
+            key = (holder, target, content)
+            totals[key] = totals.get(key, 0) + deeds
+        staged: list[
+            tuple[Hashable, str, str, Optional[reputation.Reputation], int, int]
+        ] = []
+        for (holder, target, content), deeds in totals.items():
+            holder_reputation = self.get(holder, target, content)
+            if holder_reputation is None:
+                score, progress = am5_advancement.advance(1, 0, deeds)
+            else:
+                score, progress = am5_advancement.advance(
+                    holder_reputation.score, holder_reputation.deeds, deeds
+                )
+            # advance never lowers the score or leaves too many deeds for it,
+            # losing deeds can only leave them negative
+            if progress < 0:
+                raise ValueError(
+                    f"{deeds} deeds would leave {holder}'s reputation for"
+                    f" {content} with {target} at {progress} deeds"
+                )
+            staged.append((holder, target, content, holder_reputation, score, progress))
+        for holder, target, content, holder_reputation, score, progress in staged:
+            if holder_reputation is None:
+                self.add(
+                    holder,
+                    reputation.Reputation(
+                        content=content, target=target, score=score, deeds=progress
+                    ),
+                )
+            else:
+                holder_reputation.set_progress(score, progress)
+
+    def highest(
+        self, target: str, count: int = 1
+    ) -> list[tuple[Hashable, reputation.Reputation]]:
+        """The count highest scoring (holder, reputation) pairs with a target"""
+        if target not in self.targets:
+            return []
+        ranking = self._ranking_for(self.targets.id_of(target))
+        return [
+            (key[0], self._reputations[key])
+            for _, _, key in reversed(ranking[max(len(ranking) - count, 0) :])
+        ]
+
+    def count_at_least(self, target: str, score: int) -> int:
+        """How many reputations with a target have at least score"""
+        if target not in self.targets:
+            return 0
+        ranking = self._ranking_for(self.targets.id_of(target))
+        return len(ranking) - bisect.bisect_left(ranking, (score,))
+
+    def score_with(self, holder: Hashable, target: str) -> int:
+        """A holder's highest reputation score with a target, 0 if they have none"""
+        if target not in self.targets:
+            return 0
+        keys = self._holder_keys.get((holder, self.targets.id_of(target)), ())
+        return max((self._entries[key][0] for key in keys), default=0)
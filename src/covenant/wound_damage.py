@@ -0,0 +1,92 @@
+"""Damage for a whole round of mass combat applied at once"""
+
+from typing import Iterable, NamedTuple, Sequence
+
+import numpy
+
+from characters.parts import wound_tracker
+
+# wound levels past this are all fatal
+_FATAL_LEVEL = 5
+
+
+class DamageSummary(NamedTuple):
+    """What a round of damage did to each tracker it was applied to"""
+
+    trackers: list[wound_tracker.WoundTracker]
+    # new light, medium, heavy, incapacitating and fatal wounds for each tracker
+    new_wounds: numpy.ndarray
+    # trackers newly incapacitated but still alive, and trackers newly dead
+    incapacitated: numpy.ndarray
+    killed: numpy.ndarray
+
+
+def wound_levels(damage: numpy.ndarray, modified_sizes: numpy.ndarray) -> numpy.ndarray:
+    """Wound level each amount of damage causes, 0 for none and 5 for fatal"""
+    levels = -(-numpy.asarray(damage, dtype=numpy.int64) // modified_sizes)
+    return numpy.clip(levels, 0, _FATAL_LEVEL)
+
+
+def apply_damage_to(
+    trackers: Sequence[wound_tracker.WoundTracker],
+    targets: Sequence[int] | numpy.ndarray,
+    damage: Sequence[int] | numpy.ndarray,
+) -> DamageSummary:
+    """Apply damage[i] to trackers[targets[i]] for every i at once
+
+    Wound levels for every hit are worked out together, then each tracker
+    gets all of its new wounds in one add_wounds call. Damage that isn't
+    positive misses rather than raising like take_damage does, since a
+    round of combat is full of blows that don't get through soak.
+    """
+    targets = numpy.asarray(targets, dtype=numpy.int64)
+    damage = numpy.asarray(damage, dtype=numpy.int64)
+    if targets.shape != damage.shape:
+        raise ValueError("targets and damage must be the same length")
+    if targets.size and (targets.min() < 0 or targets.max() >= len(trackers)):
+        raise IndexError("target out of range")
+    modified_sizes = numpy.fromiter(
+        (tracker._modified_size for tracker in trackers),  # pylint: disable=W0212
+        dtype=numpy.int64,
+        count=len(trackers),
+    )
+    levels = wound_levels(damage, modified_sizes[targets])
+    new_wounds = numpy.bincount(
+        targets * (_FATAL_LEVEL + 1) + levels,
+        minlength=len(trackers) * (_FATAL_LEVEL + 1),
+    ).reshape(len(trackers), _FATAL_LEVEL + 1)[:, 1:]
+    incapacitated = numpy.zeros(len(trackers), dtype=bool)
+    killed = numpy.zeros(len(trackers), dtype=bool)
+    for index in numpy.flatnonzero(new_wounds.any(axis=1)).tolist():
+        tracker = trackers[index]
+        was_dead = tracker.dead
+        was_incapacitated = tracker.incapacitated
+        tracker.add_wounds(*new_wounds[index].tolist())
+        killed[index] = tracker.dead and not was_dead
+        incapacitated[index] = (
+            tracker.incapacitated and not tracker.dead and not was_incapacitated
+        )
+    return DamageSummary(list(trackers), new_wounds, incapacitated, killed)
+
+
+def apply_damage(
+    hits: Iterable[tuple[wound_tracker.WoundTracker, int]],
+) -> DamageSummary:
+    """Apply a stream of (tracker, damage) hits at once
+
+    The summary covers every tracker that was hit, in the order each was
+    first hit.
+    """
+    trackers: list[wound_tracker.WoundTracker] = []
+    # trackers aren't hashable, so they're told apart by identity
+    indexes: dict[int, int] = {}
+    targets = []
+    damage = []
+    for tracker, amount in hits:
+        index = indexes.get(id(tracker))
+        if index is None:
+            index = indexes[id(tracker)] = len(trackers)
+            trackers.append(tracker)
+        targets.append(index)
+        damage.append(amount)
+    return apply_damage_to(trackers, targets, damage)
@@ -0,0 +1,108 @@
+"""Wound recovery for every wound tracker in the covenant at once"""
+
+from typing import Iterable, Iterator, Optional, Sequence
+import itertools
+
+import numpy
+
+from characters.parts import wound_tracker
+from lib import am5_rolls
+
+# recovered in the same order a tracker's recover_all_* methods are called
+# in, so wounds that get worse are rolled for again at their new severity
+_RECOVERY_ORDER: tuple[tuple[type[wound_tracker._StandardWound], str], ...] = (
+    (wound_tracker.LightWound, "light_wounds"),
+    (wound_tracker.MediumWound, "medium_wounds"),
+    (wound_tracker.HeavyWound, "heavy_wounds"),
+    (wound_tracker.IncapacitatingWound, "incapacitated"),
+)
+
+
+def recovery_statuses(
+    wound_type: type[wound_tracker._StandardWound],
+    recovery_results: numpy.ndarray,
+    botch_levels: numpy.ndarray,
+) -> numpy.ndarray:
+    """WoundStatus values that recovery results leave wounds of a type with"""
+    statuses = numpy.full(
+        recovery_results.shape, wound_tracker.WoundStatus.SAME.value, dtype=numpy.int8
+    )
+    statuses[recovery_results < wound_type._STABLE_EASE_FACTOR] = (
+        wound_tracker.WoundStatus.WORSE.value
+    )
+    statuses[recovery_results >= wound_type._RECOVERY_EASE_FACTOR] = (
+        wound_tracker.WoundStatus.BETTER.value
+    )
+    statuses[botch_levels > 0] = wound_tracker.WoundStatus.WORSE.value
+    return statuses
+
+
+def _recorded_rolls(
+    recorded: Iterator[int | am5_rolls.StressRollOutcome], count: int
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    # the next count recorded rolls as results and botch levels
+    results = numpy.zeros(count, dtype=numpy.int64)
+    botch_levels = numpy.zeros(count, dtype=numpy.int64)
+    index = -1
+    for index, roll_result in enumerate(itertools.islice(recorded, count)):
+        if isinstance(roll_result, am5_rolls.StressRollOutcome):
+            results[index] = roll_result.value
+            botch_levels[index] = roll_result.botch_level
+        else:
+            results[index] = roll_result
+    if index + 1 < count:
+        raise ValueError(f"Ran out of recovery rolls after {index + 1} of {count}")
+    return results, botch_levels
+
+
+def recover_all(
+    trackers: Sequence[wound_tracker.WoundTracker],
+    recovery_bonuses: int | Sequence[int] | numpy.ndarray = 0,
+    rng: Optional[numpy.random.Generator] = None,
+    recovery_roll_results: Optional[
+        int | Iterable[int | am5_rolls.StressRollOutcome]
+    ] = None,
+) -> None:
+    """Make every wound recovery roll for many trackers in one go
+
+    This is the same as calling recover_all_light_wounds, then medium, heavy
+    and incapacitating on every tracker, but each severity's stress rolls
+    are made in one batch for all the trackers and scored with array
+    operations before being handed back. recovery_bonuses is either one
+    bonus for every tracker or a bonus per tracker.
+
+    recovery_roll_results replaces the dice like it does for recover_all_*,
+    either one result for every roll or results used in the order the rolls
+    would have been made and recorded: a severity at a time, tracker by
+    tracker. Replaying a roll audit log of an earlier call repeats it
+    exactly. Running out of results raises ValueError.
+    """
+    bonuses = numpy.broadcast_to(
+        numpy.asarray(recovery_bonuses, dtype=numpy.int64), (len(trackers),)
+    )
+    recorded: Optional[Iterator[int | am5_rolls.StressRollOutcome]] = None
+    if recovery_roll_results is not None and not isinstance(recovery_roll_results, int):
+        recorded = iter(recovery_roll_results)
+    for wound_type, count_name in _RECOVERY_ORDER:
+        counts = numpy.fromiter(
+            (int(getattr(tracker, count_name)) for tracker in trackers),
+            dtype=numpy.int64,
+            count=len(trackers),
+        )
+        total = int(counts.sum())
+        if not total:
+            continue
+        if recorded is not None:
+            results, botch_levels = _recorded_rolls(recorded, total)
+        elif recovery_roll_results is not None:
+            results = numpy.full(total, recovery_roll_results, dtype=numpy.int64)
+            botch_levels = numpy.zeros(total, dtype=numpy.int64)
+        else:
+            results, botch_levels = am5_rolls.roll_stress_batch(total, rng=rng)
+        results += numpy.repeat(bonuses, counts)
+        statuses = recovery_statuses(wound_type, results, botch_levels).tolist()
+        start = 0
+        for index in numpy.flatnonzero(counts).tolist():
+            stop = start + int(counts[index])
+            trackers[index].apply_recovery_statuses(wound_type, statuses[start:stop])
+            start = stop
@@ -0,0 +1,96 @@
+"""Experience needed for Ars Magica ability levels and reputation scores ArM5(163)
+
+Going from level L - 1 to L takes 5 * L experience, so reaching level L from
+nothing takes 5 * L * (L + 1) / 2 in total. Reputations advance the same way
+with deeds in place of experience.
+"""
+
+import math
+
+import numpy
+
+# levels up to this are looked up in tables, anything higher is worked out
+MAX_TABLE_LEVEL = 100
+
+
+def _total_for_level(level: int) -> int:
+    return 5 * level * (level + 1) // 2
+
+
+_EXPERIENCE_FOR_LEVEL = [
+    _total_for_level(level) for level in range(MAX_TABLE_LEVEL + 1)
+]
+# level reached with each total amount of experience up to the top of the table
+_LEVEL_FOR_EXPERIENCE = [
+    level
+    for level in range(MAX_TABLE_LEVEL)
+    for _ in range(_EXPERIENCE_FOR_LEVEL[level], _EXPERIENCE_FOR_LEVEL[level + 1])
+]
+
+
+def experience_for_level(level: int) -> int:
+    """Total experience needed to reach level from level 0"""
+    if level < 0:
+        raise ValueError("level can't be negative")
+    if level <= MAX_TABLE_LEVEL:
+        return _EXPERIENCE_FOR_LEVEL[level]
+    return _total_for_level(level)
+
+
+def level_for_experience(total_experience: int) -> int:
+    """Level reached with total_experience starting from level 0"""
+    if total_experience < 0:
+        raise ValueError("total_experience can't be negative")
+    if total_experience < len(_LEVEL_FOR_EXPERIENCE):
+        return _LEVEL_FOR_EXPERIENCE[total_experience]
+    # largest L with 5 * L * (L + 1) / 2 <= total_experience
+    return (math.isqrt(8 * (total_experience // 5) + 1) - 1) // 2
+
+
+def advance(level: int, experience: int, gained: int) -> tuple[int, int]:
+    """New level and experience towards the next level after gaining experience
+
+    experience is what has been earned towards level + 1, just like
+    Ability.experience. Losing experience never lowers the level, the
+    experience is left to go negative instead.
+    """
+    if gained <= 0:
+        return level, experience + gained
+    total_experience = experience_for_level(level) + experience + gained
+    new_level = level_for_experience(total_experience)
+    return new_level, total_experience - experience_for_level(new_level)
+
+
+def level_for_experience_batch(total_experience: numpy.ndarray) -> numpy.ndarray:
+    """Level reached with each total amount of experience in an array"""
+    total_experience = numpy.asarray(total_experience, dtype=numpy.int64)
+    if (total_experience < 0).any():
+        raise ValueError("total_experience can't be negative")
+    triangles = total_experience // 5
+    levels = ((numpy.sqrt(8 * triangles + 1) - 1) // 2).astype(numpy.int64)
+    # the square root can land one off either way once it's rounded
+    levels += levels * (levels + 1) // 2 + levels + 1 <= triangles
+    levels -= levels * (levels + 1) // 2 > triangles
+    return levels
+
+
+def advance_batch(
+    levels: numpy.ndarray, experience: numpy.ndarray, gained: numpy.ndarray
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """advance for whole arrays of levels, experience and experience gained"""
+    levels = numpy.asarray(levels, dtype=numpy.int64)
+    experience = numpy.asarray(experience, dtype=numpy.int64)
+    gained = numpy.asarray(gained, dtype=numpy.int64)
+    total_experience = 5 * levels * (levels + 1) // 2 + experience + gained
+    gaining = gained > 0
+    new_levels = numpy.where(
+        gaining,
+        level_for_experience_batch(numpy.where(gaining, total_experience, 0)),
+        levels,
+    )
+    new_experience = numpy.where(
+        gaining,
+        total_experience - 5 * new_levels * (new_levels + 1) // 2,
+        experience + gained,
+    )
+    return new_levels, new_experience
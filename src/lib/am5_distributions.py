@@ -0,0 +1,151 @@
+"""Exact probability distributions for Ars Magica dice rolls"""
+
+from typing import NamedTuple
+import array
+import functools
+import math
+
+# chains of explosions less likely than this are cut off by default
+DEFAULT_EPSILON = 1e-10
+
+
+class StressRollOutcomeProbability(NamedTuple):
+    """One distinct way a stress roll (without modifier) can come out"""
+
+    value: int
+    explosions: int
+    botch_level: int
+    probability: float
+
+
+def explosions_for_epsilon(epsilon: float) -> int:
+    """Smallest number of explosions to track so the untracked chains are below epsilon"""
+    if not 0 < epsilon < 1:
+        raise ValueError("epsilon must be between 0 and 1")
+    max_explosions = 0
+    while 10.0 ** -(max_explosions + 1) > epsilon:
+        max_explosions += 1
+    return max_explosions
+
+
+@functools.lru_cache(maxsize=None)
+def stress_roll_outcomes(
+    botch_dice: int, max_explosions: int
+) -> tuple[tuple[StressRollOutcomeProbability, ...], float]:
+    """Every outcome of a stress roll up to max_explosions doublings
+
+    Returns the outcomes along with the probability of the 1s chaining on
+    past max_explosions, which isn't included in any of the outcomes.
+    """
+    if botch_dice < 0:
+        raise ValueError("botch_dice can't be negative")
+    outcomes = []
+
+    # a 0 is either a 0 or a botch with one level per botch die that comes up 0
+    for botch_level in range(botch_dice + 1):
+        outcomes.append(
+            StressRollOutcomeProbability(
+                0,
+                0,
+                botch_level,
+                0.1
+                * math.comb(botch_dice, botch_level)
+                * 0.1**botch_level
+                * 0.9 ** (botch_dice - botch_level),
+            )
+        )
+
+    for die_roll in range(2, 10):
+        outcomes.append(StressRollOutcomeProbability(die_roll, 0, 0, 0.1))
+
+    # a 1 followed by explosions - 1 more 1s and then anything else
+    for explosions in range(1, max_explosions + 1):
+        for die_roll in range(2, 11):
+            outcomes.append(
+                StressRollOutcomeProbability(
+                    die_roll * 2**explosions,
+                    explosions,
+                    0,
+                    10.0 ** -(explosions + 1),
+                )
+            )
+
+    return tuple(outcomes), 10.0 ** -(max_explosions + 1)
+
+
+class StressRollDistribution:
+    """Exact distribution of a stress roll with a given modifier and number of botch dice
+
+    Explosions past the epsilon cutoff are so unlikely that all of their
+    probability is put on the smallest value they could roll. This is exact
+    for every ease factor up to that value.
+    """
+
+    def __init__(
+        self, botch_dice: int = 1, modifier: int = 0, epsilon: float = DEFAULT_EPSILON
+    ) -> None:
+        self.botch_dice = botch_dice
+        self.modifier = modifier
+        self.epsilon = epsilon
+        max_explosions = explosions_for_epsilon(epsilon)
+        outcomes, self.truncated_probability = stress_roll_outcomes(
+            botch_dice, max_explosions
+        )
+
+        probabilities: dict[int, float] = {}
+        self.botch_probabilities: dict[int, float] = {}
+        for outcome in outcomes:
+            if outcome.botch_level:
+                self.botch_probabilities[outcome.botch_level] = outcome.probability
+            else:
+                value = outcome.value + modifier
+                probabilities[value] = (
+                    probabilities.get(value, 0.0) + outcome.probability
+                )
+        tail_value = 2 ** (max_explosions + 2) + modifier
+        probabilities[tail_value] = (
+            probabilities.get(tail_value, 0.0) + self.truncated_probability
+        )
+        self.probabilities = dict(sorted(probabilities.items()))
+
+        # dense table of the chance to meet each possible ease factor so
+        # that success checks are a single lookup
+        self._min_value = min(self.probabilities)
+        self._max_value = max(self.probabilities)
+        self._success_table = array.array(
+            "d", [0.0] * (self._max_value - self._min_value + 1)
+        )
+        running_total = 0.0
+        for value in range(self._max_value, self._min_value - 1, -1):
+            running_total += self.probabilities.get(value, 0.0)
+            self._success_table[value - self._min_value] = running_total
+
+    def probability_of_success(self, ease_factor: int) -> float:
+        """Chance that the roll doesn't botch and meets or beats the ease factor"""
+        if ease_factor > self._max_value:
+            return 0.0
+        return self._success_table[max(ease_factor - self._min_value, 0)]
+
+    def probability_of_botch(self) -> float:
+        """Chance that the roll botches at all"""
+        return sum(self.botch_probabilities.values())
+
+
+@functools.lru_cache(maxsize=None)
+def stress_roll_distribution(
+    botch_dice: int = 1, modifier: int = 0, epsilon: float = DEFAULT_EPSILON
+) -> StressRollDistribution:
+    """Memoized exact distribution of a stress roll"""
+    return StressRollDistribution(botch_dice, modifier, epsilon)
+
+
+def probability_of_success(
+    ease_factor: int,
+    botch_dice: int = 1,
+    modifier: int = 0,
+    epsilon: float = DEFAULT_EPSILON,
+) -> float:
+    """Chance that a stress roll plus modifier meets the ease factor without botching"""
+    return stress_roll_distribution(
+        botch_dice, modifier, epsilon
+    ).probability_of_success(ease_factor)
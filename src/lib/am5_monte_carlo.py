@@ -0,0 +1,198 @@
+"""Monte Carlo estimates of stress roll success rates spread across processes"""
+
+from typing import Iterable, Iterator, NamedTuple, Optional
+import concurrent.futures
+import math
+import statistics
+
+import numpy
+
+from lib import am5_rolls
+
+# results at or above this are all counted together, anything that big
+# comes up far too rarely to matter for any real ease factor
+MAX_TRACKED_RESULT = 1024
+
+
+class SuccessRate(NamedTuple):
+    """Estimated chance of success along with its confidence interval"""
+
+    rate: float
+    lower: float
+    upper: float
+    rolls: int
+
+
+class RollHistogram:
+    """Counts of unmodified stress roll results for one number of botch dice"""
+
+    def __init__(self, botch_dice: int) -> None:
+        self.botch_dice = botch_dice
+        self.rolls = 0
+        self.botches = 0
+        # counts of results that didn't botch, indexed by result
+        self.counts = numpy.zeros(MAX_TRACKED_RESULT + 1, dtype=numpy.int64)
+
+    def merge(self, other: "RollHistogram") -> None:
+        """Add the counts of another histogram for the same botch dice"""
+        if other.botch_dice != self.botch_dice:
+            raise ValueError("Can't merge histograms for different botch dice")
+        self.rolls += other.rolls
+        self.botches += other.botches
+        self.counts += other.counts
+
+    def copy(self) -> "RollHistogram":
+        """Independent copy of this histogram"""
+        histogram = RollHistogram(self.botch_dice)
+        histogram.merge(self)
+        return histogram
+
+    def success_rate(
+        self, modifier: int, ease_factor: int, confidence: float = 0.95
+    ) -> SuccessRate:
+        """Chance a roll with this modifier meets the ease factor, with a Wilson interval
+
+        Results past MAX_TRACKED_RESULT all share the last count, so needing
+        more than that on the dice raises ValueError rather than guessing.
+        """
+        needed = ease_factor - modifier
+        if needed > MAX_TRACKED_RESULT:
+            raise ValueError(
+                f"Can't tell how many rolls reached {needed},"
+                f" results are only tracked up to {MAX_TRACKED_RESULT}"
+            )
+        successes = int(self.counts[max(needed, 0) :].sum())
+        return _wilson_interval(successes, self.rolls, confidence)
+
+
+def _wilson_interval(successes: int, trials: int, confidence: float) -> SuccessRate:
+    if trials == 0:
+        return SuccessRate(0.0, 0.0, 1.0, 0)
+    z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+    rate = successes / trials
+    denominator = 1 + z**2 / trials
+    centre = (rate + z**2 / (2 * trials)) / denominator
+    spread = (
+        z * math.sqrt(rate * (1 - rate) / trials + z**2 / (4 * trials**2))
+    ) / denominator
+    return SuccessRate(
+        rate, max(centre - spread, 0.0), min(centre + spread, 1.0), trials
+    )
+
+
+def _simulate_shard(
+    botch_dice: int, rolls: int, seed: numpy.random.SeedSequence
+) -> RollHistogram:
+    results, botch_levels = am5_rolls.roll_stress_batch(
+        rolls, botch_dice, rng=numpy.random.default_rng(seed)
+    )
+    histogram = RollHistogram(botch_dice)
+    histogram.rolls = rolls
+    not_botched = botch_levels == 0
+    histogram.botches = rolls - int(numpy.count_nonzero(not_botched))
+    histogram.counts = numpy.bincount(
+        numpy.minimum(results[not_botched], MAX_TRACKED_RESULT),
+        minlength=MAX_TRACKED_RESULT + 1,
+    )
+    return histogram
+
+
+class SimulationProgress(NamedTuple):
+    """Histograms merged from every shard that has finished so far"""
+
+    completed_shards: int
+    total_shards: int
+    histograms: dict[int, RollHistogram]
+
+
+def iter_roll_histograms(
+    botch_dice_options: Iterable[int],
+    rolls: int,
+    seed: int,
+    shards: int = 16,
+    max_workers: Optional[int] = None,
+) -> Iterator[SimulationProgress]:
+    """Simulate rolls for every number of botch dice across a process pool
+
+    Each number of botch dice gets rolls stress rolls split over shards
+    worker tasks, each with its own seed spawned from seed so a run is
+    reproducible however the work is scheduled. Progress is yielded every
+    time a shard finishes so long runs can be watched, the last yield holds
+    the full results.
+    """
+    botch_dice_options = list(botch_dice_options)
+    seeds = iter(
+        numpy.random.SeedSequence(seed).spawn(len(botch_dice_options) * shards)
+    )
+    histograms = {
+        botch_dice: RollHistogram(botch_dice) for botch_dice in botch_dice_options
+    }
+    total_shards = len(botch_dice_options) * shards
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _simulate_shard,
+                botch_dice,
+                rolls // shards + (1 if shard < rolls % shards else 0),
+                next(seeds),
+            )
+            for botch_dice in botch_dice_options
+            for shard in range(shards)
+        ]
+        for completed_shards, future in enumerate(
+            concurrent.futures.as_completed(futures), start=1
+        ):
+            shard_histogram = future.result()
+            histograms[shard_histogram.botch_dice].merge(shard_histogram)
+            yield SimulationProgress(
+                completed_shards,
+                total_shards,
+                {
+                    botch_dice: histogram.copy()
+                    for botch_dice, histogram in histograms.items()
+                },
+            )
+
+
+def simulate_success_rates(
+    modifiers: Iterable[int],
+    ease_factors: Iterable[int],
+    botch_dice_options: Iterable[int],
+    rolls: int,
+    seed: int,
+    shards: int = 16,
+    max_workers: Optional[int] = None,
+    confidence: float = 0.95,
+) -> dict[tuple[int, int, int], SuccessRate]:
+    """Success rate table keyed by (modifier, ease factor, botch dice)
+
+    The modifier is the full characteristic + ability + other bonuses, it
+    only shifts the results so every modifier shares one simulation.
+    Raises ValueError before simulating anything if a combination needs
+    more than MAX_TRACKED_RESULT on the dice.
+    """
+    modifiers = list(modifiers)
+    ease_factors = list(ease_factors)
+    if modifiers and ease_factors:
+        needed = max(ease_factors) - min(modifiers)
+        if needed > MAX_TRACKED_RESULT:
+            raise ValueError(
+                f"Can't tell how many rolls reach {needed},"
+                f" results are only tracked up to {MAX_TRACKED_RESULT}"
+            )
+    progress = None
+    for progress in iter_roll_histograms(
+        botch_dice_options, rolls, seed, shards, max_workers
+    ):
+        pass
+    if progress is None:
+        return {}
+    return {
+        (modifier, ease_factor, botch_dice): histogram.success_rate(
+            modifier, ease_factor, confidence
+        )
+        for modifier in modifiers
+        for ease_factor in ease_factors
+        for botch_dice, histogram in progress.histograms.items()
+    }
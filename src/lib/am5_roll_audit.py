@@ -0,0 +1,155 @@
+"""Binary audit log of Ars Magica dice rolls so disputed rolls can be checked and replayed"""
+
+from typing import BinaryIO, Iterator, NamedTuple, Optional
+import mmap
+import os
+import struct
+import time
+
+from lib import am5_rolls
+
+_MAGIC = b"AM5ROLL1"
+# magic followed by the number of records written
+_HEADER = struct.Struct("<8sQ")
+_COUNT = struct.Struct("<Q")
+# timestamp, kind, raw die, explosions, padding, botch dice, botch level, result
+_RECORD = struct.Struct("<dBBBxHHq")
+
+
+class RollRecord(NamedTuple):
+    """A single recorded roll"""
+
+    timestamp: float
+    kind: am5_rolls.RollKind
+    raw_die: int
+    explosions: int
+    botch_dice: int
+    botch_level: int
+    result: int
+
+    def to_stress_outcome(self) -> am5_rolls.StressRollOutcome:
+        """The stress roll outcome this record was made from"""
+        if self.kind != am5_rolls.RollKind.STRESS:
+            raise ValueError("Only stress rolls have stress roll outcomes")
+        return am5_rolls.StressRollOutcome(
+            self.result, self.explosions, self.botch_level
+        )
+
+
+class CorruptRollAuditError(Exception):
+    """Exception raised when a file isn't a roll audit log"""
+
+
+class RollAuditLog:
+    """Appends fixed width roll records to a memory mapped file
+
+    Records are packed straight into the mapped file and the operating system
+    writes them out, so recording a roll costs a couple of struct packs. The
+    file grows by doubling whenever it fills up. Use it as an audit sink with
+    am5_rolls.set_roll_audit_sink, an existing log is appended to.
+    """
+
+    def __init__(self, path: str | os.PathLike, capacity: int = 65536) -> None:
+        self.path = path
+        self._file: BinaryIO = open(  # pylint: disable=R1732
+            path, "r+b" if os.path.exists(path) else "w+b"
+        )
+        existing_size = os.fstat(self._file.fileno()).st_size
+        if existing_size:
+            header = self._file.read(_HEADER.size)
+            if len(header) < _HEADER.size or not header.startswith(_MAGIC):
+                self._file.close()
+                raise CorruptRollAuditError(f"{path} is not a roll audit log")
+            _, self._count = _HEADER.unpack(header)
+        else:
+            self._count = 0
+        self._capacity = max(capacity, self._count, 1)
+        self._file.truncate(_HEADER.size + self._capacity * _RECORD.size)
+        self._mmap: Optional[mmap.mmap] = mmap.mmap(self._file.fileno(), 0)
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self._count)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __enter__(self) -> "RollAuditLog":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
+
+    def record(
+        self,
+        kind: am5_rolls.RollKind,
+        raw_die: int,
+        explosions: int,
+        botch_dice: int,
+        botch_level: int,
+        result: int,
+    ) -> None:
+        """Append a single roll to the log"""
+        if self._mmap is None:
+            raise ValueError("Can't record to a closed roll audit log")
+        if self._count == self._capacity:
+            self._grow()
+        _RECORD.pack_into(
+            self._mmap,
+            _HEADER.size + self._count * _RECORD.size,
+            time.time(),
+            kind,
+            raw_die,
+            min(explosions, 255),
+            botch_dice,
+            botch_level,
+            result,
+        )
+        self._count += 1
+        _COUNT.pack_into(self._mmap, len(_MAGIC), self._count)
+
+    def _grow(self) -> None:
+        assert self._mmap is not None
+        self._capacity *= 2
+        self._mmap.resize(_HEADER.size + self._capacity * _RECORD.size)
+
+    def flush(self) -> None:
+        """Make sure everything recorded so far is written to disk"""
+        if self._mmap is not None:
+            self._mmap.flush()
+
+    def close(self) -> None:
+        """Flush the log and trim the file down to just the records written"""
+        if self._mmap is None:
+            return
+        self._mmap.flush()
+        self._mmap.close()
+        self._mmap = None
+        self._file.truncate(_HEADER.size + self._count * _RECORD.size)
+        self._file.close()
+
+
+def iter_roll_records(path: str | os.PathLike) -> Iterator[RollRecord]:
+    """Read back every roll recorded in a roll audit log"""
+    with open(path, "rb") as audit_file:
+        data = audit_file.read()
+    if len(data) < _HEADER.size:
+        raise CorruptRollAuditError(f"{path} is not a roll audit log")
+    magic, count = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise CorruptRollAuditError(f"{path} is not a roll audit log")
+    records = data[_HEADER.size : _HEADER.size + count * _RECORD.size]
+    for timestamp, kind, *rest in _RECORD.iter_unpack(records):
+        yield RollRecord(timestamp, am5_rolls.RollKind(kind), *rest)
+
+
+def replay_stress_outcomes(
+    path: str | os.PathLike,
+) -> list[am5_rolls.StressRollOutcome]:
+    """Recorded stress rolls in order, ready to pass as recovery_roll_results
+
+    Botched rolls keep their botch level so replaying them into the
+    WoundTracker.recover_all_* methods makes the wound worse just as before.
+    """
+    return [
+        record.to_stress_outcome()
+        for record in iter_roll_records(path)
+        if record.kind == am5_rolls.RollKind.STRESS
+    ]
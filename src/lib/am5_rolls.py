@@ -1,39 +1,345 @@
 """Library functions for Ars Magica dice rolls"""
 
+from typing import NamedTuple, Optional, Protocol
+import enum
 import random
 
+import numpy
 
-def roll_standard(modifier: int = 0) -> int:
+# batch rolls are made in chunks of this many dice to stay in cache
+_BATCH_CHUNK_SIZE = 16384
+
+
+class RollKind(enum.IntEnum):
+    """The kinds of roll that get recorded by an audit sink"""
+
+    STANDARD = 0
+    STRESS = 1
+
+
+class RollAuditSink(Protocol):
+    """Somewhere to record every roll that gets made"""
+
+    def record(
+        self,
+        kind: RollKind,
+        raw_die: int,
+        explosions: int,
+        botch_dice: int,
+        botch_level: int,
+        result: int,
+    ) -> None:
+        """Record a single roll"""
+
+
+_roll_audit_sink: Optional[RollAuditSink] = None
+
+
+def set_roll_audit_sink(sink: Optional[RollAuditSink]) -> None:
+    """Record every standard and stress roll to sink, None stops recording"""
+    global _roll_audit_sink  # pylint: disable=W0603
+    _roll_audit_sink = sink
+
+
+def roll_standard(modifier: int = 0, rng: Optional[random.Random] = None) -> int:
     """Standard dice roll"""
-    return random.randint(1, 10) + modifier
+    randint = random.randint if rng is None else rng.randint
+    die_roll = randint(1, 10)
+    if _roll_audit_sink is not None:
+        _roll_audit_sink.record(
+            RollKind.STANDARD, die_roll, 0, 0, 0, die_roll + modifier
+        )
+    return die_roll + modifier
 
 
-def roll_stress(botch_dice: int = 1, modifier: int = 0) -> int:
+def roll_stress(
+    botch_dice: int = 1,
+    modifier: int = 0,
+    rng: Optional[random.Random] = None,
+    backend: Optional["StressRollBackend"] = None,
+) -> int:
     """Stress roll with exploding 1s and botch potential on 0"""
-    die_roll = random.randint(0, 9)
+    outcome = roll_stress_outcome(botch_dice, modifier, rng, backend)
+    if outcome.botch_level:
+        raise BotchedRollExcption(botch_level=outcome.botch_level)
+    return outcome.value
+
+
+class StressRollOutcome(NamedTuple):
+    """Result of a stress roll with any botch reported rather than raised"""
+
+    value: int
+    explosions: int
+    botch_level: int
+
+
+class StressRollBackend(Protocol):
+    """Something other than the dice that can make stress rolls"""
+
+    def roll_stress_outcome(
+        self, botch_dice: int, modifier: int, rng: Optional[random.Random]
+    ) -> StressRollOutcome:
+        """Make a single stress roll"""
+
+    def roll_stress_batch(
+        self,
+        n: int,
+        botch_dice: int,
+        modifier: int,
+        rng: Optional[numpy.random.Generator],
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Make n stress rolls returning results and botch levels"""
+
+
+_stress_roll_backend: Optional[StressRollBackend] = None
+
+
+def set_stress_roll_backend(backend: Optional[StressRollBackend]) -> None:
+    """Make stress rolls with backend unless a call picks its own, None means dice"""
+    global _stress_roll_backend  # pylint: disable=W0603
+    _stress_roll_backend = backend
+
+
+def roll_stress_outcome(
+    botch_dice: int = 1,
+    modifier: int = 0,
+    rng: Optional[random.Random] = None,
+    backend: Optional[StressRollBackend] = None,
+) -> StressRollOutcome:
+    """Stress roll that returns botches in the outcome instead of raising them
+
+    This uses the dice exactly as roll_stress does, a botched roll has a value
+    of just the modifier.
+    """
+    if backend is None:
+        backend = _stress_roll_backend
+    if backend is not None:
+        outcome = backend.roll_stress_outcome(botch_dice, modifier, rng)
+    else:
+        outcome = _roll_stress_dice(botch_dice, modifier, rng)
+    if _roll_audit_sink is not None:
+        _audit_stress_roll(_roll_audit_sink, outcome, botch_dice, modifier)
+    return outcome
+
+
+def _roll_stress_dice(
+    botch_dice: int, modifier: int, rng: Optional[random.Random]
+) -> StressRollOutcome:
+    randint = random.randint if rng is None else rng.randint
+    die_roll = randint(0, 9)
     if die_roll == 0:
-        return _botch_roll(botch_dice, modifier)
+        return StressRollOutcome(modifier, 0, _count_botches(botch_dice, rng))
     elif die_roll == 1:
-        return _explode_stress() + modifier
+        value, explosions = _explode_stress_with_depth(rng)
+        return StressRollOutcome(value + modifier, explosions, 0)
     else:
-        return die_roll + modifier
+        return StressRollOutcome(die_roll + modifier, 0, 0)
+
+
+def _audit_stress_roll(
+    sink: RollAuditSink, outcome: StressRollOutcome, botch_dice: int, modifier: int
+) -> None:
+    # the first die can be worked out from the outcome whatever made the roll
+    if outcome.explosions:
+        raw_die = 1
+    elif outcome.botch_level:
+        raw_die = 0
+    else:
+        raw_die = outcome.value - modifier
+    sink.record(
+        RollKind.STRESS,
+        raw_die,
+        outcome.explosions,
+        botch_dice,
+        outcome.botch_level,
+        outcome.value,
+    )
+
 
+def _explode_stress(rng: Optional[random.Random] = None):
+    return _explode_stress_with_depth(rng)[0]
 
-def _explode_stress():
-    die_roll = random.randint(1, 10)
-    if die_roll == 1:
-        die_roll = _explode_stress()
-    return 2 * die_roll
 
+def _explode_stress_with_depth(rng: Optional[random.Random] = None) -> tuple[int, int]:
+    # each reroll doubles whatever comes after it, so roll until we stop
+    # getting 1s and double the last die once per reroll
+    randint = random.randint if rng is None else rng.randint
+    explosions = 1
+    die_roll = randint(1, 10)
+    while die_roll == 1:
+        explosions += 1
+        die_roll = randint(1, 10)
+    return die_roll * 2**explosions, explosions
 
-def _botch_roll(botch_dice_num: int, modifier: int) -> int:
-    dice_rolls = [random.randint(0, 9) == 0 for i in range(botch_dice_num)]
-    if any(dice_rolls):
-        raise BotchedRollExcption(botch_level=sum(dice_rolls))
+
+def _count_botches(botch_dice_num: int, rng: Optional[random.Random] = None) -> int:
+    randint = random.randint if rng is None else rng.randint
+    return sum([randint(0, 9) == 0 for i in range(botch_dice_num)])
+
+
+def _botch_roll(
+    botch_dice_num: int, modifier: int, rng: Optional[random.Random] = None
+) -> int:
+    botch_level = _count_botches(botch_dice_num, rng)
+    if botch_level:
+        raise BotchedRollExcption(botch_level=botch_level)
     else:
         return modifier
 
 
+def spawn_rngs(seed: int, count: int) -> list[random.Random]:
+    """Make count independent and reproducible random streams from one seed
+
+    Each stream is its own random.Random so workers can roll without sharing
+    any state, and the same seed always gives the same streams.
+    """
+    return [
+        random.Random(int.from_bytes(child.generate_state(8).tobytes(), "little"))
+        for child in numpy.random.SeedSequence(seed).spawn(count)
+    ]
+
+
+def spawn_generators(seed: int, count: int) -> list[numpy.random.Generator]:
+    """Make count independent and reproducible numpy generators for batch rolls"""
+    return [
+        numpy.random.default_rng(child)
+        for child in numpy.random.SeedSequence(seed).spawn(count)
+    ]
+
+
+def roll_standard_batch(
+    n: int, modifier: int = 0, rng: Optional[numpy.random.Generator] = None
+) -> numpy.ndarray:
+    """Make n standard dice rolls at once"""
+    if rng is None:
+        rng = numpy.random.default_rng()
+    results = rng.integers(1, 11, size=n, dtype=numpy.int64) + modifier
+    if _roll_audit_sink is not None:
+        record = _roll_audit_sink.record
+        for result in results.tolist():
+            record(RollKind.STANDARD, result - modifier, 0, 0, 0, result)
+    return results
+
+
+def roll_stress_batch(
+    n: int,
+    botch_dice: int = 1,
+    modifier: int = 0,
+    rng: Optional[numpy.random.Generator] = None,
+    backend: Optional[StressRollBackend] = None,
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Make n stress rolls at once
+
+    Returns the results and the botch levels as parallel arrays. Botches never
+    raise, a botched roll has a result of just the modifier and a botch level
+    above 0, exactly as the 0 on the die would be scored if it didn't botch.
+    Every roll is recorded to the audit sink if one is set. A backend's batch
+    doesn't say which rolls exploded, so those are recorded with the fewest
+    explosions that could have given each result.
+    """
+    if backend is None:
+        backend = _stress_roll_backend
+    if backend is not None:
+        results, botch_levels = backend.roll_stress_batch(n, botch_dice, modifier, rng)
+        if _roll_audit_sink is not None:
+            _audit_stress_batch(
+                _roll_audit_sink,
+                results,
+                botch_levels,
+                _fewest_explosions(results - modifier),
+                botch_dice,
+                modifier,
+            )
+        return results, botch_levels
+    if rng is None:
+        rng = numpy.random.default_rng()
+    results = numpy.empty(n, dtype=numpy.int64)
+    botch_levels = numpy.zeros(n, dtype=numpy.int64)
+    # explosions are only kept when something is going to record them
+    explosions = None if _roll_audit_sink is None else numpy.zeros_like(results)
+    for start in range(0, n, _BATCH_CHUNK_SIZE):
+        stop = min(start + _BATCH_CHUNK_SIZE, n)
+        _roll_stress_chunk(
+            results[start:stop],
+            botch_levels[start:stop],
+            botch_dice,
+            rng,
+            None if explosions is None else explosions[start:stop],
+        )
+    results += modifier
+    if _roll_audit_sink is not None and explosions is not None:
+        _audit_stress_batch(
+            _roll_audit_sink, results, botch_levels, explosions, botch_dice, modifier
+        )
+    return results, botch_levels
+
+
+def _fewest_explosions(unmodified_results: numpy.ndarray) -> numpy.ndarray:
+    # the final die of an explosion is 2 to 10, so halve anything over 10
+    # until it isn't, and a 10 on its own must have doubled a 5
+    values = unmodified_results.copy()
+    explosions = (values == 10).astype(numpy.int64)
+    exploding = values > 10
+    while exploding.any():
+        explosions[exploding] += 1
+        values[exploding] //= 2
+        exploding = values > 10
+    return explosions
+
+
+def _audit_stress_batch(
+    sink: RollAuditSink,
+    results: numpy.ndarray,
+    botch_levels: numpy.ndarray,
+    explosions: numpy.ndarray,
+    botch_dice: int,
+    modifier: int,
+) -> None:
+    # the same records _audit_stress_roll makes for each roll in turn
+    record = sink.record
+    for result, botch_level, roll_explosions in zip(
+        results.tolist(), botch_levels.tolist(), explosions.tolist()
+    ):
+        if roll_explosions:
+            raw_die = 1
+        elif botch_level:
+            raw_die = 0
+        else:
+            raw_die = result - modifier
+        record(
+            RollKind.STRESS,
+            raw_die,
+            roll_explosions,
+            botch_dice,
+            botch_level,
+            result,
+        )
+
+
+def _roll_stress_chunk(
+    results: numpy.ndarray,
+    botch_levels: numpy.ndarray,
+    botch_dice: int,
+    rng: numpy.random.Generator,
+    explosions: Optional[numpy.ndarray] = None,
+) -> None:
+    dice = rng.integers(0, 10, size=results.size, dtype=numpy.uint8)
+    results[:] = dice
+
+    # each botch die independently comes up 0 one time in ten
+    zeros = numpy.flatnonzero(dice == 0)
+    botch_levels[zeros] = rng.binomial(botch_dice, 0.1, size=zeros.size)
+
+    # a 1 keeps rerolling and doubling until something other than a 1 comes up,
+    # so the number of doublings is geometric and the last die is uniform 2-10
+    exploding = numpy.flatnonzero(dice == 1)
+    final_dice = rng.integers(2, 11, size=exploding.size, dtype=numpy.int64)
+    doublings = rng.geometric(0.9, size=exploding.size)
+    results[exploding] = final_dice << doublings
+    if explosions is not None:
+        explosions[exploding] = doublings
+
+
 class BotchedRollExcption(Exception):
     """Exception raised when a stress roll botches"""
 
@@ -0,0 +1,172 @@
+"""Table based sampling of Ars Magica stress rolls"""
+
+from typing import NamedTuple, Optional
+import math
+import random
+
+import numpy
+
+from lib import am5_distributions
+from lib.am5_rolls import StressRollOutcome
+
+# the chance of a 1 coming up on any reroll of an exploding die
+_LOG_EXPLODE_CHANCE = math.log(0.1)
+
+# batch rolls are sampled in chunks of this many to stay in cache
+_BATCH_CHUNK_SIZE = 16384
+
+
+class _AliasTable(NamedTuple):
+    outcomes: list[StressRollOutcome]
+    thresholds: list[float]
+    aliases: list[int]
+    threshold_array: numpy.ndarray
+    alias_array: numpy.ndarray
+    values: numpy.ndarray
+    botch_levels: numpy.ndarray
+
+
+class StressRollSampler:
+    """Draws stress rolls from an alias table of every possible outcome
+
+    Each roll takes one uniform variate, which picks a slot of the table and
+    then decides between that slot's outcome and its alias. Explosions past
+    max_explosions all share one slot of the table. On the rare occasion
+    that slot is drawn, a second uniform variate picks the final die and how
+    many more times it doubled. The rolls this makes follow the same
+    distribution as actually rolling the dice.
+    """
+
+    def __init__(self, max_explosions: int = 4) -> None:
+        if max_explosions < 0:
+            raise ValueError("max_explosions can't be negative")
+        self.max_explosions = max_explosions
+        self._tables: dict[int, _AliasTable] = {}
+
+    def _table_for(self, botch_dice: int) -> _AliasTable:
+        if botch_dice not in self._tables:
+            self._tables[botch_dice] = self._build_table(botch_dice)
+        return self._tables[botch_dice]
+
+    def _build_table(self, botch_dice: int) -> _AliasTable:
+        outcome_probabilities, _ = am5_distributions.stress_roll_outcomes(
+            botch_dice, self.max_explosions
+        )
+        outcomes = [
+            StressRollOutcome(outcome.value, outcome.explosions, outcome.botch_level)
+            for outcome in outcome_probabilities
+        ]
+        probabilities = [outcome.probability for outcome in outcome_probabilities]
+        # the last slot stands for every explosion deeper than the table
+        probabilities.append(max(1.0 - sum(probabilities), 0.0))
+        slots = len(probabilities)
+
+        # Vose's alias method, every slot gets filled up to an even share by
+        # borrowing from a slot that has more than its share
+        scaled = [probability * slots for probability in probabilities]
+        thresholds = [1.0] * slots
+        aliases = list(range(slots))
+        small = [slot for slot, share in enumerate(scaled) if share < 1.0]
+        large = [slot for slot, share in enumerate(scaled) if share >= 1.0]
+        while small and large:
+            small_slot = small.pop()
+            large_slot = large.pop()
+            thresholds[small_slot] = scaled[small_slot]
+            aliases[small_slot] = large_slot
+            scaled[large_slot] -= 1.0 - scaled[small_slot]
+            if scaled[large_slot] < 1.0:
+                small.append(large_slot)
+            else:
+                large.append(large_slot)
+
+        return _AliasTable(
+            outcomes,
+            thresholds,
+            aliases,
+            numpy.array(thresholds),
+            numpy.array(aliases),
+            numpy.array([outcome.value for outcome in outcomes] + [0]),
+            numpy.array([outcome.botch_level for outcome in outcomes] + [0]),
+        )
+
+    def _deep_explosion(self, variate: float) -> StressRollOutcome:
+        # spread the variate over the 9 final dice and then reuse what is
+        # left of it to pick the number of extra doublings past the table
+        scaled = variate * 9
+        die_roll = int(scaled) + 2
+        remainder = 1.0 - (scaled - int(scaled))
+        explosions = (
+            self.max_explosions + 1 + int(math.log(remainder) / _LOG_EXPLODE_CHANCE)
+        )
+        return StressRollOutcome(die_roll * 2**explosions, explosions, 0)
+
+    def roll_stress_outcome(
+        self,
+        botch_dice: int = 1,
+        modifier: int = 0,
+        rng: Optional[random.Random] = None,
+    ) -> StressRollOutcome:
+        """Sample a single stress roll"""
+        uniform = random.random if rng is None else rng.random
+        table = self._table_for(botch_dice)
+        scaled = uniform() * len(table.thresholds)
+        slot = int(scaled)
+        if scaled - slot >= table.thresholds[slot]:
+            slot = table.aliases[slot]
+        if slot < len(table.outcomes):
+            outcome = table.outcomes[slot]
+        else:
+            outcome = self._deep_explosion(uniform())
+        if modifier:
+            return outcome._replace(value=outcome.value + modifier)
+        return outcome
+
+    def roll_stress_batch(
+        self,
+        n: int,
+        botch_dice: int = 1,
+        modifier: int = 0,
+        rng: Optional[numpy.random.Generator] = None,
+    ) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Sample n stress rolls at once, returning results and botch levels"""
+        if rng is None:
+            rng = numpy.random.default_rng()
+        table = self._table_for(botch_dice)
+        results = numpy.empty(n, dtype=numpy.int64)
+        botch_levels = numpy.empty(n, dtype=numpy.int64)
+        for start in range(0, n, _BATCH_CHUNK_SIZE):
+            stop = min(start + _BATCH_CHUNK_SIZE, n)
+            self._sample_chunk(
+                table, results[start:stop], botch_levels[start:stop], rng
+            )
+        results += modifier
+        return results, botch_levels
+
+    def _sample_chunk(
+        self,
+        table: _AliasTable,
+        results: numpy.ndarray,
+        botch_levels: numpy.ndarray,
+        rng: numpy.random.Generator,
+    ) -> None:
+        scaled = rng.random(results.size) * len(table.thresholds)
+        slots = scaled.astype(numpy.int64)
+        slots = numpy.where(
+            scaled - slots < table.threshold_array[slots],
+            slots,
+            table.alias_array[slots],
+        )
+        results[:] = table.values[slots]
+        botch_levels[:] = table.botch_levels[slots]
+        deep = numpy.flatnonzero(slots == len(table.outcomes))
+        if deep.size:
+            scaled_deep = rng.random(deep.size) * 9
+            die_rolls = numpy.floor(scaled_deep)
+            explosions = (
+                self.max_explosions
+                + 1
+                + (
+                    numpy.log(1.0 - (scaled_deep - die_rolls)) / _LOG_EXPLODE_CHANCE
+                ).astype(numpy.int64)
+            )
+            results[deep] = (die_rolls.astype(numpy.int64) + 2) << explosions
@@ -0,0 +1,93 @@
+"""Batched assignment for pydantic models that validate every assignment"""
+
+from typing import Any, ClassVar, Iterator, Self
+import contextlib
+
+import pydantic
+
+
+class BatchUpdateModel(pydantic.BaseModel):
+    """Base for models that can defer assignment validation to a single check
+
+    Inside batch_update assignments to fields go straight into the model so
+    intermediate states that wouldn't validate are fine. The whole model is
+    validated once on the way out and put back how it was if that fails.
+    """
+
+    _batch_update_depth: int = pydantic.PrivateAttr(default=0)
+    # fields that can be assigned without validation inside a batch update
+    _BATCHABLE_FIELDS: ClassVar[frozenset[str]] = frozenset()
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+        cls._BATCHABLE_FIELDS = frozenset(
+            name for name, field in cls.model_fields.items() if not field.frozen
+        )
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # the depth is read straight out of the private attributes since going
+        # through pydantic for it costs more than the rest of this put together
+        if (
+            name in self._BATCHABLE_FIELDS
+            and self.__pydantic_private__["_batch_update_depth"]
+        ):
+            self.__dict__[name] = value
+            self.__pydantic_fields_set__.add(name)
+        else:
+            super().__setattr__(name, value)
+
+    @contextlib.contextmanager
+    def batch_update(self) -> Iterator[Self]:
+        """Assign any number of fields and validate them all together at the end
+
+        Raises pydantic.ValidationError after rolling back if the model isn't
+        valid once the block finishes. Nested blocks are only checked when
+        the outermost one finishes.
+        """
+        private = self.__pydantic_private__
+        if private["_batch_update_depth"]:
+            private["_batch_update_depth"] += 1
+            try:
+                yield self
+            finally:
+                private["_batch_update_depth"] -= 1
+            return
+
+        saved_values = dict(self.__dict__)
+        saved_fields_set = set(self.__pydantic_fields_set__)
+        private["_batch_update_depth"] = 1
+        try:
+            yield self
+        except BaseException:
+            self._restore(saved_values, saved_fields_set)
+            raise
+        finally:
+            private["_batch_update_depth"] = 0
+
+        fields_set = set(self.__pydantic_fields_set__)
+        try:
+            self.__pydantic_validator__.validate_python(
+                dict(self.__dict__), self_instance=self
+            )
+        except pydantic.ValidationError:
+            object.__setattr__(self, "__pydantic_private__", private)
+            self._restore(saved_values, saved_fields_set)
+            raise
+        # validating in place resets these so put them back
+        object.__setattr__(self, "__pydantic_private__", private)
+        object.__setattr__(self, "__pydantic_fields_set__", fields_set)
+        self._fields_replaced()
+
+    def _restore(self, values: dict[str, Any], fields_set: set[str]) -> None:
+        self.__dict__.clear()
+        self.__dict__.update(values)
+        object.__setattr__(self, "__pydantic_fields_set__", fields_set)
+        self._fields_replaced()
+
+    def _fields_replaced(self) -> None:
+        """Called after a batch update sets fields without going through __setattr__
+
+        Subclasses that cache anything worked out from their fields should
+        clear it here.
+        """
@@ -0,0 +1,258 @@
+"""Monte Carlo simulation of whole battles to check scenario balance"""
+
+from typing import Iterable, NamedTuple, Optional
+import concurrent.futures
+import random
+import time
+
+import numpy
+
+from characters.parts import fatigue
+from characters.parts import wound_tracker
+from lib import am5_rolls
+
+
+class CombatantProfile(NamedTuple):
+    """Combat scores shared by every combatant of one kind ArM5(171-173)"""
+
+    # attack and defense totals are characteristic + ability + weapon
+    attack: int
+    defense: int
+    # strength + weapon damage
+    damage: int
+    soak: int
+    size: int = 0
+    botch_dice: int = 1
+
+
+class Side(NamedTuple):
+    """A group of identical combatants fighting together"""
+
+    name: str
+    profile: CombatantProfile
+    count: int
+
+
+class BattleOutcome(NamedTuple):
+    """How one simulated battle ended"""
+
+    rounds: int
+    # for each side in order
+    killed: tuple[int, ...]
+    out_of_action: tuple[int, ...]
+    # index of the only side left standing, None for a draw
+    winner: Optional[int]
+
+
+class BattleReport(NamedTuple):
+    """Outcomes of many simulated battles of the same scenario"""
+
+    battles: int
+    rounds: int
+    seconds: float
+    rounds_per_second: float
+    # for each side, how many battles ended with each number of casualties
+    killed: dict[str, numpy.ndarray]
+    out_of_action: dict[str, numpy.ndarray]
+    # battles won by each side, draws under None
+    wins: dict[Optional[str], int]
+
+
+class _Combatant:
+    __slots__ = ("side", "profile", "wounds", "fatigue")
+
+    def __init__(self, side: int, profile: CombatantProfile) -> None:
+        self.side = side
+        self.profile = profile
+        self.wounds = wound_tracker.WoundTracker(size=profile.size)
+        self.fatigue = fatigue.FatigueTracker()
+
+    def penalty(self) -> Optional[int]:
+        """Wound and fatigue penalty to every roll, None if out of the fight"""
+        wound_bonus = self.wounds.wound_bonus
+        fatigue_bonus = self.fatigue.bonus
+        if wound_bonus is None or fatigue_bonus is False:
+            return None
+        return wound_bonus + fatigue_bonus
+
+
+def _roll(botch_dice: int, modifier: int, rng: random.Random) -> Optional[int]:
+    try:
+        return am5_rolls.roll_stress(botch_dice, modifier, rng)
+    except am5_rolls.BotchedRollExcption:
+        return None
+
+
+def simulate_battle(
+    sides: Iterable[Side],
+    rng: random.Random,
+    max_rounds: int = 50,
+    rounds_per_fatigue_level: Optional[int] = None,
+) -> BattleOutcome:
+    """Fight one battle until only one side can still fight or max_rounds pass
+
+    Every round each combatant still fighting, in a random order, attacks
+    a random enemy still fighting. Attack and defense are stress rolls with
+    the attacker's and defender's wound and fatigue penalties applied. A
+    botched attack misses and a botched defense counts as 0. Damage is the
+    margin of success plus damage less soak, and anything left is taken
+    through take_damage. Every rounds_per_fatigue_level rounds everyone
+    still fighting loses a short term fatigue level.
+    """
+    sides = list(sides)
+    combatants = [
+        _Combatant(index, side.profile)
+        for index, side in enumerate(sides)
+        for _ in range(side.count)
+    ]
+    # everyone still able to fight on each side
+    standing = [
+        [combatant for combatant in combatants if combatant.side == index]
+        for index in range(len(sides))
+    ]
+    rounds = 0
+    while rounds < max_rounds and sum(map(bool, standing)) > 1:
+        rounds += 1
+        fighting = [combatant for side in standing for combatant in side]
+        rng.shuffle(fighting)
+        for attacker in fighting:
+            attack_penalty = attacker.penalty()
+            if attack_penalty is None:
+                continue
+            enemies = sum(
+                len(side)
+                for index, side in enumerate(standing)
+                if index != attacker.side
+            )
+            if not enemies:
+                break
+            defender = _pick_enemy(standing, attacker.side, rng.randrange(enemies))
+            attack = _roll(
+                attacker.profile.botch_dice,
+                attacker.profile.attack + attack_penalty,
+                rng,
+            )
+            if attack is None:
+                continue
+            defense = _roll(
+                defender.profile.botch_dice,
+                defender.profile.defense + defender.penalty(),
+                rng,
+            )
+            if defense is None:
+                defense = 0
+            if attack <= defense:
+                continue
+            damage = attack - defense + attacker.profile.damage - defender.profile.soak
+            if damage > 0:
+                defender.wounds.take_damage(damage)
+                if defender.penalty() is None:
+                    standing[defender.side].remove(defender)
+        if rounds_per_fatigue_level and rounds % rounds_per_fatigue_level == 0:
+            for side in standing:
+                for combatant in side:
+                    combatant.fatigue.short_term_levels += 1
+            standing = [
+                [combatant for combatant in side if combatant.penalty() is not None]
+                for side in standing
+            ]
+
+    killed = [0] * len(sides)
+    out_of_action = [0] * len(sides)
+    for combatant in combatants:
+        if combatant.wounds.dead:
+            killed[combatant.side] += 1
+        if combatant.penalty() is None:
+            out_of_action[combatant.side] += 1
+    still_standing = [index for index, side in enumerate(standing) if side]
+    winner = still_standing[0] if len(still_standing) == 1 else None
+    return BattleOutcome(rounds, tuple(killed), tuple(out_of_action), winner)
+
+
+def _pick_enemy(
+    standing: list[list[_Combatant]], own_side: int, pick: int
+) -> _Combatant:
+    for index, side in enumerate(standing):
+        if index == own_side:
+            continue
+        if pick < len(side):
+            return side[pick]
+        pick -= len(side)
+    raise IndexError(pick)
+
+
+def _simulate_shard(
+    sides: list[Side],
+    battles: int,
+    rng: random.Random,
+    max_rounds: int,
+    rounds_per_fatigue_level: Optional[int],
+) -> list[BattleOutcome]:
+    return [
+        simulate_battle(sides, rng, max_rounds, rounds_per_fatigue_level)
+        for _ in range(battles)
+    ]
+
+
+def simulate_battles(
+    sides: Iterable[Side],
+    battles: int,
+    seed: int,
+    max_rounds: int = 50,
+    rounds_per_fatigue_level: Optional[int] = None,
+    shards: int = 16,
+    max_workers: Optional[int] = None,
+) -> BattleReport:
+    """Fight the same battle many times across a process pool
+
+    The battles are split over shards worker tasks, each with its own seed
+    spawned from seed so a run is reproducible however the work is
+    scheduled. Rounds per second is every round fought over the wall clock
+    time of the whole run.
+    """
+    sides = list(sides)
+    names = [side.name for side in sides]
+    if len(set(names)) != len(names):
+        raise ValueError("Every side needs its own name")
+    rngs = am5_rolls.spawn_rngs(seed, shards)
+    killed = {
+        side.name: numpy.zeros(side.count + 1, dtype=numpy.int64) for side in sides
+    }
+    out_of_action = {
+        side.name: numpy.zeros(side.count + 1, dtype=numpy.int64) for side in sides
+    }
+    wins: dict[Optional[str], int] = {name: 0 for name in names}
+    wins[None] = 0
+    rounds = 0
+
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _simulate_shard,
+                sides,
+                battles // shards + (1 if shard < battles % shards else 0),
+                rngs[shard],
+                max_rounds,
+                rounds_per_fatigue_level,
+            )
+            for shard in range(shards)
+        ]
+        for future in futures:
+            for outcome in future.result():
+                rounds += outcome.rounds
+                for index, name in enumerate(names):
+                    killed[name][outcome.killed[index]] += 1
+                    out_of_action[name][outcome.out_of_action[index]] += 1
+                wins[None if outcome.winner is None else names[outcome.winner]] += 1
+    seconds = time.perf_counter() - start
+
+    return BattleReport(
+        battles,
+        rounds,
+        seconds,
+        rounds / seconds if seconds else 0.0,
+        killed,
+        out_of_action,
+        wins,
+    )
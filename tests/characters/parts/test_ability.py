@@ -50,3 +50,45 @@ class TestAbility:
         ability_fixture.add_experience(20)
         assert ability_fixture.level == 2
         assert ability_fixture.experience == 5
+
+    def test_add_lots_of_experience(self, ability_fixture: ability.Ability):
+        """Test that a large amount of experience advances many levels at once"""
+        ability_fixture.add_experience(25250 + 7)
+        assert ability_fixture.level == 100
+        assert ability_fixture.experience == 7
+        ability_fixture.add_experience(500)
+        assert ability_fixture.level == 101
+        assert ability_fixture.experience == 2
+
+    def test_add_negative_experience(self, ability_fixture: ability.Ability):
+        """Test that losing more experience than we have is still rejected"""
+        ability_fixture.add_experience(12)
+        with pytest.raises(pydantic.ValidationError):
+            ability_fixture.add_experience(-8)
+        assert ability_fixture.level == 1
+        assert ability_fixture.experience == 7
+
+    def test_level_listener(self, ability_fixture: ability.Ability):
+        """Test that listeners hear about level changes from add_experience"""
+        changes = []
+
+        def listener(changed: ability.Ability, old_level: int, new_level: int):
+            changes.append((changed.name, old_level, new_level))
+
+        ability_fixture.add_level_listener(listener)
+        ability_fixture.add_experience(3)
+        ability_fixture.add_experience(12)
+        ability_fixture.remove_level_listener(listener)
+        ability_fixture.add_experience(100)
+        assert changes == [("Test Ability", 0, 2)]
+
+    @pytest.mark.parametrize("deep", [False, True])
+    def test_copies_have_no_listeners(self, ability_fixture: ability.Ability, deep):
+        """Test that copies don't tell the original's listeners about changes"""
+        changes = []
+        ability_fixture.add_level_listener(lambda *change: changes.append(change))
+        copy = ability_fixture.model_copy(deep=deep)
+        copy.set_progress(5, 0)
+        ability_fixture.set_progress(1, 0)
+        assert len(changes) == 1
+        assert changes[0][0] is ability_fixture
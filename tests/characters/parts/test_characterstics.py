@@ -1,5 +1,10 @@
 """Tests for characterstics"""
 
+import collections
+import itertools
+import random
+
+import numpy
 import pytest
 
 from characters.parts import characterstics
@@ -134,3 +139,293 @@ class TestCharacterstics:
         """Test that we can subtract values from all characterstics"""
         for _, val in characteristic_fixture - 1:
             assert val == -1
+
+
+class TestCompactCharacteristics:
+    """Tests for the slotted characterstics without pydantic"""
+
+    @pytest.fixture
+    def compact_fixture(self) -> characterstics.CompactCharacteristics:
+        """Compact characterstics with a mix of values"""
+        return characterstics.CompactCharacteristics([2, -1, 3, -2, 0, 1, 1, -3])
+
+    def test_round_trip(self, compact_fixture: characterstics.CompactCharacteristics):
+        """Test converting to a model and back keeps every value"""
+        model = compact_fixture.to_model()
+        assert isinstance(model, characterstics.Characteristics)
+        assert model.stamina == -1
+        assert model.to_compact() == compact_fixture
+        assert compact_fixture == model
+
+    def test_arithmetic(self, compact_fixture: characterstics.CompactCharacteristics):
+        """Test that arithmetic matches the model"""
+        model = compact_fixture.to_model()
+        assert compact_fixture + 1 == model + 1
+        assert compact_fixture - 2 == model - 2
+        assert hash(compact_fixture + 0) == hash(compact_fixture)
+
+    def test_point_cost(self, compact_fixture: characterstics.CompactCharacteristics):
+        """Test that point costs match the model"""
+        assert (
+            compact_fixture.get_characterstics_point_cost()
+            == compact_fixture.to_model().get_characterstics_point_cost()
+        )
+        assert not (compact_fixture + 1).is_valid_starting_characterstics()
+        with pytest.raises(characterstics.ExtremeCharactersticsError):
+            (compact_fixture + 1).get_characterstics_point_cost()
+
+    def test_wrong_length(self):
+        """Test that only full sets of characterstics are allowed"""
+        with pytest.raises(ValueError):
+            characterstics.CompactCharacteristics([0] * 7)
+
+
+class TestCharacteristicsTable:
+    """Tests for columns of characterstics for many characters"""
+
+    @pytest.fixture
+    def table_fixture(self) -> characterstics.CharacteristicsTable:
+        """Table of random legal characterstics"""
+        return characterstics.CharacteristicsTable(
+            characterstics.Characteristics.generate_random_valid_batch(
+                500, 7, False, numpy.random.default_rng(2024)
+            )
+        )
+
+    def test_models_round_trip(
+        self, table_fixture: characterstics.CharacteristicsTable
+    ):
+        """Test converting rows to models and back"""
+        models = table_fixture.to_models()
+        assert len(models) == len(table_fixture)
+        assert models[3] == table_fixture[3]
+        assert (
+            characterstics.CharacteristicsTable.from_models(models).values
+            == table_fixture.values
+        ).all()
+
+    def test_point_costs(self, table_fixture: characterstics.CharacteristicsTable):
+        """Test that vectorized point costs match each model"""
+        costs = table_fixture.get_characterstics_point_costs()
+        assert costs.tolist() == [
+            model.get_characterstics_point_cost() for model in table_fixture.to_models()
+        ]
+        assert table_fixture.valid_starting_characterstics_mask().all()
+
+    def test_arithmetic(self, table_fixture: characterstics.CharacteristicsTable):
+        """Test that arithmetic applies to every row"""
+        older = table_fixture - 1
+        assert (older.column("strength") == table_fixture.column("strength") - 1).all()
+        assert older[10] == table_fixture[10] - 1
+        mask = older.valid_starting_characterstics_mask(7)
+        assert mask.tolist() == [
+            model.is_valid_starting_characterstics(7) for model in older.to_models()
+        ]
+
+    def test_extreme_values(self):
+        """Test that rows out of the normal range are never valid"""
+        table = characterstics.CharacteristicsTable(
+            numpy.array([[4, 0, 0, 0, 0, 0, 0, 0], [1, 0, 0, 0, 0, 0, 0, 0]])
+        )
+        assert table.valid_starting_characterstics_mask(7, True).tolist() == [
+            False,
+            False,
+        ]
+        assert table.valid_starting_characterstics_mask(1, True).tolist() == [
+            False,
+            True,
+        ]
+        with pytest.raises(characterstics.ExtremeCharactersticsError):
+            table.get_characterstics_point_costs()
+
+
+class TestGenerateRandomValid:
+    """Tests for sampling legal starting characterstics directly"""
+
+    @pytest.mark.parametrize(("max_cost", "fully_spent"), [(7, True), (3, False)])
+    def test_always_valid(self, max_cost: int, fully_spent: bool):
+        """Test that every generated set of characterstics is legal"""
+        rng = random.Random(5297992492366785183)
+        for _ in range(200):
+            characteristic = characterstics.Characteristics.generate_random_valid(
+                max_cost, fully_spent, rng
+            )
+            assert characteristic.is_valid_starting_characterstics(max_cost)
+            if fully_spent:
+                assert characteristic.is_valid_starting_characterstics_and_fully_spent(
+                    max_cost
+                )
+
+    def test_reproducible(self):
+        """Test that the same stream gives the same characterstics"""
+        assert characterstics.Characteristics.generate_random_valid(
+            rng=random.Random(1)
+        ) == characterstics.Characteristics.generate_random_valid(rng=random.Random(1))
+
+    def test_uniform(self):
+        """Test that every legal set is equally likely"""
+        # only 8 sets cost exactly 45, seven 3s and a 2 somewhere
+        rng = random.Random(5297992492366785183)
+        counts = collections.Counter(
+            tuple(
+                value
+                for _, value in characterstics.Characteristics.generate_random_valid(
+                    45, rng=rng
+                )
+            )
+            for _ in range(8000)
+        )
+        assert len(counts) == 8
+        assert all(800 < count < 1200 for count in counts.values())
+
+    def test_impossible_cost(self):
+        """Test that asking for a cost nothing can reach raises"""
+        with pytest.raises(ValueError):
+            characterstics.Characteristics.generate_random_valid(46)
+        with pytest.raises(ValueError):
+            characterstics.Characteristics.generate_random_valid(-49, False)
+
+    @pytest.mark.parametrize(("max_cost", "fully_spent"), [(7, True), (3, False)])
+    def test_batch(self, max_cost: int, fully_spent: bool):
+        """Test that batches only hold legal characterstics"""
+        values = characterstics.Characteristics.generate_random_valid_batch(
+            5000, max_cost, fully_spent, numpy.random.default_rng(2024)
+        )
+        assert values.shape == (5000, 8)
+        costs = characterstics._STAT_COST_ARRAY[values - characterstics._MIN_STAT].sum(
+            axis=1
+        )
+        if fully_spent:
+            assert (costs == max_cost).all()
+        else:
+            assert (costs <= max_cost).all()
+
+    def test_batch_uniform(self):
+        """Test that batches pick every legal set equally often"""
+        values = characterstics.Characteristics.generate_random_valid_batch(
+            8000, 45, rng=numpy.random.default_rng(2024)
+        )
+        _, counts = numpy.unique(values, axis=0, return_counts=True)
+        assert len(counts) == 8
+        assert ((800 < counts) & (counts < 1200)).all()
+
+
+class TestCharacteristicsCostTable:
+    """Tests for the precomputed table of characterstic costs"""
+
+    @pytest.fixture(scope="class")
+    def cost_table_path(self, tmp_path_factory: pytest.TempPathFactory):
+        """Path to a cost table that has been saved to disk"""
+        path = tmp_path_factory.mktemp("cost_table") / "costs.npy"
+        characterstics.CharacteristicsCostTable.load(path)
+        return path
+
+    @pytest.fixture
+    def cost_table(self, cost_table_path) -> characterstics.CharacteristicsCostTable:
+        """Cost table loaded back from disk"""
+        return characterstics.CharacteristicsCostTable.load(cost_table_path)
+
+    @pytest.fixture
+    def loaded_cost_table(self, cost_table_path):
+        """Cost table loaded for validity checks"""
+        yield characterstics.load_cost_table(cost_table_path)
+        characterstics.unload_cost_table()
+
+    def test_saved_to_disk(self, cost_table_path):
+        """Test that the built table gets cached on disk"""
+        assert cost_table_path.exists()
+
+    @pytest.mark.parametrize(
+        "values",
+        [[0] * 8, [3, 1, 0, 0, 0, 0, 0, 0], [-3] * 8, [2, -1, 3, -2, 0, 1, 1, -3]],
+    )
+    def test_costs_match(
+        self, cost_table: characterstics.CharacteristicsCostTable, values: list[int]
+    ):
+        """Test that the table agrees with working out the cost directly"""
+        characteristic = characterstics.Characteristics(
+            **dict(zip(characterstics.Characteristics.iter_char_names(), values))
+        )
+        index = cost_table.encode(values)
+        assert cost_table.index_of(characteristic) == index
+        assert (cost_table.decode(index) == values).all()
+        assert cost_table.costs[index] == characteristic.get_characterstics_point_cost()
+
+    def test_arrays_costing_exactly(
+        self, cost_table: characterstics.CharacteristicsCostTable
+    ):
+        """Test that we find every array with an exact cost"""
+        arrays = cost_table.arrays_costing_exactly(45)
+        # the only way to get 45 is seven 3s and a 2
+        assert len(arrays) == 8
+        assert (numpy.sort(arrays, axis=1) == [2, 3, 3, 3, 3, 3, 3, 3]).all()
+        assert cost_table.count_arrays_costing_exactly(45) == 8
+
+    def test_count_arrays_costing_at_most(
+        self, cost_table: characterstics.CharacteristicsCostTable
+    ):
+        """Test counting arrays at or under a cost against brute force"""
+        stat_costs = list(characterstics._STAT_COSTS.values())
+        # split the 8 characterstics into two halves of 4 to keep this quick
+        half_costs = collections.Counter(
+            sum(combo) for combo in itertools.product(stat_costs, repeat=4)
+        )
+        assert cost_table.count_arrays_costing_at_most(0) == sum(
+            first_count * second_count
+            for first_cost, first_count in half_costs.items()
+            for second_cost, second_count in half_costs.items()
+            if first_cost + second_cost <= 0
+        )
+        assert cost_table.count_arrays_costing_at_most(48) == 7**8
+        assert cost_table.count_arrays_costing_at_most(-49) == 0
+        assert cost_table.count_arrays_costing_at_most(7) == sum(
+            cost_table.count_arrays_costing_exactly(cost) for cost in range(-48, 8)
+        )
+
+    def test_load_another_path(self, loaded_cost_table, cost_table_path, tmp_path):
+        """Test that loading a different path replaces the loaded table"""
+        assert characterstics.load_cost_table(cost_table_path) is loaded_cost_table
+        other_path = tmp_path / "other_costs.npy"
+        other_table = characterstics.load_cost_table(other_path)
+        assert other_table is not loaded_cost_table
+        assert other_path.exists()
+        assert characterstics.load_cost_table(other_path) is other_table
+
+    def test_rebuilds_bad_cache(self, tmp_path):
+        """Test that a broken cache file gets rebuilt"""
+        path = tmp_path / "costs.npy"
+        path.write_bytes(b"not a table")
+        table = characterstics.CharacteristicsCostTable.load(path)
+        assert table.count_arrays_costing_at_most(48) == 7**8
+
+    @pytest.mark.parametrize(
+        ("values", "target_value", "expected_value", "expected_fully_spent"),
+        [
+            ([3], 5, False, False),
+            ([3, 1], 7, True, True),
+            ([-1, 1, 1, 1], 4, True, False),
+            ([9, 1, 1, 1], 2, False, False),
+        ],
+    )
+    def test_validity_with_loaded_table(
+        self,
+        loaded_cost_table: characterstics.CharacteristicsCostTable,
+        values: list[int],
+        target_value: int,
+        expected_value: bool,
+        expected_fully_spent: bool,
+    ):
+        """Test that validity checks agree when they use the table"""
+        characteristic = characterstics.Characteristics()
+        for value, (char_name, _) in zip(values, characteristic):
+            characteristic.__dict__[char_name] = value
+        assert (
+            characteristic.is_valid_starting_characterstics(max_cost=target_value)
+            == expected_value
+        )
+        assert (
+            characteristic.is_valid_starting_characterstics_and_fully_spent(
+                max_cost=target_value
+            )
+            == expected_fully_spent
+        )
@@ -0,0 +1,191 @@
+"""Tests for the columnar wound tracker"""
+
+# pylint: disable=W0212
+
+import random
+
+import pytest
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_tracker
+
+from lib import am5_rolls
+
+_WOUND_TYPES = (
+    wound_tracker.LightWound,
+    wound_tracker.MediumWound,
+    wound_tracker.HeavyWound,
+    wound_tracker.IncapacitatingWound,
+    wound_tracker.FatalWound,
+)
+
+
+def wounds_as_tuples(tracker: wound_tracker.WoundTracker):
+    """Every wound of a tracker as comparable tuples"""
+    return [
+        [(wound.recovery_bonus, wound.status) for wound in tracker.get_wounds(kind)]
+        for kind in _WOUND_TYPES
+    ]
+
+
+class TestCompactWoundTracker:
+    """Tests for CompactWoundTracker"""
+
+    @pytest.fixture
+    def tracker_fixture(self):
+        """A compact tracker for a size 0 character"""
+        return compact_wound_tracker.CompactWoundTracker(size=0)
+
+    def test_take_damage(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that damage adds wounds of the right types"""
+        assert isinstance(tracker_fixture.take_damage(3), wound_tracker.LightWound)
+        assert isinstance(tracker_fixture.take_damage(7), wound_tracker.MediumWound)
+        assert isinstance(tracker_fixture.take_damage(12), wound_tracker.HeavyWound)
+        assert tracker_fixture.light_wounds == 1
+        assert tracker_fixture.medium_wounds == 1
+        assert tracker_fixture.heavy_wounds == 1
+        assert tracker_fixture.wound_bonus == -9
+        assert isinstance(
+            tracker_fixture.take_damage(18), wound_tracker.IncapacitatingWound
+        )
+        assert tracker_fixture.incapacitated
+        assert tracker_fixture.wound_bonus is None
+
+    def test_bad_damage(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that damage too small to wound still raises"""
+        with pytest.raises(ValueError):
+            tracker_fixture.take_damage(0)
+
+    def test_returned_wound_is_a_copy(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that changing a returned wound doesn't change the tracker"""
+        wound = tracker_fixture.take_damage(3)
+        wound.recovery_bonus = 3
+        assert (
+            tracker_fixture.get_wounds(wound_tracker.LightWound)[0].recovery_bonus == 0
+        )
+
+    def test_add_wound(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that added wounds keep their recovery bonus"""
+        tracker_fixture.add_wound(wound_tracker.MediumWound(recovery_bonus=6))
+        tracker_fixture.add_wound(wound_tracker.FatalWound())
+        assert tracker_fixture.get_wounds(wound_tracker.MediumWound) == [
+            wound_tracker.MediumWound(recovery_bonus=6)
+        ]
+        assert tracker_fixture.dead
+
+    def test_add_bad_wound(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that things which aren't wounds can't be added"""
+        with pytest.raises(TypeError):
+            tracker_fixture.add_wound("light")  # type: ignore
+
+    @pytest.mark.parametrize(
+        "recovery_roll, light_wounds, medium_wounds, recovery_bonus",
+        [(0, 0, 1, None), (4, 1, 0, 3), (10, 0, 0, None)],
+    )
+    def test_recover_light_wounds(
+        self,
+        tracker_fixture: compact_wound_tracker.CompactWoundTracker,
+        recovery_roll: int,
+        light_wounds: int,
+        medium_wounds: int,
+        recovery_bonus: int | None,
+    ):
+        """Test that light wounds get worse, stay or heal on the right rolls"""
+        tracker_fixture.take_damage(1)
+        tracker_fixture.recover_all_light_wounds(0, recovery_roll)
+        assert tracker_fixture.light_wounds == light_wounds
+        assert tracker_fixture.medium_wounds == medium_wounds
+        if recovery_bonus is not None:
+            assert (
+                tracker_fixture.get_wounds(wound_tracker.LightWound)[0].recovery_bonus
+                == recovery_bonus
+            )
+
+    def test_botched_recovery(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that a botched recovery roll makes a wound worse"""
+        tracker_fixture.take_damage(12)
+        tracker_fixture.recover_all_heavy_wounds(
+            100, [am5_rolls.StressRollOutcome(0, 0, 1)]
+        )
+        assert tracker_fixture.heavy_wounds == 0
+        assert tracker_fixture.incapacitated
+
+    def test_fewer_rolls_than_wounds(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that wounds without a roll are left alone"""
+        tracker_fixture.take_damage(7)
+        tracker_fixture.take_damage(7)
+        tracker_fixture.recover_all_medium_wounds(0, [20])
+        assert tracker_fixture.medium_wounds == 1
+        assert tracker_fixture.light_wounds == 1
+
+    def test_add_helpers_return_wounds(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that the add helpers hand back a wound like the original's do"""
+        for add, wound_type in (
+            (tracker_fixture._add_light_wound, wound_tracker.LightWound),
+            (tracker_fixture._add_medium_wound, wound_tracker.MediumWound),
+            (tracker_fixture._add_heavy_wound, wound_tracker.HeavyWound),
+        ):
+            assert isinstance(add(), wound_type)
+        assert tracker_fixture.wound_bonus == -9
+
+    def test_incapacitating_wound_gets_better(
+        self, tracker_fixture: compact_wound_tracker.CompactWoundTracker
+    ):
+        """Test that an improving incapacitating wound becomes a heavy one"""
+        tracker_fixture.take_damage(18)
+        tracker_fixture.recover_all_incapacitating_wounds(0, [20])
+        assert not tracker_fixture.incapacitated
+        assert tracker_fixture.heavy_wounds == 1
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_wound_tracker(self, seed: int):
+        """Test that the same damage and rolls leave both trackers the same"""
+        damage_rng = random.Random(seed)
+        damage = [damage_rng.randint(1, 15) for _ in range(40)]
+        trackers = (
+            wound_tracker.WoundTracker(size=0),
+            compact_wound_tracker.CompactWoundTracker(size=0),
+        )
+        for tracker in trackers:
+            rng = random.Random(seed)
+            for amount in damage:
+                tracker.take_damage(amount)
+            for _ in range(10):
+                tracker.recover_all_light_wounds(3, rng=rng)
+                tracker.recover_all_medium_wounds(3, rng=rng)
+                tracker.recover_all_heavy_wounds(3, rng=rng)
+                tracker.recover_all_incapacitating_wounds(3, rng=rng)
+        assert trackers[0].model_dump() == trackers[1].model_dump()
+        assert wounds_as_tuples(trackers[0]) == wounds_as_tuples(trackers[1])
+
+
+class TestGetWounds:
+    """Tests for getting wounds from the original tracker"""
+
+    def test_get_wounds(self):
+        """Test that get_wounds returns the wounds the tracker holds"""
+        tracker = wound_tracker.WoundTracker(size=0)
+        wound = tracker.take_damage(3)
+        assert tracker.get_wounds(wound_tracker.LightWound) == [wound]
+        assert tracker.get_wounds(wound_tracker.IncapacitatingWound) == []
+
+    def test_get_bad_wounds(self):
+        """Test that only wound types can be asked for"""
+        with pytest.raises(TypeError):
+            wound_tracker.WoundTracker(size=0).get_wounds(wound_tracker.Wound)
@@ -47,3 +47,14 @@ class TestConfidence:
         confidence_fixture.points += 2
         assert confidence_fixture.max == 2
         assert confidence_fixture.points == 2
+
+    def test_batch_update(self, confidence_fixture: confidence.Confidence):
+        """Test that points can be raised before the max inside a batch update"""
+        with confidence_fixture.batch_update():
+            confidence_fixture.points = 3
+            confidence_fixture.max = 3
+        assert confidence_fixture.points == 3
+        with pytest.raises(pydantic.ValidationError):
+            with confidence_fixture.batch_update():
+                confidence_fixture.max = 1
+        assert confidence_fixture.max == 3
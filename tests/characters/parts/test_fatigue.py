@@ -56,3 +56,102 @@ class TestFatigue:
             fatigue_tracker_fixture.get_short_term_recovery_time()
             == datetime.timedelta(minutes=10)
         )
+
+    @pytest.mark.parametrize(
+        ("short_term_levels", "long_term_levels", "bonus", "fatigue_level", "hours"),
+        [
+            (0, 0, 0, "Fresh", None),
+            (1, 0, 0, "Winded", 2 / 60),
+            (1, 1, -1, "Weary", 10 / 60),
+            (2, 1, -3, "Tired", 0.5),
+            (4, 0, -5, "Dazed", 1),
+            (3, 2, False, "Unconscious", 2),
+            (20, 5, False, "Unconscious", 22),
+        ],
+    )
+    def test_derived_values(
+        self,
+        short_term_levels: int,
+        long_term_levels: int,
+        bonus: int | bool,
+        fatigue_level: str,
+        hours: float | None,
+    ):
+        """Test the penalty, level name and recovery time for each total"""
+        tracker = fatigue.FatigueTracker(
+            short_term_levels=short_term_levels, long_term_levels=long_term_levels
+        )
+        assert tracker.bonus is bonus or tracker.bonus == bonus
+        assert tracker.fatigue_level == fatigue_level
+        assert tracker.model_dump()["bonus"] == bonus
+        if hours is not None:
+            assert tracker.get_short_term_recovery_time() == datetime.timedelta(
+                hours=hours
+            )
+
+    def test_cache_invalidated(self, fatigue_tracker_fixture: fatigue.FatigueTracker):
+        """Test that cached values follow changes to the levels"""
+        assert fatigue_tracker_fixture.fatigue_level == "Fresh"
+        fatigue_tracker_fixture.long_term_levels = 2
+        assert fatigue_tracker_fixture.fatigue_level == "Weary"
+        with pytest.raises(ValueError):
+            with fatigue_tracker_fixture.batch_update():
+                fatigue_tracker_fixture.short_term_levels = 2
+                assert fatigue_tracker_fixture.bonus == -5
+                raise ValueError
+        assert fatigue_tracker_fixture.bonus == -1
+        with fatigue_tracker_fixture.batch_update():
+            fatigue_tracker_fixture.short_term_levels = 1
+        assert fatigue_tracker_fixture.bonus == -3
+
+    def test_cache_not_copied(self):
+        """Test that copies with updated levels don't keep the old cached values"""
+        tracker = fatigue.FatigueTracker(short_term_levels=1)
+        assert tracker.bonus == 0
+        copy = tracker.model_copy(update={"long_term_levels": 3})
+        assert copy.bonus == -5
+        assert copy.fatigue_level == "Dazed"
+        copy = tracker.model_copy(update={"long_term_levels": 4})
+        assert copy.fatigue_level == "Unconscious"
+        assert tracker.fatigue_level == "Winded"
+        assert tracker.model_copy(deep=True).fatigue_level == "Winded"
+
+    @pytest.mark.parametrize(
+        ("short_term_levels", "long_term_levels"), [(0, 0), (1, 0), (3, 1), (6, 2)]
+    )
+    def test_recovery_schedule(self, short_term_levels: int, long_term_levels: int):
+        """Test the schedule matches recovering one level at a time"""
+        start = datetime.datetime(1220, 3, 21, 18)
+        tracker = fatigue.FatigueTracker(
+            short_term_levels=short_term_levels, long_term_levels=long_term_levels
+        )
+        schedule = tracker.recovery_schedule(start)
+        assert tracker.short_term_levels == short_term_levels
+
+        expected = []
+        time = start
+        stepping_tracker = tracker.model_copy()
+        while stepping_tracker.short_term_levels:
+            time += stepping_tracker.get_short_term_recovery_time()
+            stepping_tracker.short_term_levels -= 1
+            expected.append(
+                fatigue.FatigueRecoveryStep(
+                    time,
+                    stepping_tracker.short_term_levels,
+                    stepping_tracker.long_term_levels,
+                    stepping_tracker.fatigue_level,
+                )
+            )
+        assert schedule == expected
+
+    def test_recovery_schedules(self):
+        """Test schedules for many trackers at once"""
+        start = datetime.datetime(1220, 3, 21, 18)
+        trackers = [
+            fatigue.FatigueTracker(short_term_levels=levels % 4) for levels in range(10)
+        ]
+        schedules = fatigue.recovery_schedules(trackers, start)
+        assert schedules == [tracker.recovery_schedule(start) for tracker in trackers]
+        assert schedules[3][-1] == fatigue.FatigueRecoveryStep(
+            start + datetime.timedelta(minutes=42), 0, 0, "Fresh"
+        )
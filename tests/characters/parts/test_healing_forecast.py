@@ -0,0 +1,117 @@
+"""Tests for healing forecasts"""
+
+import datetime
+import random
+
+import pytest
+
+from characters.parts import healing_forecast
+from characters.parts import wound_tracker
+from covenant import recovery_scheduler
+from lib import am5_distributions
+
+TEST_SEED_VALUE = 5297992492366785183
+START = datetime.datetime(1220, 3, 21, 6)
+
+
+def tracker_with(*damage: int) -> wound_tracker.WoundTracker:
+    """Size 0 tracker that took each amount of damage"""
+    tracker = wound_tracker.WoundTracker(size=0)
+    for amount in damage:
+        tracker.take_damage(amount)
+    return tracker
+
+
+@pytest.mark.parametrize("recovery_bonus", [-3, 0, 3, 9])
+def test_transition_matrix(recovery_bonus: int):
+    """Test that every state goes somewhere and healed and dead stay put"""
+    matrix = healing_forecast.transition_matrix(recovery_bonus)
+    assert matrix.sum(axis=1) == pytest.approx(1.0)
+    assert matrix[healing_forecast.HEALED, healing_forecast.HEALED] == 1.0
+    assert matrix[healing_forecast.DEAD, healing_forecast.DEAD] == 1.0
+    assert healing_forecast.transition_matrix(recovery_bonus) is matrix
+
+
+def test_light_wound_transitions():
+    """Test that a light wound's row comes straight from the ease factors"""
+    distribution = am5_distributions.stress_roll_distribution(1, 3)
+    row = healing_forecast.transition_matrix(3)[0]
+    assert row[healing_forecast.HEALED] == pytest.approx(
+        distribution.probability_of_success(10)
+    )
+    assert row[1] == pytest.approx(1 - distribution.probability_of_success(4))
+
+
+def test_one_roll_forecast():
+    """Test that a week after a light wound it's healed on a single roll"""
+    forecast = healing_forecast.forecast(
+        tracker_with(1, 1), START, START + datetime.timedelta(weeks=1), 3
+    )
+    row = healing_forecast.transition_matrix(3)[0]
+    light = forecast.wounds[wound_tracker.LightWound]
+    assert light.healed == pytest.approx(row[healing_forecast.HEALED])
+    assert light.medium == pytest.approx(row[1])
+    assert forecast.fully_healed == pytest.approx(light.healed**2)
+    assert forecast.expected_wounds.light == pytest.approx(2 * row[0])
+    assert sum(light) == pytest.approx(1.0)
+
+
+def test_nothing_happens_before_a_roll():
+    """Test that wounds are where they started before their first roll"""
+    forecast = healing_forecast.forecast(
+        tracker_with(11), START, START + datetime.timedelta(days=80)
+    )
+    assert forecast.wounds[wound_tracker.HeavyWound].heavy == 1.0
+    assert forecast.fully_healed == 0.0
+
+
+def test_dead_forecast():
+    """Test that the dead stay dead"""
+    forecast = healing_forecast.forecast(
+        tracker_with(30), START, START + datetime.timedelta(days=365)
+    )
+    assert forecast.dead == 1.0
+    assert forecast.fully_healed == 0.0
+
+
+def test_matches_simulation():
+    """Test the forecast for one wound against running the scheduler"""
+    until = START + datetime.timedelta(days=100)
+    rng = random.Random(TEST_SEED_VALUE)
+    runs = 4000
+    healed = 0
+    for _ in range(runs):
+        tracker = tracker_with(1)
+        scheduler = recovery_scheduler.RecoveryScheduler()
+        scheduler.register_wounds("Alice", tracker, START, recovery_bonus=3)
+        scheduler.advance_to(until, rng=rng)
+        healed += tracker.wound_bonus == 0
+    forecast = healing_forecast.forecast(tracker_with(1), START, until, 3)
+    assert healed / runs == pytest.approx(forecast.fully_healed, abs=0.02)
+
+
+@pytest.mark.parametrize("wound_type", healing_forecast.SEVERITIES)
+def test_chance_of_healing(wound_type: type[wound_tracker.Wound]):
+    """Test that the chance of ever healing matches following the wound for ages"""
+    state = healing_forecast.SEVERITIES.index(wound_type)
+    assert sum(healing_forecast._healing_ticks(state, 3, 1e-9)) == pytest.approx(
+        healing_forecast.chance_of_healing(wound_type, 3), abs=1e-8
+    )
+
+
+def test_expected_time_to_full_health():
+    """Test expected times for easy cases"""
+    assert healing_forecast.expected_time_to_full_health(
+        wound_tracker.WoundTracker(size=0), START
+    ) == datetime.timedelta(0)
+    assert (
+        healing_forecast.expected_time_to_full_health(tracker_with(30), START) is None
+    )
+    # a huge bonus only fails to heal a light wound on a botch
+    expected = healing_forecast.expected_time_to_full_health(
+        tracker_with(1), START, recovery_bonus=100
+    )
+    assert datetime.timedelta(weeks=1) < expected < datetime.timedelta(days=8)
+    one = healing_forecast.expected_time_to_full_health(tracker_with(6), START, 3)
+    two = healing_forecast.expected_time_to_full_health(tracker_with(6, 6), START, 3)
+    assert one < two
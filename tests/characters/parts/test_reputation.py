@@ -42,3 +42,10 @@ class TestReputation:
         reputation_fixture.add_deeds(15)
         assert reputation_fixture.score == 2
         assert reputation_fixture.deeds == 5
+
+    def test_add_lots_of_deeds(self, reputation_fixture: reputation.Reputation):
+        """Test that a large number of deeds raises the score many times at once"""
+        reputation_fixture.add_deeds(1000)
+        assert reputation_fixture.score == 19
+        assert reputation_fixture.deeds == 55
+        assert "score" in reputation_fixture.model_fields_set
@@ -0,0 +1,218 @@
+"""Tests for wound tracker snapshots"""
+
+# pylint: disable=W0212
+
+import random
+
+import pydantic
+import pytest
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_snapshot
+from characters.parts import wound_tracker
+
+_WOUND_TYPES = (
+    wound_tracker.LightWound,
+    wound_tracker.MediumWound,
+    wound_tracker.HeavyWound,
+    wound_tracker.IncapacitatingWound,
+    wound_tracker.FatalWound,
+)
+
+
+def wounds_as_tuples(tracker: wound_tracker.WoundTracker):
+    """Every wound of a tracker as comparable tuples"""
+    return [
+        [(wound.recovery_bonus, wound.status) for wound in tracker.get_wounds(kind)]
+        for kind in _WOUND_TYPES
+    ]
+
+
+def wounded_tracker(
+    tracker_type: type[wound_tracker.WoundTracker], seed: int
+) -> wound_tracker.WoundTracker:
+    """A tracker that has taken damage and made some recovery rolls"""
+    rng = random.Random(seed)
+    tracker = tracker_type(size=rng.randint(-3, 2))
+    for _ in range(rng.randint(0, 12)):
+        tracker.take_damage(rng.randint(1, 3 * tracker._modified_size))
+    tracker.recover_all_light_wounds(3, rng=rng)
+    tracker.recover_all_medium_wounds(3, rng=rng)
+    tracker.recover_all_heavy_wounds(3, rng=rng)
+    return tracker
+
+
+def round_trip(
+    trackers: list[wound_tracker.WoundTracker],
+) -> list[wound_tracker.WoundTracker]:
+    """Trackers after being packed and unpacked"""
+    return wound_snapshot.unpack_trackers(wound_snapshot.pack_trackers(trackers))
+
+
+class TestRoundTrip:
+    """Tests that snapshots keep everything about a tracker"""
+
+    @pytest.mark.parametrize(
+        "tracker_type",
+        [wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker],
+    )
+    def test_round_trip(self, tracker_type: type[wound_tracker.WoundTracker]):
+        """Test that wounds, recovery bonuses and size all come back"""
+        trackers = [wounded_tracker(tracker_type, seed) for seed in range(50)]
+        loaded = round_trip(trackers)
+        assert len(loaded) == len(trackers)
+        for original, copy in zip(trackers, loaded):
+            assert type(copy) is tracker_type
+            assert copy.model_dump() == original.model_dump()
+            assert copy._modified_size == original._modified_size
+            assert wounds_as_tuples(copy) == wounds_as_tuples(original)
+            assert copy._wound_bonus_total == original._wound_bonus_total
+
+    def test_equal_to_original(self):
+        """Test that loaded trackers compare equal to the ones saved"""
+        trackers = [
+            wounded_tracker(wound_tracker.WoundTracker, seed) for seed in range(20)
+        ]
+        assert round_trip(trackers) == trackers
+
+    def test_odd_wounds(self):
+        """Test that added wounds keep their bonus and status"""
+        tracker = wound_tracker.WoundTracker(size=1)
+        tracker.add_wound(wound_tracker.LightWound(recovery_bonus=9))
+        tracker.add_wound(
+            wound_tracker.HeavyWound(
+                recovery_bonus=3, status=wound_tracker.WoundStatus.BETTER
+            )
+        )
+        tracker.add_wound(wound_tracker.IncapacitatingWound(recovery_bonus=-2))
+        tracker.add_wound(wound_tracker.FatalWound())
+        (copy,) = round_trip([tracker])
+        assert wounds_as_tuples(copy) == [
+            [(9, wound_tracker.WoundStatus.SAME)],
+            [],
+            [(3, wound_tracker.WoundStatus.BETTER)],
+            [(-2, wound_tracker.WoundStatus.SAME)],
+            [(None, wound_tracker.WoundStatus.SAME)],
+        ]
+        assert copy.dead
+
+    def test_mixed_trackers_keep_order(self):
+        """Test that compact and plain trackers can share a snapshot"""
+        trackers = [
+            wounded_tracker(
+                (wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker)[
+                    seed % 2
+                ],
+                seed,
+            )
+            for seed in range(10)
+        ]
+        loaded = round_trip(trackers)
+        assert [type(tracker) for tracker in loaded] == [
+            type(tracker) for tracker in trackers
+        ]
+        assert [wounds_as_tuples(tracker) for tracker in loaded] == [
+            wounds_as_tuples(tracker) for tracker in trackers
+        ]
+
+    def test_empty(self):
+        """Test that a snapshot of no trackers loads as no trackers"""
+        assert round_trip([]) == []
+
+    @pytest.mark.parametrize(
+        "tracker_type",
+        [wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker],
+    )
+    def test_loaded_trackers_behave_the_same(
+        self, tracker_type: type[wound_tracker.WoundTracker]
+    ):
+        """Test that loaded trackers take damage and recover like the originals"""
+        original = wounded_tracker(tracker_type, 3)
+        (copy,) = round_trip([original])
+        for tracker in (original, copy):
+            rng = random.Random(7)
+            tracker.take_damage(12)
+            for _ in range(5):
+                tracker.recover_all_light_wounds(0, rng=rng)
+                tracker.recover_all_medium_wounds(0, rng=rng)
+                tracker.recover_all_heavy_wounds(0, rng=rng)
+                tracker.recover_all_incapacitating_wounds(0, rng=rng)
+        assert copy.model_dump() == original.model_dump()
+        assert wounds_as_tuples(copy) == wounds_as_tuples(original)
+
+    def test_loaded_wounds_still_validate(self):
+        """Test that skipping validation on load doesn't stop it afterwards"""
+        tracker = wound_tracker.WoundTracker(size=0)
+        tracker.take_damage(3)
+        (copy,) = round_trip([tracker])
+        wound = copy.get_wounds(wound_tracker.LightWound)[0]
+        with pytest.raises(pydantic.ValidationError):
+            wound.recovery_bonus = 1
+
+    @pytest.mark.parametrize(
+        "tracker_type",
+        [wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker],
+    )
+    def test_private_state_matches_new_models(
+        self, tracker_type: type[wound_tracker.WoundTracker]
+    ):
+        """Test that loaded models start with the private state of new ones"""
+        tracker = tracker_type(size=0)
+        tracker.take_damage(12)
+        tracker.take_damage(17)
+        (copy,) = round_trip([tracker])
+        assert copy.__pydantic_private__.keys() == tracker.__pydantic_private__.keys()
+        wounds = [copy._incapacitating_wound]
+        if tracker_type is wound_tracker.WoundTracker:
+            wounds += copy._light_wounds + copy._medium_wounds + copy._heavy_wounds
+        for wound in wounds:
+            assert wound.__pydantic_private__ == type(wound)().__pydantic_private__
+
+    def test_save_and_load(self, tmp_path):
+        """Test that snapshots go to and from files"""
+        trackers = [
+            wounded_tracker(wound_tracker.WoundTracker, seed) for seed in range(5)
+        ]
+        path = tmp_path / "wounds.snapshot"
+        wound_snapshot.save_snapshot(path, trackers)
+        assert wound_snapshot.load_snapshot(path) == trackers
+
+
+def test_other_tracker_types_refused():
+    """Test that subclasses that would load as something else can't be saved"""
+
+    class LoggedWoundTracker(wound_tracker.WoundTracker):
+        """A tracker subclass the snapshot knows nothing about"""
+
+    with pytest.raises(TypeError):
+        wound_snapshot.pack_trackers(
+            [wound_tracker.WoundTracker(size=0), LoggedWoundTracker(size=0)]
+        )
+
+
+class TestCorruptSnapshots:
+    """Tests that damaged snapshots are refused"""
+
+    @pytest.fixture
+    def snapshot_fixture(self) -> bytes:
+        """A snapshot of a few wounded trackers"""
+        return wound_snapshot.pack_trackers(
+            [wounded_tracker(wound_tracker.WoundTracker, seed) for seed in range(5)]
+        )
+
+    def test_not_a_snapshot(self):
+        """Test that other data is refused"""
+        with pytest.raises(wound_snapshot.CorruptWoundSnapshotError):
+            wound_snapshot.unpack_trackers(b"AM5ROLL1" + bytes(16))
+        with pytest.raises(wound_snapshot.CorruptWoundSnapshotError):
+            wound_snapshot.unpack_trackers(b"")
+
+    def test_truncated(self, snapshot_fixture: bytes):
+        """Test that a snapshot missing its end is refused"""
+        with pytest.raises(wound_snapshot.CorruptWoundSnapshotError):
+            wound_snapshot.unpack_trackers(snapshot_fixture[:-1])
+
+    def test_bad_status(self, snapshot_fixture: bytes):
+        """Test that statuses that aren't WoundStatus values are refused"""
+        with pytest.raises(wound_snapshot.CorruptWoundSnapshotError):
+            wound_snapshot.unpack_trackers(snapshot_fixture[:-1] + b"\x07")
@@ -3,7 +3,9 @@
 # pylint: disable=W0212
 
 from typing import Literal, Tuple
+import random
 
+import pydantic
 import pytest
 
 from dateutil import relativedelta
@@ -317,6 +319,19 @@ class TestWounds:
         """Test that fatal wounds don't have a recovery bonus"""
         assert fatal_wound_fixture.recovery_bonus is None
 
+    def test_batch_update(self, light_wound_fixture: wound_tracker.LightWound):
+        """Test that wounds can change several fields with one validation"""
+        with light_wound_fixture.batch_update():
+            light_wound_fixture.status = wound_tracker.WoundStatus.BETTER
+            light_wound_fixture.recovery_bonus = 6
+        assert light_wound_fixture.recovery_bonus == 6
+        with pytest.raises(pydantic.ValidationError):
+            with light_wound_fixture.batch_update():
+                light_wound_fixture.status = wound_tracker.WoundStatus.WORSE
+                light_wound_fixture.recovery_bonus = 4
+        assert light_wound_fixture.status == wound_tracker.WoundStatus.BETTER
+        assert light_wound_fixture.recovery_bonus == 6
+
 
 class TestWoundTracker:
     """Tests for the wound tracker"""
@@ -492,6 +507,33 @@ class TestWoundTracker:
             light_wound_fixture.recover_all_light_wounds(0, recovery_result)
             assert light_wound_fixture.light_wounds == 0
 
+        def test_light_wound_botch_gets_worse(
+            self,
+            light_wound_fixture: wound_tracker.WoundTracker,
+            monkeypatch: pytest.MonkeyPatch,
+        ):
+            """Test that a botched recovery roll makes a light wound worse"""
+            monkeypatch.setattr(
+                am5_rolls,
+                "roll_stress_outcome",
+                lambda *args, **kwargs: am5_rolls.StressRollOutcome(0, 0, 1),
+            )
+            light_wound_fixture.recover_all_light_wounds(100)
+            assert light_wound_fixture.light_wounds == 0
+            assert light_wound_fixture.medium_wounds == 1
+
+        def test_light_wound_recovery_with_rng(self):
+            """Test that recovery with the same random stream gives the same results"""
+            results = []
+            for _ in range(2):
+                tracker = wound_tracker.WoundTracker(size=0)
+                for _ in range(20):
+                    tracker.add_wound(wound_tracker.LightWound())
+                tracker.recover_all_light_wounds(0, rng=random.Random(5))
+                results.append((tracker.light_wounds, tracker.medium_wounds))
+            assert results[0] == results[1]
+            assert results[0] != (20, 0)
+
     class TestMediumWoundHealing:
         """Tests for healing medium wounds"""
 
@@ -662,3 +704,44 @@ class TestWoundTracker:
 
     class TestFatalWoundHealing:
         """Tests for healing of fatal wounds, curently empty as fatal wounds can't heal naturally"""
+
+
+class TestWoundBonusTotal:
+    """Tests for the running wound bonus total"""
+
+    @pytest.fixture
+    def checked_tracker_fixture(self, monkeypatch: pytest.MonkeyPatch):
+        """Wound tracker that checks its total every time it's read"""
+        monkeypatch.setattr(wound_tracker.WoundTracker, "CHECK_CONSISTENCY", True)
+        return wound_tracker.WoundTracker(size=0)
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_total_matches_wounds(
+        self, checked_tracker_fixture: wound_tracker.WoundTracker, seed: int
+    ):
+        """Test that the total stays right through damage and recovery"""
+        rng = random.Random(seed)
+        for _ in range(20):
+            checked_tracker_fixture.take_damage(rng.randint(1, 15))
+            checked_tracker_fixture.add_wound(wound_tracker.LightWound())
+            checked_tracker_fixture.recover_all_light_wounds(0, rng=rng)
+            checked_tracker_fixture.recover_all_medium_wounds(0, rng=rng)
+            checked_tracker_fixture.recover_all_heavy_wounds(0, rng=rng)
+            checked_tracker_fixture.recover_all_incapacitating_wounds(0, rng=rng)
+            if checked_tracker_fixture.dead:
+                break
+            checked_tracker_fixture.check_consistency()
+            assert checked_tracker_fixture.model_dump()["wound_bonus"] in (
+                None,
+                -checked_tracker_fixture.light_wounds
+                - 3 * checked_tracker_fixture.medium_wounds
+                - 5 * checked_tracker_fixture.heavy_wounds,
+            )
+
+    def test_inconsistent_total(
+        self, checked_tracker_fixture: wound_tracker.WoundTracker
+    ):
+        """Test that a total out of step with the wounds is caught"""
+        checked_tracker_fixture._light_wounds.append(wound_tracker.LightWound())
+        with pytest.raises(AssertionError):
+            _ = checked_tracker_fixture.wound_bonus
@@ -0,0 +1,146 @@
+"""Tests for the covenant wide ability index"""
+
+import random
+
+import pytest
+
+from characters.parts import ability
+from covenant import ability_index
+
+
+class TestAbilityRegistry:
+    """Tests for interning ability names"""
+
+    def test_intern(self):
+        """Test that names get stable ids in the order they're seen"""
+        registry = ability_index.AbilityRegistry(["Area Lore", "Brawl"])
+        assert registry.intern("Brawl") == 1
+        assert registry.intern("Latin") == 2
+        assert registry.id_of("Area Lore") == 0
+        assert registry.name_of(2) == "Latin"
+        assert len(registry) == 3
+        assert list(registry) == ["Area Lore", "Brawl", "Latin"]
+
+    def test_unknown_name(self):
+        """Test that looking up an unregistered name raises"""
+        registry = ability_index.AbilityRegistry()
+        assert "Brawl" not in registry
+        with pytest.raises(KeyError):
+            registry.id_of("Brawl")
+
+
+class TestAbilityIndex:
+    """Tests for ranking characters by ability level"""
+
+    @pytest.fixture
+    def abilities(self) -> dict[str, ability.Ability]:
+        """Area Lore for a handful of characters"""
+        return {
+            character: ability.Ability(name="Area Lore", level=level)
+            for character, level in [
+                ("Alice", 3),
+                ("Bertrand", 1),
+                ("Cecily", 5),
+                ("Dunstan", 3),
+                ("Edith", 0),
+            ]
+        }
+
+    @pytest.fixture
+    def index(
+        self, abilities: dict[str, ability.Ability]
+    ) -> ability_index.AbilityIndex:
+        """Index holding every character's Area Lore"""
+        index = ability_index.AbilityIndex()
+        for character, character_ability in abilities.items():
+            index.add(character, character_ability)
+        index.add("Alice", ability.Ability(name="Brawl", level=2))
+        return index
+
+    def test_at_least(self, index: ability_index.AbilityIndex):
+        """Test finding everyone at or above a level"""
+        assert index.at_least("Area Lore", 3) == [
+            ("Cecily", 5),
+            ("Alice", 3),
+            ("Dunstan", 3),
+        ]
+        assert index.count_at_least("Area Lore", 3) == 3
+        assert index.count_at_least("Area Lore", 6) == 0
+        assert index.count_at_least("Brawl", 0) == 1
+        assert index.at_least("Latin", 0) == []
+
+    def test_top(self, index: ability_index.AbilityIndex):
+        """Test finding the highest levels"""
+        assert index.top("Area Lore", 2) == [("Cecily", 5), ("Alice", 3)]
+        assert len(index.top("Area Lore", 10)) == 5
+
+    def test_add_experience_updates(
+        self,
+        index: ability_index.AbilityIndex,
+        abilities: dict[str, ability.Ability],
+    ):
+        """Test that gaining levels through experience moves a character up"""
+        abilities["Edith"].add_experience(105)
+        assert index.level_of("Edith", "Area Lore") == 6
+        assert index.top("Area Lore", 1) == [("Edith", 6)]
+        abilities["Edith"].add_experience(1)
+        assert index.count_at_least("Area Lore", 6) == 1
+
+    def test_copies_are_not_indexed(self, index: ability_index.AbilityIndex):
+        """Test that changing a copy of an indexed ability leaves the index alone"""
+        brawl = ability.Ability(name="Brawl", level=1)
+        index.add("Bertrand", brawl)
+        for copy in (brawl.model_copy(), brawl.model_copy(deep=True)):
+            copy.set_progress(5, 0)
+        assert index.level_of("Bertrand", "Brawl") == 1
+        assert index.top("Brawl", 1) == [("Alice", 2)]
+
+    def test_remove(
+        self,
+        index: ability_index.AbilityIndex,
+        abilities: dict[str, ability.Ability],
+    ):
+        """Test that removed characters are no longer found or updated"""
+        index.remove_character("Alice")
+        assert index.level_of("Alice", "Brawl") is None
+        assert index.count_at_least("Area Lore", 3) == 2
+        abilities["Alice"].add_experience(100)
+        assert index.count_at_least("Area Lore", 3) == 2
+        with pytest.raises(KeyError):
+            index.remove("Alice", "Area Lore")
+
+    def test_duplicate(
+        self,
+        index: ability_index.AbilityIndex,
+    ):
+        """Test that a character can only have each ability once"""
+        with pytest.raises(ValueError):
+            index.add("Alice", ability.Ability(name="Area Lore"))
+
+    def test_refresh(
+        self,
+        index: ability_index.AbilityIndex,
+        abilities: dict[str, ability.Ability],
+    ):
+        """Test re-ranking after setting a level directly"""
+        abilities["Bertrand"].level = 9
+        index.refresh("Bertrand", "Area Lore")
+        assert index.top("Area Lore", 1) == [("Bertrand", 9)]
+
+    def test_matches_scan(self):
+        """Test that queries agree with scanning every character"""
+        rng = random.Random(5297992492366785183)
+        abilities = [ability.Ability(name="Magic Theory") for _ in range(300)]
+        index = ability_index.AbilityIndex()
+        for character, character_ability in enumerate(abilities):
+            index.add(character, character_ability)
+        for _ in range(1000):
+            rng.choice(abilities).add_experience(rng.randint(1, 20))
+        for level in range(0, 12):
+            assert index.count_at_least("Magic Theory", level) == sum(
+                character_ability.level >= level for character_ability in abilities
+            )
+        assert [level for _, level in index.top("Magic Theory", 20)] == sorted(
+            (character_ability.level for character_ability in abilities),
+            reverse=True,
+        )[:20]
@@ -0,0 +1,89 @@
+"""Tests for the sparse matrix of ability experience"""
+
+import numpy
+import pytest
+
+from characters.parts import ability
+from covenant import ability_index
+from covenant import ability_matrix
+
+
+@pytest.fixture
+def matrix() -> ability_matrix.AbilityMatrix:
+    """Matrix with a small starting capacity so it has to grow"""
+    return ability_matrix.AbilityMatrix(capacity=2)
+
+
+def test_cells(matrix: ability_matrix.AbilityMatrix):
+    """Test that each character and ability pair gets one cell"""
+    cells = matrix.cells(
+        [("Alice", "Brawl"), ("Bertrand", "Brawl"), ("Alice", "Latin")]
+    )
+    assert cells.tolist() == [0, 1, 2]
+    assert matrix.cell("Bertrand", "Brawl") == 1
+    assert len(matrix) == 3
+    assert matrix.rows.tolist() == [0, 1, 0]
+    assert matrix.columns.tolist() == [0, 0, 1]
+    assert matrix.characters == ["Alice", "Bertrand"]
+
+
+def test_add_experience_matches_models(matrix: ability_matrix.AbilityMatrix):
+    """Test that bulk experience advances exactly like add_experience"""
+    rng = numpy.random.default_rng(2024)
+    models = [ability.Ability(name=f"Ability {i % 7}") for i in range(70)]
+    for number, model in enumerate(models):
+        matrix.add(number // 7, model)
+    expected = [model.model_copy() for model in models]
+    for _ in range(20):
+        cells = rng.integers(0, len(models), size=30)
+        gained = rng.integers(0, 25, size=30)
+        matrix.add_experience(cells, gained)
+        for cell, amount in zip(cells.tolist(), gained.tolist()):
+            expected[cell].add_experience(amount)
+    matrix.sync()
+    assert [(model.level, model.experience) for model in models] == [
+        (model.level, model.experience) for model in expected
+    ]
+    assert matrix.levels.tolist() == [model.level for model in expected]
+
+
+def test_lazy_sync(matrix: ability_matrix.AbilityMatrix):
+    """Test that models only change once they're fetched"""
+    model = ability.Ability(name="Brawl", level=1, experience=2)
+    cell = matrix.add("Alice", model)
+    matrix.add_experience([cell, cell], 10)
+    assert (model.level, model.experience) == (1, 2)
+    assert matrix.level("Alice", "Brawl") == 2
+    assert matrix.ability("Alice", "Brawl") is model
+    assert (model.level, model.experience) == (2, 12)
+
+
+def test_sync_notifies_index(matrix: ability_matrix.AbilityMatrix):
+    """Test that syncing moves characters in an ability index"""
+    index = ability_index.AbilityIndex(matrix.registry)
+    model = ability.Ability(name="Brawl")
+    index.add("Alice", model)
+    matrix.add("Alice", model)
+    matrix.add_experience([0], 50)
+    assert index.count_at_least("Brawl", 3) == 0
+    matrix.sync()
+    assert index.top("Brawl", 1) == [("Alice", 4)]
+
+
+def test_made_models(matrix: ability_matrix.AbilityMatrix):
+    """Test fetching a model for a cell that was never given one"""
+    matrix.add_experience(matrix.cells([("Alice", "Latin")]), 16)
+    model = matrix.ability("Alice", "Latin")
+    assert (model.level, model.experience) == (2, 1)
+    assert matrix.level("Bertrand", "Latin") == 0
+
+
+def test_negative_experience(matrix: ability_matrix.AbilityMatrix):
+    """Test that taking too much experience leaves every cell alone"""
+    cells = matrix.cells([("Alice", "Brawl"), ("Bertrand", "Brawl")])
+    matrix.add_experience(cells, [3, 3])
+    with pytest.raises(ValueError):
+        matrix.add_experience(cells, [-1, -4])
+    assert matrix.experience.tolist() == [3, 3]
+    with pytest.raises(IndexError):
+        matrix.add_experience([5], 1)
@@ -0,0 +1,103 @@
+"""Tests for the covenant recovery scheduler"""
+
+import datetime
+import random
+
+import pytest
+
+from characters.parts import fatigue
+from characters.parts import wound_tracker
+from covenant import recovery_scheduler
+
+START = datetime.datetime(1220, 3, 21, 6)
+
+
+@pytest.fixture
+def scheduler() -> recovery_scheduler.RecoveryScheduler:
+    """Empty scheduler"""
+    return recovery_scheduler.RecoveryScheduler()
+
+
+def test_nothing_to_recover(scheduler: recovery_scheduler.RecoveryScheduler):
+    """Test that healthy characters never get a deadline"""
+    scheduler.register_wounds("Alice", wound_tracker.WoundTracker(size=0), START)
+    scheduler.register_fatigue("Alice", fatigue.FatigueTracker(), START)
+    assert len(scheduler) == 0
+    assert scheduler.next_deadline() is None
+    assert scheduler.advance_to(START + datetime.timedelta(days=365)) == []
+
+
+def test_fatigue_recovery(scheduler: recovery_scheduler.RecoveryScheduler):
+    """Test that fatigue recovers on the same timeline as its schedule"""
+    tracker = fatigue.FatigueTracker(short_term_levels=3, long_term_levels=1)
+    schedule = tracker.recovery_schedule(START)
+    scheduler.register_fatigue("Alice", tracker, START)
+    assert scheduler.next_deadline() == schedule[0].time
+    events = scheduler.advance_to(schedule[1].time)
+    assert [event.time for event in events] == [step.time for step in schedule[:2]]
+    assert tracker.short_term_levels == 1
+    scheduler.advance_to(START + datetime.timedelta(days=1))
+    assert tracker.short_term_levels == 0
+    assert tracker.long_term_levels == 1
+    assert len(scheduler) == 0
+
+
+def test_wound_recovery(scheduler: recovery_scheduler.RecoveryScheduler):
+    """Test that wounds are rolled for once per recovery period"""
+    tracker = wound_tracker.WoundTracker(size=0)
+    tracker.add_wound(wound_tracker.LightWound())
+    tracker.add_wound(wound_tracker.MediumWound())
+    scheduler.register_wounds("Alice", tracker, START)
+    events = scheduler.advance_to(
+        START + datetime.timedelta(days=20), rng=random.Random(1)
+    )
+    # the medium wound isn't due for a month, the light wound is rolled for
+    # every week until it heals or gets worse
+    assert events
+    assert all(
+        event.kind == recovery_scheduler.RecoveryKind.LIGHT_WOUNDS for event in events
+    )
+    assert [event.time for event in events] == [
+        START + datetime.timedelta(weeks=week) for week in range(1, len(events) + 1)
+    ]
+    assert scheduler.next_deadline() <= datetime.datetime(1220, 4, 21, 6)
+
+
+def test_season_matches_daily_ticks():
+    """Test advancing a whole season at once is the same as day by day"""
+
+    def run(step: datetime.timedelta):
+        scheduler = recovery_scheduler.RecoveryScheduler()
+        trackers = []
+        for character in range(20):
+            tracker = wound_tracker.WoundTracker(size=0)
+            for _ in range(character % 3 + 1):
+                tracker.add_wound(wound_tracker.LightWound())
+            tracker.add_wound(wound_tracker.HeavyWound())
+            trackers.append(tracker)
+            scheduler.register_wounds(character, tracker, START, recovery_bonus=3)
+        rng = random.Random(5297992492366785183)
+        events = []
+        time = START
+        end = START + datetime.timedelta(days=91)
+        while time < end:
+            time = min(time + step, end)
+            events += scheduler.advance_to(time, rng=rng)
+        return events, [tracker.model_dump() for tracker in trackers]
+
+    assert run(datetime.timedelta(days=91)) == run(datetime.timedelta(days=1))
+
+
+def test_rearm_and_unregister(scheduler: recovery_scheduler.RecoveryScheduler):
+    """Test that new wounds need a rearm and unregistered characters are skipped"""
+    tracker = wound_tracker.WoundTracker(size=0)
+    scheduler.register_wounds("Alice", tracker, START)
+    tracker.take_damage(12)
+    assert scheduler.next_deadline() is None
+    scheduler.rearm("Alice", START)
+    # heavy wounds take a season, which is 3 months rather than 90 days
+    assert scheduler.next_deadline() == datetime.datetime(1220, 6, 21, 6)
+    scheduler.unregister("Alice")
+    assert scheduler.next_deadline() is None
+    assert scheduler.advance_to(START + datetime.timedelta(days=365)) == []
+    assert tracker.heavy_wounds == 1
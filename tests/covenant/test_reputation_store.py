@@ -0,0 +1,109 @@
+"""Tests for the covenant reputation store"""
+
+import pytest
+
+from characters.parts import reputation
+from covenant import reputation_store
+
+
+@pytest.fixture
+def store() -> reputation_store.ReputationStore:
+    """Store with a few reputations in the local village"""
+    store = reputation_store.ReputationStore()
+    for holder, content, score in [
+        ("Alice", "Healer", 3),
+        ("Bertrand", "Brawler", 2),
+        ("Cecily", "Witch", 5),
+        ("Alice", "Witch", 1),
+    ]:
+        store.add(
+            holder,
+            reputation.Reputation(content=content, target="Village", score=score),
+        )
+    store.add("Alice", reputation.Reputation(content="Healer", target="Church"))
+    return store
+
+
+def test_highest(store: reputation_store.ReputationStore):
+    """Test finding the highest reputations with a target"""
+    assert [
+        (holder, holder_reputation.content)
+        for holder, holder_reputation in store.highest("Village", 2)
+    ] == [("Cecily", "Witch"), ("Alice", "Healer")]
+    assert store.count_at_least("Village", 2) == 3
+    assert store.highest("Tribunal") == []
+    assert len(store) == 5
+
+
+def test_score_with(store: reputation_store.ReputationStore):
+    """Test a holder's best score with a target"""
+    assert store.score_with("Alice", "Village") == 3
+    assert store.score_with("Alice", "Church") == 1
+    assert store.score_with("Bertrand", "Church") == 0
+    assert store.score_with("Dunstan", "Tribunal") == 0
+
+
+def test_apply_deeds(store: reputation_store.ReputationStore):
+    """Test applying a story's awards in one go"""
+    store.apply_deeds(
+        [
+            reputation_store.DeedAward("Bertrand", "Village", "Brawler", 70),
+            ("Bertrand", "Village", "Brawler", 25),
+            ("Dunstan", "Tribunal", "Liar", 12),
+        ]
+    )
+    brawler = store.get("Bertrand", "Village", "Brawler")
+    expected = reputation.Reputation(content="Brawler", target="Village", score=2)
+    expected.add_deeds(95)
+    assert (brawler.score, brawler.deeds) == (expected.score, expected.deeds)
+    assert store.score_with("Bertrand", "Village") == expected.score
+    assert store.highest("Village")[0][0] == "Bertrand"
+    liar = store.get("Dunstan", "Tribunal", "Liar")
+    assert (liar.score, liar.deeds) == (2, 2)
+
+
+def test_apply_deeds_is_all_or_nothing(store: reputation_store.ReputationStore):
+    """Test that an invalid award leaves every other award unapplied"""
+    with pytest.raises(ValueError):
+        store.apply_deeds(
+            [
+                ("Bertrand", "Village", "Brawler", 70),
+                ("Dunstan", "Tribunal", "Liar", 12),
+                ("Edith", "Abbey", "Pious", 3),
+                ("Alice", "Church", "Healer", -1),
+            ]
+        )
+    brawler = store.get("Bertrand", "Village", "Brawler")
+    assert (brawler.score, brawler.deeds) == (2, 0)
+    assert store.get("Dunstan", "Tribunal", "Liar") is None
+    assert store.highest("Tribunal") == []
+    assert "Tribunal" not in store.targets
+    assert "Abbey" not in store.targets
+    assert len(store) == 5
+
+
+def test_direct_add_deeds(store: reputation_store.ReputationStore):
+    """Test that changes made on the reputation itself are tracked"""
+    store.get("Alice", "Church", "Healer").add_deeds(100)
+    assert store.highest("Church")[0][1].score == store.score_with("Alice", "Church")
+    assert store.count_at_least("Church", 5) == 1
+
+
+def test_copies_are_not_ranked(store: reputation_store.ReputationStore):
+    """Test that changing a copy of a stored reputation leaves the store alone"""
+    healer = store.get("Alice", "Church", "Healer")
+    for copy in (healer.model_copy(), healer.model_copy(deep=True)):
+        copy.add_deeds(100)
+    assert store.score_with("Alice", "Church") == 1
+    assert store.count_at_least("Church", 2) == 0
+
+
+def test_remove(store: reputation_store.ReputationStore):
+    """Test removing a reputation"""
+    witch = store.get("Cecily", "Village", "Witch")
+    store.remove("Cecily", "Village", "Witch")
+    assert store.get("Cecily", "Village", "Witch") is None
+    witch.add_deeds(100)
+    assert store.highest("Village")[0][0] == "Alice"
+    with pytest.raises(ValueError):
+        store.add("Alice", reputation.Reputation(content="Healer", target="Village"))
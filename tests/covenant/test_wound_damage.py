@@ -0,0 +1,79 @@
+"""Tests for applying a round of damage at once"""
+
+import random
+
+import numpy
+import pytest
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_tracker
+from covenant import wound_damage
+
+TEST_SEED_VALUE = 5297992492366785183
+
+
+def test_wound_levels():
+    """Test that levels match take_damage's table"""
+    levels = wound_damage.wound_levels(
+        numpy.array([-3, 0, 1, 5, 6, 10, 11, 15, 16, 20, 21, 100]), numpy.array(5)
+    )
+    assert levels.tolist() == [0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+
+
+@pytest.mark.parametrize(
+    "tracker_type",
+    [wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker],
+)
+def test_matches_take_damage(tracker_type: type[wound_tracker.WoundTracker]):
+    """Test that applying hits at once leaves trackers as taking them one by one"""
+    rng = random.Random(TEST_SEED_VALUE)
+    sizes = [-2, -1, 0, 1, 2]
+    hits = [(rng.randrange(len(sizes)), rng.randint(1, 20)) for _ in range(200)]
+    expected = [tracker_type(size=size) for size in sizes]
+    for target, damage in hits:
+        expected[target].take_damage(damage)
+    trackers = [tracker_type(size=size) for size in sizes]
+    summary = wound_damage.apply_damage(
+        (trackers[target], damage) for target, damage in hits
+    )
+    assert sorted(map(id, summary.trackers)) == sorted(map(id, trackers))
+    assert [tracker.model_dump() for tracker in trackers] == [
+        tracker.model_dump() for tracker in expected
+    ]
+    assert summary.new_wounds.sum() == len(hits)
+    for tracker in trackers:
+        tracker.check_consistency()
+
+
+def test_summary():
+    """Test that the summary counts wounds and picks out who went down"""
+    trackers = [wound_tracker.WoundTracker(size=0) for _ in range(4)]
+    trackers[3].take_damage(18)
+    summary = wound_damage.apply_damage_to(
+        trackers, [0, 0, 1, 2, 2, 3], [1, 7, 18, 30, 12, 25]
+    )
+    assert summary.new_wounds.tolist() == [
+        [1, 1, 0, 0, 0],
+        [0, 0, 0, 1, 0],
+        [0, 0, 1, 0, 1],
+        [0, 0, 0, 0, 1],
+    ]
+    assert summary.incapacitated.tolist() == [False, True, False, False]
+    assert summary.killed.tolist() == [False, False, True, True]
+
+
+def test_misses():
+    """Test that damage that isn't positive does nothing"""
+    tracker = wound_tracker.WoundTracker(size=0)
+    summary = wound_damage.apply_damage([(tracker, 0), (tracker, -4)])
+    assert summary.new_wounds.tolist() == [[0, 0, 0, 0, 0]]
+    assert tracker.wound_bonus == 0
+
+
+def test_bad_targets():
+    """Test that targets have to line up with damage and trackers"""
+    trackers = [wound_tracker.WoundTracker(size=0)]
+    with pytest.raises(ValueError):
+        wound_damage.apply_damage_to(trackers, [0, 0], [1])
+    with pytest.raises(IndexError):
+        wound_damage.apply_damage_to(trackers, [1], [1])
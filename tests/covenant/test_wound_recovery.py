@@ -0,0 +1,130 @@
+"""Tests for recovering wounds across the covenant"""
+
+import numpy
+import pytest
+
+from characters.parts import compact_wound_tracker
+from characters.parts import wound_tracker
+from covenant import wound_recovery
+from lib import am5_rolls
+
+TEST_SEED_VALUE = 5297992492366785183
+
+
+class ConstantBackend:
+    """Stress roll backend where every roll comes up the same"""
+
+    def __init__(self, value: int, botch_level: int = 0) -> None:
+        self.value = value
+        self.botch_level = botch_level
+
+    def roll_stress_outcome(self, botch_dice, modifier, rng):
+        """One roll of the constant"""
+        return am5_rolls.StressRollOutcome(self.value + modifier, 0, self.botch_level)
+
+    def roll_stress_batch(self, n, botch_dice, modifier, rng):
+        """n rolls of the constant"""
+        return (
+            numpy.full(n, self.value + modifier, dtype=numpy.int64),
+            numpy.full(n, self.botch_level, dtype=numpy.int64),
+        )
+
+
+def wounded_trackers(tracker_type: type[wound_tracker.WoundTracker]):
+    """A few trackers with a spread of wounds"""
+    trackers = [tracker_type(size=0) for _ in range(4)]
+    for index, tracker in enumerate(trackers):
+        for damage in range(1, 4 * index + 4):
+            tracker.take_damage(damage)
+    trackers[2].take_damage(18)
+    return trackers
+
+
+def tracker_state(tracker: wound_tracker.WoundTracker):
+    """Everything about a tracker that recovery can change"""
+    wounds = [
+        [(wound.recovery_bonus, wound.status) for wound in tracker.get_wounds(kind)]
+        for kind in (
+            wound_tracker.LightWound,
+            wound_tracker.MediumWound,
+            wound_tracker.HeavyWound,
+            wound_tracker.IncapacitatingWound,
+        )
+    ]
+    return tracker.model_dump(), wounds
+
+
+@pytest.mark.parametrize(
+    "tracker_type",
+    [wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker],
+)
+@pytest.mark.parametrize(
+    "value, botch_level", [(0, 0), (4, 0), (6, 0), (9, 0), (12, 0), (20, 0), (0, 1)]
+)
+def test_matches_recovering_one_at_a_time(
+    monkeypatch: pytest.MonkeyPatch,
+    tracker_type: type[wound_tracker.WoundTracker],
+    value: int,
+    botch_level: int,
+):
+    """Test that batch recovery does exactly what the recover_all_* methods do"""
+    monkeypatch.setattr(
+        am5_rolls, "_stress_roll_backend", ConstantBackend(value, botch_level)
+    )
+    bonuses = [0, 3, 0, 6]
+    expected = wounded_trackers(tracker_type)
+    for tracker, bonus in zip(expected, bonuses):
+        tracker.recover_all_light_wounds(bonus)
+        tracker.recover_all_medium_wounds(bonus)
+        tracker.recover_all_heavy_wounds(bonus)
+        tracker.recover_all_incapacitating_wounds(bonus)
+    trackers = wounded_trackers(tracker_type)
+    wound_recovery.recover_all(trackers, bonuses)
+    assert [tracker_state(tracker) for tracker in trackers] == [
+        tracker_state(tracker) for tracker in expected
+    ]
+
+
+def test_random_recovery_keeps_totals():
+    """Test that real rolls leave the running wound bonus right"""
+    trackers = wounded_trackers(wound_tracker.WoundTracker)
+    rng = numpy.random.default_rng(TEST_SEED_VALUE)
+    for _ in range(5):
+        wound_recovery.recover_all(trackers, 3, rng=rng)
+        for tracker in trackers:
+            tracker.check_consistency()
+
+
+def test_nothing_to_recover():
+    """Test that healthy trackers are left alone"""
+    trackers = [wound_tracker.WoundTracker(size=0) for _ in range(3)]
+    wound_recovery.recover_all(trackers)
+    assert all(tracker.wound_bonus == 0 for tracker in trackers)
+
+
+def test_wrong_number_of_statuses():
+    """Test that statuses have to line up with wounds"""
+    tracker = wound_tracker.WoundTracker(size=0)
+    tracker.take_damage(1)
+    with pytest.raises(ValueError):
+        tracker.apply_recovery_statuses(wound_tracker.LightWound, [0, 0])
+
+
+@pytest.mark.parametrize(
+    "tracker_type",
+    [wound_tracker.WoundTracker, compact_wound_tracker.CompactWoundTracker],
+)
+def test_statuses_as_array(tracker_type: type[wound_tracker.WoundTracker]):
+    """Test that statuses can be handed over as a numpy array"""
+    statuses = [1, 0, -1, 0, 1, -1, -1]
+    expected, tracker = tracker_type(size=0), tracker_type(size=0)
+    for wounded in (expected, tracker):
+        for _ in statuses:
+            wounded.add_wound(wound_tracker.LightWound())
+    expected.apply_recovery_statuses(wound_tracker.LightWound, statuses)
+    tracker.apply_recovery_statuses(
+        wound_tracker.LightWound, numpy.array(statuses, dtype=numpy.int8)
+    )
+    assert tracker_state(tracker) == tracker_state(expected)
+    assert tracker.medium_wounds == 3
+    assert tracker.light_wounds == 2
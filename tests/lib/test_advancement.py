@@ -0,0 +1,78 @@
+"""Tests for ability and reputation advancement"""
+
+import pytest
+
+from lib import am5_advancement
+
+
+def _advance_by_loop(level: int, experience: int, gained: int) -> tuple[int, int]:
+    new_experience = experience + gained
+    while new_experience >= 5 * (level + 1):
+        level += 1
+        new_experience = new_experience - 5 * level
+    return level, new_experience
+
+
+@pytest.mark.parametrize(
+    ("level", "total_experience"),
+    [(0, 0), (1, 5), (2, 15), (3, 30), (5, 75), (100, 25250), (1000, 2502500)],
+)
+def test_experience_for_level(level: int, total_experience: int):
+    assert am5_advancement.experience_for_level(level) == total_experience
+    assert am5_advancement.level_for_experience(total_experience) == level
+    if level:
+        assert am5_advancement.level_for_experience(total_experience - 1) == level - 1
+
+
+def test_level_for_experience_brackets():
+    # covers both the lookup table and the square root past the end of it
+    for total_experience in range(0, 60000, 7):
+        level = am5_advancement.level_for_experience(total_experience)
+        assert am5_advancement.experience_for_level(level) <= total_experience
+        assert total_experience < am5_advancement.experience_for_level(level + 1)
+
+
+def test_negative():
+    with pytest.raises(ValueError):
+        am5_advancement.experience_for_level(-1)
+    with pytest.raises(ValueError):
+        am5_advancement.level_for_experience(-1)
+
+
+@pytest.mark.parametrize(
+    ("level", "experience", "gained"),
+    [
+        (0, 0, 20),
+        (0, 4, 1),
+        (2, 3, 0),
+        (3, 2, 500),
+        (1, 9, 1),
+        (7, 0, 123456),
+        (2, 3, -2),
+        (2, 3, -5),
+    ],
+)
+def test_advance_matches_loop(level: int, experience: int, gained: int):
+    assert am5_advancement.advance(level, experience, gained) == _advance_by_loop(
+        level, experience, gained
+    )
+
+
+def test_level_for_experience_batch():
+    totals = list(range(0, 30000, 3)) + [10**12 + 7, 5 * 10**15]
+    assert am5_advancement.level_for_experience_batch(totals).tolist() == [
+        am5_advancement.level_for_experience(total) for total in totals
+    ]
+    with pytest.raises(ValueError):
+        am5_advancement.level_for_experience_batch([5, -1])
+
+
+def test_advance_batch_matches_advance():
+    cases = [(0, 0, 20), (0, 4, 1), (2, 3, 0), (3, 2, 500), (7, 0, 123456), (2, 3, -5)]
+    levels, experience, gained = zip(*cases)
+    new_levels, new_experience = am5_advancement.advance_batch(
+        levels, experience, gained
+    )
+    assert list(zip(new_levels.tolist(), new_experience.tolist())) == [
+        am5_advancement.advance(*case) for case in cases
+    ]
@@ -0,0 +1,88 @@
+"""Tests for batched model updates"""
+
+from typing import Self
+
+import pydantic
+import pytest
+
+from lib import batch_update
+
+
+class _Range(batch_update.BatchUpdateModel):
+    model_config = pydantic.ConfigDict(validate_assignment=True)
+    low: int = pydantic.Field(default=0, ge=0)
+    high: int = 1
+    label: str = pydantic.Field(default="range", frozen=True)
+    _notes: list[str] = pydantic.PrivateAttr(default_factory=list)
+
+    @pydantic.model_validator(mode="after")
+    def ordered(self) -> Self:
+        assert self.low < self.high
+        return self
+
+
+@pytest.fixture
+def range_fixture() -> _Range:
+    return _Range()
+
+
+def test_assignment_still_validated(range_fixture: _Range):
+    with pytest.raises(pydantic.ValidationError):
+        range_fixture.low = 5
+
+
+def test_batch_allows_invalid_intermediate_state(range_fixture: _Range):
+    with range_fixture.batch_update():
+        range_fixture.low = 5
+        assert range_fixture.low == 5
+        range_fixture.high = 10
+    assert (range_fixture.low, range_fixture.high) == (5, 10)
+    assert {"low", "high"} <= range_fixture.model_fields_set
+
+
+def test_batch_rolls_back_when_invalid(range_fixture: _Range):
+    range_fixture.high = 3
+    with pytest.raises(pydantic.ValidationError):
+        with range_fixture.batch_update():
+            range_fixture.low = 5
+    assert (range_fixture.low, range_fixture.high) == (0, 3)
+    assert range_fixture.model_fields_set == {"high"}
+    range_fixture.low = 2
+    assert range_fixture.low == 2
+
+
+def test_batch_rolls_back_on_exception(range_fixture: _Range):
+    with pytest.raises(KeyError):
+        with range_fixture.batch_update():
+            range_fixture.high = 10
+            raise KeyError
+    assert range_fixture.high == 1
+
+
+def test_batch_field_validation(range_fixture: _Range):
+    with pytest.raises(pydantic.ValidationError):
+        with range_fixture.batch_update():
+            range_fixture.low = -1
+            range_fixture.high = "not a number"
+    assert (range_fixture.low, range_fixture.high) == (0, 1)
+
+
+def test_batch_keeps_private_attributes(range_fixture: _Range):
+    range_fixture._notes.append("kept")
+    with range_fixture.batch_update():
+        range_fixture.high = 4
+    assert range_fixture._notes == ["kept"]
+
+
+def test_frozen_fields_stay_frozen(range_fixture: _Range):
+    with pytest.raises(pydantic.ValidationError):
+        with range_fixture.batch_update():
+            range_fixture.label = "other"
+
+
+def test_nested_batches(range_fixture: _Range):
+    with range_fixture.batch_update():
+        with range_fixture.batch_update():
+            range_fixture.low = 5
+        range_fixture.high = 6
+    assert (range_fixture.low, range_fixture.high) == (5, 6)
@@ -0,0 +1,73 @@
+import numpy
+import pytest
+
+from lib import am5_distributions
+from lib import am5_rolls
+
+
+def test_probabilities_sum_to_one():
+    distribution = am5_distributions.stress_roll_distribution(3, 2)
+    total = sum(distribution.probabilities.values()) + sum(
+        distribution.botch_probabilities.values()
+    )
+    assert total == pytest.approx(1)
+
+def test_probabilities_include_explosions():
+    distribution = am5_distributions.stress_roll_distribution(1, 0)
+    assert distribution.probabilities[2] == pytest.approx(0.1)
+    # a 4 can come straight off the die or from a 1 then a 2
+    assert distribution.probabilities[4] == pytest.approx(0.11)
+    assert distribution.probabilities[10] == pytest.approx(0.01)
+    assert 1 not in distribution.probabilities
+
+@pytest.mark.parametrize(
+    ("botch_dice", "expected_botch_probabilities"),
+    [(0, {}), (1, {1: 0.01}), (2, {1: 0.018, 2: 0.001})],
+)
+def test_botch_probabilities(botch_dice, expected_botch_probabilities):
+    distribution = am5_distributions.stress_roll_distribution(botch_dice, 0)
+    assert distribution.botch_probabilities == pytest.approx(
+        expected_botch_probabilities
+    )
+
+@pytest.mark.parametrize(
+    ("ease_factor", "botch_dice", "modifier", "expected_probability"),
+    [
+        (-5, 0, 0, 1),
+        (0, 1, 0, 0.99),
+        (2, 1, 0, 0.9),
+        (9, 0, 3, 0.4 + 0.1 * 0.9),
+        (1000000, 1, 0, 0),
+    ],
+)
+def test_probability_of_success(ease_factor, botch_dice, modifier, expected_probability):
+    assert am5_distributions.probability_of_success(
+        ease_factor, botch_dice, modifier
+    ) == pytest.approx(expected_probability)
+
+def test_probability_of_success_matches_rolls():
+    rng = numpy.random.default_rng(5297992492366785183)
+    results, botch_levels = am5_rolls.roll_stress_batch(1000000, 2, 4, rng=rng)
+    for ease_factor in (6, 9, 12, 15, 21):
+        simulated = ((results >= ease_factor) & (botch_levels == 0)).mean()
+        assert am5_distributions.probability_of_success(
+            ease_factor, 2, 4
+        ) == pytest.approx(simulated, abs=0.002)
+
+def test_distribution_is_memoized():
+    assert am5_distributions.stress_roll_distribution(
+        2, 3
+    ) is am5_distributions.stress_roll_distribution(2, 3)
+
+def test_truncation_is_kept_in_tail():
+    distribution = am5_distributions.stress_roll_distribution(1, 0, epsilon=1e-3)
+    assert distribution.truncated_probability == pytest.approx(1e-3)
+    # 8 and 4 explode to 16, and all of the cut off chains start there
+    assert distribution.probabilities[16] == pytest.approx(0.01 + 0.001 + 1e-3)
+    assert distribution.probability_of_success(16) == pytest.approx(
+        sum(
+            probability
+            for value, probability in distribution.probabilities.items()
+            if value >= 16
+        )
+    )
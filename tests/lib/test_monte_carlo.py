@@ -0,0 +1,67 @@
+import pytest
+
+from lib import am5_distributions
+from lib import am5_monte_carlo
+
+TEST_SEED_VALUE = 5297992492366785183
+
+
+@pytest.fixture(scope="module")
+def progress():
+    return list(
+        am5_monte_carlo.iter_roll_histograms(
+            [0, 2], 200000, TEST_SEED_VALUE, shards=4, max_workers=2
+        )
+    )
+
+def test_progress_streams_every_shard(progress):
+    assert [step.completed_shards for step in progress] == list(range(1, 9))
+    assert all(step.total_shards == 8 for step in progress)
+    assert progress[0].histograms[0].rolls + progress[0].histograms[2].rolls == 50000
+
+def test_histograms_cover_every_roll(progress):
+    histograms = progress[-1].histograms
+    for botch_dice in (0, 2):
+        assert histograms[botch_dice].rolls == 200000
+        assert (
+            histograms[botch_dice].counts.sum() + histograms[botch_dice].botches
+            == 200000
+        )
+    assert histograms[0].botches == 0
+    assert histograms[2].botches > 0
+
+@pytest.mark.parametrize(("modifier", "ease_factor"), [(0, 6), (3, 9), (5, 21), (7, 3)])
+def test_success_rate_interval_covers_exact(progress, modifier, ease_factor):
+    rate = progress[-1].histograms[2].success_rate(modifier, ease_factor, 0.999)
+    exact = am5_distributions.probability_of_success(ease_factor, 2, modifier)
+    assert rate.lower <= exact <= rate.upper
+    assert rate.rolls == 200000
+
+def test_simulation_is_reproducible():
+    first = am5_monte_carlo.simulate_success_rates(
+        [0, 4], [6, 12], [1], 20000, TEST_SEED_VALUE, shards=3, max_workers=2
+    )
+    second = am5_monte_carlo.simulate_success_rates(
+        [0, 4], [6, 12], [1], 20000, TEST_SEED_VALUE, shards=3, max_workers=3
+    )
+    assert first == second
+    assert set(first) == {(0, 6, 1), (0, 12, 1), (4, 6, 1), (4, 12, 1)}
+
+def test_success_rate_beyond_tracked_results(progress):
+    histogram = progress[-1].histograms[0]
+    top = am5_monte_carlo.MAX_TRACKED_RESULT
+    assert histogram.success_rate(0, top).rate == histogram.counts[top] / 200000
+    with pytest.raises(ValueError):
+        histogram.success_rate(0, top + 1)
+    with pytest.raises(ValueError):
+        histogram.success_rate(-1, top)
+
+def test_simulation_rejects_untracked_ease_factors():
+    with pytest.raises(ValueError):
+        am5_monte_carlo.simulate_success_rates(
+            [0, 3], [6, am5_monte_carlo.MAX_TRACKED_RESULT + 1], [1], 100, TEST_SEED_VALUE
+        )
+
+def test_merge_rejects_other_botch_dice():
+    with pytest.raises(ValueError):
+        am5_monte_carlo.RollHistogram(1).merge(am5_monte_carlo.RollHistogram(2))
@@ -1,9 +1,12 @@
 import random
 
+import numpy
 import pytest
 
 from lib import am5_rolls
 
+TEST_NUMPY_SEED_VALUE = 5297992492366785183
+
 @pytest.fixture(autouse=True)
 def set_seed():
     # DO NOT CHANGE THIS NUMBER FROM 5297992492366785183 OR ALL RNG TESTS WILL BREAK
@@ -40,4 +43,100 @@ def test_stress_roll():
             roll_result = am5_rolls.roll_stress(i+1)
             assert roll_result == expected_roll_result
         except am5_rolls.BotchedRollExcption:
-            assert expected_roll_result is None
\ No newline at end of file
+            assert expected_roll_result is None
+
+def test_standard_roll_batch():
+    rng = numpy.random.default_rng(TEST_NUMPY_SEED_VALUE)
+    roll_results = am5_rolls.roll_standard_batch(10000, 3, rng=rng)
+    assert roll_results.shape == (10000,)
+    assert roll_results.min() == 4
+    assert roll_results.max() == 13
+
+def test_stress_roll_batch_never_raises():
+    rng = numpy.random.default_rng(TEST_NUMPY_SEED_VALUE)
+    roll_results, botch_levels = am5_rolls.roll_stress_batch(10000, 3, 2, rng=rng)
+    assert roll_results.shape == botch_levels.shape == (10000,)
+    assert botch_levels.max() > 0
+    assert botch_levels.max() <= 3
+    # botches only happen on a 0, which scores just the modifier
+    assert (roll_results[botch_levels > 0] == 2).all()
+
+def test_stress_roll_batch_values():
+    rng = numpy.random.default_rng(TEST_NUMPY_SEED_VALUE)
+    roll_results, _ = am5_rolls.roll_stress_batch(100000, 0, rng=rng)
+    # 1s never stand, they explode into a doubled reroll
+    assert not (roll_results == 1).any()
+    exploded = roll_results[roll_results > 9]
+    assert (exploded % 2 == 0).all()
+    assert (roll_results >= 0).all()
+
+def test_stress_roll_batch_reproducible():
+    first = am5_rolls.roll_stress_batch(
+        1000, rng=numpy.random.default_rng(TEST_NUMPY_SEED_VALUE)
+    )
+    second = am5_rolls.roll_stress_batch(
+        1000, rng=numpy.random.default_rng(TEST_NUMPY_SEED_VALUE)
+    )
+    assert (first[0] == second[0]).all()
+    assert (first[1] == second[1]).all()
+
+# generated from running the tests with TEST_SEED_VALUE of 5297992492366785183
+# and 10 botch dice, the last roll botches
+EXPECTED_STRESS_ROLLS_WITH_BOTCH = [8, 8, 7, 3, 7, 4, 8, 3, 7, 4, 9, 8, 4, 7, 5, 0, 9, 9,
+                                    8, 6, 4, 9, 8, 9, 4, 6, 2, 0, 9, 4, 3, 5, 10, 6, 6, None]
+
+def test_stress_roll_outcome():
+    assert EXPECTED_STRESS_ROLLS_WITH_BOTCH[-1] is None
+    for expected_roll_result in EXPECTED_STRESS_ROLLS_WITH_BOTCH:
+        outcome = am5_rolls.roll_stress_outcome(10)
+        if expected_roll_result is None:
+            assert outcome.botch_level > 0
+        else:
+            assert outcome.botch_level == 0
+            assert outcome.value == expected_roll_result
+
+def test_stress_roll_outcome_explosions():
+    # generated from running the test with TEST_SEED_VALUE of 5297992492366785183
+    expected_outcomes = [(8, 1, 0), (8, 1, 0), (6, 1, 0), (10, 1, 0), (16, 1, 0)]
+    outcomes = [am5_rolls.roll_stress_outcome(0) for i in range(200)]
+    exploded = [tuple(outcome) for outcome in outcomes if outcome.explosions]
+    assert exploded[:5] == expected_outcomes
+
+def test_standard_roll_with_rng():
+    # same stream as the global seed but without touching the global state
+    expected_roll_results = [2, 4, 9, 8, 4, 8, 5, 9, 4, 8]
+    rng = random.Random(5297992492366785183)
+    random.seed(1)
+    roll_results = [am5_rolls.roll_standard(rng=rng) for i in range(10)]
+    assert roll_results == expected_roll_results
+    assert random.random() == random.Random(1).random()
+
+def test_stress_roll_with_rng():
+    # same stream as the global seed but without touching the global state
+    rng = random.Random(5297992492366785183)
+    random.seed(1)
+    roll_results = []
+    for _ in EXPECTED_STRESS_ROLLS_WITH_BOTCH:
+        try:
+            roll_results.append(am5_rolls.roll_stress(10, rng=rng))
+        except am5_rolls.BotchedRollExcption:
+            roll_results.append(None)
+    assert roll_results == EXPECTED_STRESS_ROLLS_WITH_BOTCH
+    assert random.random() == random.Random(1).random()
+
+def test_spawn_rngs_reproducible():
+    first = [[am5_rolls.roll_stress_outcome(rng=rng) for i in range(20)]
+             for rng in am5_rolls.spawn_rngs(TEST_NUMPY_SEED_VALUE, 4)]
+    second = [[am5_rolls.roll_stress_outcome(rng=rng) for i in range(20)]
+              for rng in am5_rolls.spawn_rngs(TEST_NUMPY_SEED_VALUE, 4)]
+    assert first == second
+    # every worker gets its own stream
+    assert len({tuple(rolls) for rolls in first}) == 4
+
+def test_spawn_generators_reproducible():
+    first = [am5_rolls.roll_stress_batch(100, rng=rng)[0]
+             for rng in am5_rolls.spawn_generators(TEST_NUMPY_SEED_VALUE, 3)]
+    second = [am5_rolls.roll_stress_batch(100, rng=rng)[0]
+              for rng in am5_rolls.spawn_generators(TEST_NUMPY_SEED_VALUE, 3)]
+    assert all((a == b).all() for a, b in zip(first, second))
+    assert not (first[0] == first[1]).all()
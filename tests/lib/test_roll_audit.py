@@ -0,0 +1,157 @@
+import random
+
+import numpy
+import pytest
+
+from characters.parts import wound_tracker
+from covenant import wound_recovery
+from lib import am5_roll_audit
+from lib import am5_rolls
+
+
+@pytest.fixture
+def audit_log(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    log = am5_roll_audit.RollAuditLog(tmp_path / "rolls.audit", capacity=2)
+    monkeypatch.setattr(am5_rolls, "_roll_audit_sink", None)
+    am5_rolls.set_roll_audit_sink(log)
+    yield log
+    am5_rolls.set_roll_audit_sink(None)
+    log.close()
+
+def test_rolls_are_recorded(audit_log):
+    rng = random.Random(5297992492366785183)
+    standard_results = [am5_rolls.roll_standard(2, rng=rng) for i in range(5)]
+    stress_outcomes = [am5_rolls.roll_stress_outcome(3, 1, rng=rng) for i in range(50)]
+    audit_log.close()
+    records = list(am5_roll_audit.iter_roll_records(audit_log.path))
+    assert len(records) == 55
+    assert [record.result for record in records[:5]] == standard_results
+    assert all(record.kind == am5_rolls.RollKind.STANDARD for record in records[:5])
+    assert [record.to_stress_outcome() for record in records[5:]] == stress_outcomes
+    assert all(record.botch_dice == 3 for record in records[5:])
+    for record in records[5:]:
+        if record.botch_level or record.raw_die == 0:
+            assert record.result == 1
+        elif record.raw_die == 1:
+            assert record.explosions > 0
+        else:
+            assert record.result == record.raw_die + 1
+
+def test_botches_are_recorded_before_raising(audit_log):
+    rng = random.Random(5297992492366785183)
+    botches = 0
+    for i in range(200):
+        try:
+            am5_rolls.roll_stress(5, rng=rng)
+        except am5_rolls.BotchedRollExcption:
+            botches += 1
+    audit_log.close()
+    records = list(am5_roll_audit.iter_roll_records(audit_log.path))
+    assert len(records) == 200
+    assert botches > 0
+    assert sum(record.botch_level > 0 for record in records) == botches
+
+def test_log_appends_to_existing_file(audit_log):
+    am5_rolls.roll_standard()
+    audit_log.close()
+    with am5_roll_audit.RollAuditLog(audit_log.path) as reopened:
+        assert len(reopened) == 1
+        reopened.record(am5_rolls.RollKind.STANDARD, 5, 0, 0, 0, 5)
+    assert len(list(am5_roll_audit.iter_roll_records(audit_log.path))) == 2
+
+def test_not_an_audit_log(tmp_path):
+    bad_path = tmp_path / "bad.audit"
+    bad_path.write_bytes(b"definitely not rolls")
+    with pytest.raises(am5_roll_audit.CorruptRollAuditError):
+        am5_roll_audit.RollAuditLog(bad_path)
+    with pytest.raises(am5_roll_audit.CorruptRollAuditError):
+        list(am5_roll_audit.iter_roll_records(bad_path))
+
+def test_replay_into_wound_recovery(audit_log):
+    def wounded_tracker():
+        tracker = wound_tracker.WoundTracker(size=0)
+        for _ in range(30):
+            tracker.add_wound(wound_tracker.LightWound())
+        return tracker
+
+    original = wounded_tracker()
+    original.recover_all_light_wounds(0, rng=random.Random(5297992492366785183))
+    audit_log.close()
+    am5_rolls.set_roll_audit_sink(None)
+
+    replayed = wounded_tracker()
+    replayed.recover_all_light_wounds(
+        0, am5_roll_audit.replay_stress_outcomes(audit_log.path)
+    )
+    assert replayed.model_dump() == original.model_dump()
+    assert [wound.recovery_bonus for wound in replayed._light_wounds] == [
+        wound.recovery_bonus for wound in original._light_wounds
+    ]
+
+def test_batch_rolls_are_recorded(audit_log):
+    rng = numpy.random.default_rng(5297992492366785183)
+    standard_results = am5_rolls.roll_standard_batch(5, 2, rng=rng)
+    results, botch_levels = am5_rolls.roll_stress_batch(2000, 3, 1, rng=rng)
+    audit_log.close()
+    records = list(am5_roll_audit.iter_roll_records(audit_log.path))
+    assert len(records) == 2005
+    assert [record.result for record in records[:5]] == standard_results.tolist()
+    assert [record.raw_die + 2 for record in records[:5]] == standard_results.tolist()
+    assert [record.to_stress_outcome().value for record in records[5:]] == (
+        results.tolist()
+    )
+    assert [record.botch_level for record in records[5:]] == botch_levels.tolist()
+    assert any(record.explosions for record in records[5:])
+    for record in records[5:]:
+        if record.explosions:
+            assert record.raw_die == 1
+            assert (record.result - 1) % 2**record.explosions == 0
+            assert 2 <= (record.result - 1) >> record.explosions <= 10
+        elif record.botch_level or record.raw_die == 0:
+            assert record.result == 1
+        else:
+            assert record.result == record.raw_die + 1
+
+def test_backend_batch_rolls_are_recorded(audit_log):
+    class DoublingBackend:
+        def roll_stress_outcome(self, botch_dice, modifier, rng):
+            raise AssertionError("Only batches are rolled")
+
+        def roll_stress_batch(self, n, botch_dice, modifier, rng):
+            return (
+                numpy.array([5, 20, 48, 3, 2], dtype=numpy.int64)[:n] + modifier,
+                numpy.array([0, 0, 0, 0, 2], dtype=numpy.int64)[:n],
+            )
+
+    am5_rolls.roll_stress_batch(5, 2, -1, backend=DoublingBackend())
+    audit_log.close()
+    assert [
+        (record.raw_die, record.explosions, record.botch_level, record.result)
+        for record in am5_roll_audit.iter_roll_records(audit_log.path)
+    ] == [(5, 0, 0, 4), (1, 1, 0, 19), (1, 3, 0, 47), (3, 0, 0, 2), (0, 0, 2, 1)]
+
+def test_replay_into_batch_recovery(audit_log):
+    def wounded_trackers():
+        trackers = [wound_tracker.WoundTracker(size=0) for _ in range(20)]
+        for index, tracker in enumerate(trackers):
+            for damage in range(1, index + 4):
+                tracker.take_damage(damage)
+        return trackers
+
+    original = wounded_trackers()
+    rng = numpy.random.default_rng(5297992492366785183)
+    for _ in range(3):
+        wound_recovery.recover_all(original, 2, rng=rng)
+    audit_log.close()
+    am5_rolls.set_roll_audit_sink(None)
+
+    replayed = wounded_trackers()
+    recorded = iter(am5_roll_audit.replay_stress_outcomes(audit_log.path))
+    for _ in range(3):
+        wound_recovery.recover_all(replayed, 2, recovery_roll_results=recorded)
+    assert next(recorded, None) is None
+    assert [tracker.model_dump() for tracker in replayed] == [
+        tracker.model_dump() for tracker in original
+    ]
+    with pytest.raises(ValueError):
+        wound_recovery.recover_all(replayed, 2, recovery_roll_results=[])
@@ -0,0 +1,70 @@
+import random
+
+import numpy
+import pytest
+
+from lib import am5_distributions
+from lib import am5_rolls
+from lib import am5_sampler
+
+TEST_SEED_VALUE = 5297992492366785183
+
+
+@pytest.fixture
+def sampler():
+    return am5_sampler.StressRollSampler(max_explosions=1)
+
+def test_batch_matches_exact_distribution(sampler):
+    rng = numpy.random.default_rng(TEST_SEED_VALUE)
+    results, botch_levels = sampler.roll_stress_batch(1000000, 2, 3, rng=rng)
+    distribution = am5_distributions.stress_roll_distribution(2, 3)
+    for ease_factor in (3, 6, 10, 13, 20, 40):
+        simulated = ((results >= ease_factor) & (botch_levels == 0)).mean()
+        assert distribution.probability_of_success(ease_factor) == pytest.approx(
+            simulated, abs=0.002
+        )
+    assert (botch_levels > 0).mean() == pytest.approx(
+        distribution.probability_of_botch(), abs=0.001
+    )
+
+def test_deep_explosions_past_the_table(sampler):
+    rng = numpy.random.default_rng(TEST_SEED_VALUE)
+    results, _ = sampler.roll_stress_batch(1000000, 1, rng=rng)
+    # anything over 20 needs 2 or more doublings, which is past the table
+    deep = results[results > 20]
+    assert deep.size / results.size == pytest.approx(
+        am5_distributions.probability_of_success(21, 1), rel=0.1
+    )
+    assert (deep % 4 == 0).all()
+
+def test_single_rolls(sampler):
+    rng = random.Random(TEST_SEED_VALUE)
+    outcomes = [sampler.roll_stress_outcome(1, 2, rng) for i in range(100000)]
+    assert all(
+        outcome.value - 2 == 0 for outcome in outcomes if outcome.botch_level
+    )
+    assert all(
+        (outcome.value - 2) % 2**outcome.explosions == 0 for outcome in outcomes
+    )
+    assert max(outcome.explosions for outcome in outcomes) > 1
+    assert sum(outcome.value == 6 for outcome in outcomes) / 100000 == pytest.approx(
+        0.11, abs=0.005
+    )
+
+def test_backend_per_call(sampler):
+    rng = random.Random(TEST_SEED_VALUE)
+    expected = sampler.roll_stress_outcome(1, 0, random.Random(TEST_SEED_VALUE))
+    assert am5_rolls.roll_stress_outcome(rng=rng, backend=sampler) == expected
+
+def test_backend_globally(sampler, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(am5_rolls, "_stress_roll_backend", None)
+    am5_rolls.set_stress_roll_backend(sampler)
+    expected = sampler.roll_stress_batch(
+        10, 1, 0, numpy.random.default_rng(TEST_SEED_VALUE)
+    )
+    results = am5_rolls.roll_stress_batch(
+        10, rng=numpy.random.default_rng(TEST_SEED_VALUE)
+    )
+    assert (results[0] == expected[0]).all()
+    am5_rolls.set_stress_roll_backend(None)
+    assert am5_rolls._stress_roll_backend is None
@@ -0,0 +1,100 @@
+"""Tests for the mass combat simulation"""
+
+import random
+
+import pytest
+
+from simulation import mass_combat
+
+TEST_SEED_VALUE = 5297992492366785183
+
+GROGS = mass_combat.Side(
+    "grogs", mass_combat.CombatantProfile(attack=8, defense=6, damage=6, soak=5), 12
+)
+BANDITS = mass_combat.Side(
+    "bandits", mass_combat.CombatantProfile(attack=6, defense=5, damage=5, soak=3), 15
+)
+
+
+def test_penalties():
+    """Test that wounds and fatigue both count against every roll"""
+    combatant = mass_combat._Combatant(0, GROGS.profile)
+    assert combatant.penalty() == 0
+    combatant.wounds.take_damage(7)
+    combatant.fatigue.short_term_levels = 3
+    assert combatant.penalty() == -6
+    combatant.fatigue.short_term_levels = 5
+    assert combatant.penalty() is None
+
+
+def test_battle_outcome():
+    """Test that a battle ends with one side standing and sensible casualties"""
+    outcome = mass_combat.simulate_battle(
+        [GROGS, BANDITS], random.Random(TEST_SEED_VALUE), rounds_per_fatigue_level=3
+    )
+    assert outcome.winner is not None
+    loser = 1 - outcome.winner
+    assert outcome.out_of_action[loser] == (GROGS, BANDITS)[loser].count
+    assert all(
+        killed <= out for killed, out in zip(outcome.killed, outcome.out_of_action)
+    )
+    assert 0 < outcome.rounds <= 50
+
+
+def test_battle_is_reproducible():
+    """Test that the same seed fights the same battle"""
+    first = mass_combat.simulate_battle(
+        [GROGS, BANDITS], random.Random(TEST_SEED_VALUE)
+    )
+    second = mass_combat.simulate_battle(
+        [GROGS, BANDITS], random.Random(TEST_SEED_VALUE)
+    )
+    assert first == second
+
+
+def test_no_enemies():
+    """Test that a side with nobody to fight wins without a round"""
+    outcome = mass_combat.simulate_battle([GROGS], random.Random(TEST_SEED_VALUE))
+    assert outcome == mass_combat.BattleOutcome(0, (0,), (0,), 0)
+
+
+def test_round_limit():
+    """Test that battles nobody can win stop at the limit as draws"""
+    untouchable = mass_combat.CombatantProfile(
+        attack=0, defense=100, damage=0, soak=100
+    )
+    outcome = mass_combat.simulate_battle(
+        [
+            mass_combat.Side("one", untouchable, 2),
+            mass_combat.Side("two", untouchable, 2),
+        ],
+        random.Random(TEST_SEED_VALUE),
+        max_rounds=5,
+    )
+    assert outcome.rounds == 5
+    assert outcome.winner is None
+
+
+def test_simulate_battles():
+    """Test that the pool covers every battle and is reproducible"""
+    first = mass_combat.simulate_battles(
+        [GROGS, BANDITS], 12, TEST_SEED_VALUE, shards=4, max_workers=2
+    )
+    second = mass_combat.simulate_battles(
+        [GROGS, BANDITS], 12, TEST_SEED_VALUE, shards=4, max_workers=3
+    )
+    assert first.battles == 12
+    assert sum(first.wins.values()) == 12
+    for name in ("grogs", "bandits"):
+        assert first.killed[name].sum() == 12
+        assert (first.killed[name] == second.killed[name]).all()
+        assert (first.out_of_action[name] == second.out_of_action[name]).all()
+    assert first.wins == second.wins
+    assert first.rounds == second.rounds
+    assert first.rounds_per_second > 0
+
+
+def test_sides_need_names():
+    """Test that two sides can't share a name"""
+    with pytest.raises(ValueError):
+        mass_combat.simulate_battles([GROGS, GROGS], 1, TEST_SEED_VALUE)